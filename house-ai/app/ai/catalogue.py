@@ -0,0 +1,245 @@
+"""
+House AI — Product Catalogue
+In-process, periodically refreshed snapshot of `ai_products` for ranking.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.supabase_service import SupabaseService, PRODUCT_COLUMNS
+from app.ai.name_index import ProductNameIndex
+from app.config import Settings
+
+logger = logging.getLogger("house_ai")
+
+# Column order of CatalogueSnapshot.scores, matching RecommendationEngine weights
+SCORE_COLUMNS = ("value_score", "gaming_score", "camera_score", "trend_score")
+WEIGHT_KEYS = ("value", "gaming", "camera", "trend")
+
+
+class CatalogueSnapshot:
+    """
+    Immutable columnar view of the catalogue.
+
+    Row i of `scores` (n×4), `price` and `brand_codes` (indices into
+    `brands`) describes `rows[i]`. Refreshes build a new snapshot and
+    swap it in, so a reader never sees a half-applied update.
+    """
+
+    __slots__ = ("rows", "index", "scores", "price", "brands", "brand_codes", "watermark")
+
+    def __init__(self, rows: Sequence[Dict[str, Any]], watermark: Optional[str] = None):
+        self.rows: Tuple[Dict[str, Any], ...] = tuple(rows)
+        self.index: Dict[str, int] = {row["id"]: i for i, row in enumerate(self.rows)}
+        self.watermark = watermark
+
+        n = len(self.rows)
+        self.scores = np.array(
+            [[float(row.get(col) or 0) for col in SCORE_COLUMNS] for row in self.rows],
+            dtype=np.float64,
+        ).reshape(n, len(SCORE_COLUMNS))
+        self.price = np.array([float(row.get("price") or 0) for row in self.rows], dtype=np.float64)
+        brands, codes = np.unique(
+            np.array([(row.get("brand") or "").lower() for row in self.rows], dtype=str),
+            return_inverse=True,
+        )
+        self.brands: List[str] = brands.tolist()
+        self.brand_codes = codes.astype(np.uint16 if len(brands) < 2 ** 16 else np.uint32)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def nbytes(self) -> int:
+        return self.scores.nbytes + self.price.nbytes + self.brand_codes.nbytes
+
+    def merged(self, changed: Sequence[Dict[str, Any]]) -> "CatalogueSnapshot":
+        """New snapshot with `changed` rows upserted by id."""
+        rows = list(self.rows)
+        index = dict(self.index)
+        for row in changed:
+            i = index.get(row["id"])
+            if i is None:
+                index[row["id"]] = len(rows)
+                rows.append(row)
+            else:
+                rows[i] = row
+        watermark = changed[-1].get("updated_at") if changed else self.watermark
+        return CatalogueSnapshot(rows, watermark or self.watermark)
+
+    def rank(
+        self,
+        weights: Dict[str, float],
+        k: int,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        brand: Optional[str] = None,
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Top `k` (score, row) pairs by weighted score over the whole catalogue,
+        best first, after budget and brand filters.
+        """
+        if not self.rows or k <= 0:
+            return []
+        # Column-wise in calculate_score's order, so rounded scores match it exactly
+        totals = np.zeros(len(self.rows), dtype=np.float64)
+        for column, key in enumerate(WEIGHT_KEYS):
+            totals += weights[key] * self.scores[:, column]
+
+        mask = np.ones(len(self.rows), dtype=bool)
+        if min_price is not None:
+            mask &= self.price >= min_price
+        if max_price is not None:
+            mask &= self.price <= max_price
+        if brand:
+            brand = brand.lower()
+            codes = [i for i, name in enumerate(self.brands) if brand in name]
+            mask &= np.isin(self.brand_codes, codes)
+
+        candidates = np.flatnonzero(mask)
+        if not candidates.size:
+            return []
+        candidate_scores = totals[candidates]
+        if k < candidates.size:
+            top = np.sort(np.argpartition(-candidate_scores, k - 1)[:k])
+        else:
+            top = np.arange(candidates.size)
+        # Stable over catalogue order, so ties rank the same on every call
+        top = top[np.argsort(-candidate_scores[top], kind="stable")]
+
+        return [(round(float(totals[i]), 2), self.rows[i]) for i in candidates[top]]
+
+
+class ProductCatalogue:
+    """
+    Per-worker product catalogue kept in sync with Supabase.
+
+    Every `refresh_interval` seconds only rows whose `updated_at` is past
+    the snapshot's watermark are fetched and upserted. A full reload runs
+    every `full_reload_interval` seconds to drop deleted products and pick
+    up any update whose timestamp landed behind the watermark. Until the
+    first load succeeds, `ready` is False and callers query the DB instead.
+    """
+
+    def __init__(self, supabase: SupabaseService, settings: Settings):
+        self.supabase = supabase
+        self.refresh_interval = settings.CATALOGUE_REFRESH_INTERVAL
+        self.full_reload_interval = settings.CATALOGUE_FULL_RELOAD_INTERVAL
+
+        self._snapshot = CatalogueSnapshot([])
+        self.names = ProductNameIndex()
+        self._loaded = False
+        self._last_full_reload = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.refreshes = 0
+        self.full_reloads = 0
+        self.rows_applied = 0
+        self.failed = 0
+        self.last_refresh_ms: Optional[float] = None
+        self._refreshed_at: Optional[float] = None
+
+    # ── Lifecycle ────────────────────────────────────────
+
+    def start(self) -> None:
+        """Start the refresh loop; the first full load runs immediately."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            full = (
+                not self._loaded
+                or time.monotonic() - self._last_full_reload >= self.full_reload_interval
+            )
+            try:
+                await self.refresh(full=full)
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Catalogue {'reload' if full else 'refresh'} failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    # ── Refresh ──────────────────────────────────────────
+
+    async def refresh(self, full: bool = False) -> int:
+        """Pull changes from Supabase into a new snapshot. Returns rows applied."""
+        start = time.perf_counter()
+        if full:
+            rows = await self.supabase.get_products_updated_since(columns=PRODUCT_COLUMNS)
+            watermark = max((r["updated_at"] for r in rows if r.get("updated_at")), default=None)
+            self._snapshot = CatalogueSnapshot(rows, watermark)
+            self.names = ProductNameIndex(rows)
+            self._loaded = True
+            self._last_full_reload = time.monotonic()
+            self.full_reloads += 1
+            logger.info(
+                f"Catalogue loaded: {len(rows)} products, {self._snapshot.nbytes} bytes of columns"
+            )
+        else:
+            rows = await self.supabase.get_products_updated_since(
+                self._snapshot.watermark, columns=PRODUCT_COLUMNS
+            )
+            if rows:
+                self._snapshot = self._snapshot.merged(rows)
+                self.names.upsert(rows)
+        self.refreshes += 1
+        self.rows_applied += len(rows)
+        self._refreshed_at = time.time()
+        self.last_refresh_ms = round((time.perf_counter() - start) * 1000, 2)
+        return len(rows)
+
+    # ── Queries ──────────────────────────────────────────
+
+    @property
+    def ready(self) -> bool:
+        return self._loaded
+
+    @property
+    def snapshot(self) -> CatalogueSnapshot:
+        return self._snapshot
+
+    def get(self, product_id: str) -> Optional[Dict[str, Any]]:
+        snapshot = self._snapshot
+        i = snapshot.index.get(product_id)
+        return snapshot.rows[i] if i is not None else None
+
+    def top_k(
+        self,
+        weights: Dict[str, float],
+        k: int,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        brand: Optional[str] = None,
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        return self._snapshot.rank(weights, k, min_price, max_price, brand)
+
+    # ── Metrics ──────────────────────────────────────────
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "ready": self._loaded,
+            "products": len(snapshot),
+            "brands": len(snapshot.brands),
+            "column_bytes": snapshot.nbytes,
+            "watermark": snapshot.watermark,
+            "name_index": self.names.stats(),
+            "refreshes": self.refreshes,
+            "full_reloads": self.full_reloads,
+            "rows_applied": self.rows_applied,
+            "failed": self.failed,
+            "last_refresh_ms": self.last_refresh_ms,
+            "age_s": round(time.time() - self._refreshed_at, 1) if self._refreshed_at else None,
+        }
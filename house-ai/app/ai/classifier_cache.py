@@ -0,0 +1,114 @@
+"""
+House AI — Classifier Cache
+Caches the LLM fallbacks of intent / language classification by normalized text.
+"""
+
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.config import get_settings, Settings
+from app.services.llm_service import LLMService
+
+logger = logging.getLogger("house_ai")
+
+Classification = Tuple[str, float]  # (label, confidence)
+
+
+class ClassifierCache:
+    """
+    In-process LRU in front of Redis for one-word classifier answers.
+
+    Keys are `kind` + normalized message text, so the same ambiguous
+    phrasing ("salom", "hi there") is sent to the LLM once across all
+    users and workers. Concurrent misses for the same key share one call.
+    Only answers are cached — a failed LLM call raises and is retried
+    on the next request.
+    """
+
+    def __init__(self, settings: Settings):
+        self.max_size = settings.CLASSIFIER_CACHE_SIZE
+        self.ttl = settings.CACHE_TTL_CLASSIFIER
+        self._redis = None
+        self._local: "OrderedDict[str, Classification]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def set_redis(self, redis_service) -> None:
+        """Attach RedisService for the cross-worker layer."""
+        self._redis = redis_service
+
+    @staticmethod
+    def cache_key(kind: str, text: str) -> str:
+        normalized = LLMService.normalize_embedding_text(text)
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+        return f"cache:classify:{kind}:{digest}"
+
+    def _count(self, kind: str, outcome: str) -> None:
+        stats = self._stats.setdefault(
+            kind, {"local_hits": 0, "redis_hits": 0, "misses": 0}
+        )
+        stats[outcome] += 1
+
+    def _remember(self, key: str, value: Classification) -> None:
+        self._local[key] = value
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    async def get_or_compute(
+        self,
+        kind: str,
+        text: str,
+        compute: Callable[[], Awaitable[Classification]],
+    ) -> Classification:
+        """Return the cached (label, confidence) for `text`, or compute and store it."""
+        key = self.cache_key(kind, text)
+
+        cached = self._local.get(key)
+        if cached is not None:
+            self._local.move_to_end(key)
+            self._count(kind, "local_hits")
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            shared = await asyncio.shield(inflight)
+            if shared is not None:
+                self._count(kind, "local_hits")
+                return shared
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        result: Optional[Classification] = None
+        try:
+            if self._redis:
+                stored = await self._redis.get_cached(key)
+                if stored:
+                    result = (stored[0], float(stored[1]))
+                    self._count(kind, "redis_hits")
+            if result is None:
+                self._count(kind, "misses")
+                result = await compute()
+                if self._redis:
+                    await self._redis.set_cached(key, list(result), self.ttl)
+            self._remember(key, result)
+            return result
+        finally:
+            # Waiters get None on failure and compute for themselves
+            future.set_result(result)
+            del self._inflight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        report = {}
+        for kind, stats in self._stats.items():
+            total = sum(stats.values())
+            hits = stats["local_hits"] + stats["redis_hits"]
+            report[kind] = {**stats, "hit_rate": round(hits / total, 4) if total else 0.0}
+        report["cache_size"] = len(self._local)
+        return report
+
+
+classifier_cache = ClassifierCache(get_settings())
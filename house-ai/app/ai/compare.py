@@ -4,14 +4,20 @@ Structured product comparison with per-category winners and LLM summary.
 """
 
 import logging
-from typing import List, Dict, Optional
+from contextlib import aclosing
+from typing import AsyncGenerator, Dict, Iterable, List, Optional
 
-from app.models.response_models import ComparisonTable, ComparisonRow
+from app.models.response_models import ComparisonTable, ComparisonRow, StreamChunk
 from app.services.supabase_service import SupabaseService
+from app.services.redis_service import RedisService
 from app.services.llm_service import LLMService
+from app.ai.catalogue import ProductCatalogue
+from app.config import Settings
 
 logger = logging.getLogger("house_ai")
 
+RECOMMENDATION_FALLBACK = "Please review the comparison table above."
+
 
 # ── Comparison Categories ────────────────────────────────────
 
@@ -32,7 +38,26 @@ COMPARISON_CATEGORIES = [
 
 
 class ComparisonEngine:
-    """Product comparison engine."""
+    """
+    Product comparison engine.
+
+    Names are resolved against the catalogue's in-process name index
+    first. Names it misses are looked up in the database with one ilike
+    query per name, run concurrently, and cached in Redis as name →
+    product id, so a repeat comparison reads its rows from the catalogue
+    snapshot (or one `id in (...)` query before it loads) instead of
+    matching names again.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        redis: Optional[RedisService] = None,
+        catalogue: Optional[ProductCatalogue] = None,
+    ):
+        self.redis = redis
+        self.catalogue = catalogue
+        self.id_cache_ttl = settings.CACHE_TTL_PRODUCT_IDS
 
     async def compare(
         self,
@@ -49,7 +74,7 @@ class ComparisonEngine:
         4. Generate final recommendation via LLM
         """
         # 1. Fetch products
-        products = await supabase.get_products_by_names(product_names)
+        products = await self._resolve_products(supabase, product_names)
 
         if len(products) < 2:
             return {
@@ -58,19 +83,12 @@ class ComparisonEngine:
                 "tokens_used": 0,
             }
 
-        # 2. Build comparison rows
-        rows = self._build_comparison_rows(products)
-
-        # 3. Build table
-        product_labels = [p.get("name", "Unknown") for p in products]
-        table = ComparisonTable(
-            products=product_labels,
-            rows=rows,
-        )
+        # 2–3. Build comparison rows and table
+        table = self._build_table(products)
 
         # 4. Generate LLM recommendation
         recommendation, tokens = await self._generate_recommendation(
-            llm, products, rows, language
+            llm, products, table.rows, language
         )
 
         table.final_recommendation = recommendation
@@ -82,6 +100,113 @@ class ComparisonEngine:
             "tokens_used": tokens,
         }
 
+    async def stream_compare(
+        self,
+        supabase: SupabaseService,
+        llm: LLMService,
+        product_names: List[str],
+        language: str = "en",
+        result: Optional[Dict] = None,
+    ) -> AsyncGenerator[StreamChunk, None]:
+        """
+        Streaming variant of `compare`: one `comparison` chunk with the
+        table as soon as products are resolved, then the recommendation
+        token by token. `result`, if given, is filled with what `compare`
+        returns.
+        """
+        result = result if result is not None else {}
+        products = await self._resolve_products(supabase, product_names)
+        if len(products) < 2:
+            result.update(
+                comparison=None,
+                message=self._not_found_message(product_names, language),
+                tokens_used=0,
+            )
+            yield StreamChunk(type="text", content=result["message"])
+            return
+
+        table = self._build_table(products)
+        yield StreamChunk(type="comparison", data=table.model_dump())
+
+        usage: Dict = {}
+        parts: List[str] = []
+        messages = self._recommendation_messages(products, table.rows, language)
+        try:
+            async with aclosing(llm.stream(messages, temperature=0.7, usage=usage)) as tokens:
+                async for token in tokens:
+                    parts.append(token)
+                    yield StreamChunk(type="text", content=token)
+        except Exception as e:
+            logger.error(f"Comparison recommendation stream error: {e}")
+            if parts:
+                raise
+            parts = [RECOMMENDATION_FALLBACK]
+            yield StreamChunk(type="text", content=RECOMMENDATION_FALLBACK)
+        finally:
+            # Partial answer if the consumer stopped early; the full one replaces it below
+            result.setdefault("message", "".join(parts))
+            result.setdefault("tokens_used", usage.get("total", 0))
+
+        table.final_recommendation = table.reasoning = "".join(parts)
+        result.update(
+            comparison=table, message=table.final_recommendation,
+            tokens_used=usage.get("total", 0),
+        )
+
+    def _build_table(self, products: List[Dict]) -> ComparisonTable:
+        return ComparisonTable(
+            products=[p.get("name", "Unknown") for p in products],
+            rows=self._build_comparison_rows(products),
+        )
+
+    async def _resolve_products(
+        self, supabase: SupabaseService, product_names: List[str]
+    ) -> List[Dict]:
+        """Products for `product_names` in order: name index, id cache, then concurrent per-name lookups."""
+        found: Dict[str, Dict] = {}
+        catalogue_ready = self.catalogue is not None and self.catalogue.ready
+        if catalogue_ready:
+            for name in product_names:
+                product_id = self.catalogue.names.best(name)
+                if product_id is not None:
+                    found[name] = self.catalogue.get(product_id)
+
+        pending = [n for n in product_names if n not in found]
+        if pending and self.redis:
+            cached_ids = await self.redis.get_many_cached(
+                [RedisService.product_id_cache_key(n) for n in pending]
+            )
+            hits = {n: pid for n, pid in zip(pending, cached_ids) if pid}
+            if catalogue_ready:
+                rows = {pid: self.catalogue.get(pid) for pid in hits.values()}
+            elif hits:
+                rows = {p["id"]: p for p in await supabase.get_products_by_ids(list(hits.values()))}
+            else:
+                rows = {}
+            # Ids whose product has since been removed are looked up again
+            found.update({n: rows[pid] for n, pid in hits.items() if rows.get(pid)})
+            pending = [n for n in pending if n not in found]
+
+        if pending:
+            resolved = await supabase.resolve_product_names(pending)
+            found.update(resolved)
+            if resolved and self.redis:
+                await self.redis.set_many_cached(
+                    {RedisService.product_id_cache_key(n): p["id"] for n, p in resolved.items()},
+                    self.id_cache_ttl,
+                )
+
+        return self._dedupe(found.get(name) for name in product_names)
+
+    @staticmethod
+    def _dedupe(products: Iterable[Optional[Dict]]) -> List[Dict]:
+        unique, seen = [], set()
+        for product in products:
+            if product and product["id"] not in seen:
+                seen.add(product["id"])
+                unique.append(product)
+        return unique
+
     def _build_comparison_rows(
         self, products: List[Dict]
     ) -> List[ComparisonRow]:
@@ -142,14 +267,13 @@ class ComparisonEngine:
         # Spec-based categories: can't determine a clear winner automatically
         return None
 
-    async def _generate_recommendation(
+    def _recommendation_messages(
         self,
-        llm: LLMService,
         products: List[Dict],
         rows: List[ComparisonRow],
         language: str,
-    ) -> tuple:
-        """Generate a final recommendation based on comparison data."""
+    ) -> List[Dict[str, str]]:
+        """Prompt for a final recommendation based on comparison data."""
         comparison_text = "\n".join(
             f"- {row.category}: "
             + ", ".join(f"{k}: {v}" for k, v in row.values.items())
@@ -184,12 +308,24 @@ class ComparisonEngine:
             },
         ]
 
+        return messages
+
+    async def _generate_recommendation(
+        self,
+        llm: LLMService,
+        products: List[Dict],
+        rows: List[ComparisonRow],
+        language: str,
+    ) -> tuple:
+        """Generate a final recommendation based on comparison data."""
+        messages = self._recommendation_messages(products, rows, language)
+
         try:
             result = await llm.complete(messages, temperature=0.7)
             return result["content"], result["tokens"]["total"]
         except Exception as e:
             logger.error(f"Comparison recommendation error: {e}")
-            return "Please review the comparison table above.", 0
+            return RECOMMENDATION_FALLBACK, 0
 
     @staticmethod
     def _not_found_message(
@@ -0,0 +1,254 @@
+"""
+House AI — WebSocket Connection Actor
+Per-connection turn queue with cancellation and pipelined preprocessing.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from collections import deque
+from typing import Any, AsyncGenerator, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from fastapi import WebSocket, WebSocketDisconnect
+from starlette.websockets import WebSocketState
+
+from app.config import Settings
+from app.models.response_models import StreamChunk
+from app.services.stream_writer import StreamWriter, stream_stats
+from app.middleware import detect_prompt_injection
+
+logger = logging.getLogger("house_ai")
+
+INJECTION_REPLY = "I'm sorry, I can only help with smartphone-related questions."
+
+
+class Turn:
+    """One user message on a connection and its (possibly early) preprocessing."""
+
+    __slots__ = ("message", "session_id", "error", "prep", "seq", "cancelled")
+
+    def __init__(self, message: str, session_id: str, error: Optional[str] = None):
+        self.message = message
+        self.session_id = session_id
+        self.error = error
+        self.prep: Optional[asyncio.Task] = None
+        self.seq = 0                # completed turns on the connection when prep started
+        self.cancelled = False
+
+    @property
+    def answerable(self) -> bool:
+        return not self.error and bool(self.message) and not detect_prompt_injection(self.message)
+
+
+Prepare = Callable[[Turn], Awaitable[Dict[str, Any]]]
+Respond = Callable[[Dict[str, Any], Dict[str, Any]], AsyncGenerator[StreamChunk, None]]
+Finish = Callable[[Turn, Dict[str, Any]], Awaitable[None]]
+
+
+class ChatConnection:
+    """
+    Actor owning one chat WebSocket.
+
+    A reader loop receives frames while a worker answers turns one at a
+    time, so the socket is never blind during a long answer:
+
+    - `{"type": "cancel"}` stops the answer being streamed, which closes
+      its LLM stream, and drops queued messages; each gets a `cancelled`
+      chunk.
+    - A message that arrives mid-answer is queued (up to
+      WS_MAX_PENDING_MESSAGES) and, with WS_PIPELINE_PREPROCESS, its
+      language/intent/memory preprocessing starts right away. Exchanges
+      that finish in the meantime are appended to its memory context, so
+      it still sees the turn before it.
+
+    `prepare`, `respond` and `finish` are the router's preprocessing,
+    intent routing and memory accounting for one turn.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        settings: Settings,
+        prepare: Prepare,
+        respond: Respond,
+        finish: Finish,
+    ):
+        self.websocket = websocket
+        self.settings = settings
+        self.pipeline = settings.WS_PIPELINE_PREPROCESS
+        self.max_context_messages = settings.MAX_CONTEXT_MESSAGES
+        self._prepare = prepare
+        self._respond = respond
+        self._finish = finish
+
+        self._inbox: asyncio.Queue = asyncio.Queue(maxsize=settings.WS_MAX_PENDING_MESSAGES)
+        self._queued: List[Turn] = []   # mirror of the inbox, for cancel
+        self._current: Optional[asyncio.Task] = None
+        self._completed = 0
+        # (seq, session_id, user message, answer) of recent turns, for pipelined context
+        self._recent: Deque[Tuple[int, str, str, str]] = deque(maxlen=settings.WS_MAX_PENDING_MESSAGES + 1)
+
+    # ── Reader ───────────────────────────────────────────
+
+    async def run(self) -> None:
+        """Serve the connection until the client disconnects."""
+        worker = asyncio.create_task(self._work())
+        try:
+            while True:
+                data = await self.websocket.receive_text()
+                await self._on_frame(data)
+        except WebSocketDisconnect:
+            logger.info("WebSocket client disconnected")
+        finally:
+            worker.cancel()
+            self._drop_pending()
+            await asyncio.gather(worker, return_exceptions=True)
+
+    async def _on_frame(self, data: str) -> None:
+        try:
+            request = json.loads(data)
+        except ValueError:
+            request = None
+        if not isinstance(request, dict):
+            turn = Turn("", str(uuid.uuid4()), error="Invalid message")
+        elif request.get("type") == "cancel":
+            self.cancel()
+            return
+        else:
+            turn = Turn(request.get("message", ""), request.get("session_id") or str(uuid.uuid4()))
+
+        if self._inbox.full():
+            await self.websocket.send_json(
+                StreamChunk(
+                    type="error", content="Too many pending messages",
+                    data={"session_id": turn.session_id},
+                ).model_dump()
+            )
+            return
+        if self.pipeline and turn.answerable:
+            self._start_prep(turn)
+        self._queued.append(turn)
+        self._inbox.put_nowait(turn)
+
+    def cancel(self) -> None:
+        """Abort the answer in flight and every queued message."""
+        self._drop_pending(mark_only=True)
+        if self._current is not None and not self._current.done():
+            self._current.cancel()
+
+    def _drop_pending(self, mark_only: bool = False) -> None:
+        # Queued turns stay in the inbox so the worker reports them in order
+        for turn in self._queued:
+            turn.cancelled = True
+            if turn.prep is not None:
+                turn.prep.cancel()
+                if turn.prep.done() and not turn.prep.cancelled():
+                    turn.prep.exception()  # failed before the cancel; not worth logging
+        if not mark_only:
+            self._queued.clear()
+            while not self._inbox.empty():
+                self._inbox.get_nowait()
+
+    def _start_prep(self, turn: Turn) -> None:
+        turn.seq = self._completed
+        turn.prep = asyncio.create_task(self._prepare(turn))
+
+    # ── Worker ───────────────────────────────────────────
+
+    async def _work(self) -> None:
+        while True:
+            turn: Turn = await self._inbox.get()
+            self._queued.remove(turn)
+            if turn.cancelled:
+                await self._send_cancelled(turn)
+                continue
+            self._current = asyncio.create_task(self._answer(turn))
+            try:
+                await asyncio.wait({self._current})
+            finally:
+                if not self._current.done():
+                    self._current.cancel()
+                    await asyncio.gather(self._current, return_exceptions=True)
+
+            task, self._current = self._current, None
+            if task.cancelled():
+                await self._send_cancelled(turn)
+            elif task.exception() is not None:
+                e = task.exception()
+                if isinstance(e, WebSocketDisconnect) or self.websocket.client_state != WebSocketState.CONNECTED:
+                    return  # socket is gone; the reader sees the disconnect
+                logger.error(f"WebSocket turn error: {type(e).__name__}: {e}", exc_info=e)
+                await self.websocket.send_json(
+                    StreamChunk(
+                        type="error", content="A server error occurred. Please try again.",
+                        data={"session_id": turn.session_id},
+                    ).model_dump()
+                )
+
+    async def _answer(self, turn: Turn) -> None:
+        ws = self.websocket
+        if turn.error or not turn.message:
+            await ws.send_json(StreamChunk(type="error", content=turn.error or "Empty message").model_dump())
+            return
+        if not turn.answerable:
+            await ws.send_json(StreamChunk(type="text", content=INJECTION_REPLY).model_dump())
+            await ws.send_json(StreamChunk(type="done", data={"session_id": turn.session_id}).model_dump())
+            return
+
+        if turn.prep is None:
+            self._start_prep(turn)
+        prep = await turn.prep
+        self._add_missed_exchanges(turn, prep)
+
+        # Product/comparison chunks precede the text, which is
+        # coalesced into frames by the writer
+        reply: Dict[str, Any] = {}
+        chunks = self._respond(prep, reply)
+        try:
+            async with StreamWriter(ws.send_text, self.settings) as out:
+                async for chunk in chunks:
+                    await out.write(chunk)
+        finally:
+            # Closes the upstream LLM stream on cancel or a dead socket
+            await chunks.aclose()
+        if out.error is not None:
+            raise out.error
+
+        await self._finish(turn, reply)
+        self._completed += 1
+        self._recent.append((self._completed, turn.session_id, turn.message, reply.get("message", "")))
+
+        await ws.send_json(
+            StreamChunk(
+                type="done",
+                data={"session_id": turn.session_id, "intent": prep["intent"].value},
+            ).model_dump()
+        )
+
+    def _add_missed_exchanges(self, turn: Turn, prep: Dict[str, Any]) -> None:
+        """
+        Append exchanges of the same session that completed after `turn`'s
+        prep began, unless its memory read already saw them (an exchange
+        is counted only after `finish` has stored it).
+        """
+        missed = [r for r in self._recent if r[0] > turn.seq and r[1] == turn.session_id]
+        if not missed:
+            return
+        recent = list(prep["context"].get("recent_messages", []))
+        seen = {
+            (first.get("content"), second.get("content"))
+            for first, second in zip(recent, recent[1:])
+            if first.get("role") == "user" and second.get("role") == "assistant"
+        }
+        for _, _, user_message, answer in missed:
+            if (user_message, answer) in seen:
+                continue
+            recent += [{"role": "user", "content": user_message}, {"role": "assistant", "content": answer}]
+        prep["context"] = {**prep["context"], "recent_messages": recent[-self.max_context_messages:]}
+
+    async def _send_cancelled(self, turn: Turn) -> None:
+        stream_stats.cancelled += 1
+        await self.websocket.send_json(
+            StreamChunk(type="cancelled", data={"session_id": turn.session_id}).model_dump()
+        )
@@ -3,60 +3,16 @@ House AI — Emotion Detection
 Lightweight emotion detection with dynamic tone adjustment.
 """
 
-import re
 import logging
-from typing import Tuple, Dict
+from typing import Tuple
 
 from app.models.schemas import Emotion
+from app.ai.keywords import EMOTION_KEYWORDS  # noqa: F401 (re-exported)
+from app.ai.text_analysis import analyze_text
 
 logger = logging.getLogger("house_ai")
 
 
-# ── Emotion Keywords (multi-language) ────────────────────────
-
-EMOTION_KEYWORDS: Dict[Emotion, list] = {
-    Emotion.HAPPY: [
-        r"thank", r"thanks", r"great", r"awesome", r"love", r"perfect",
-        r"rahmat", r"zo'r", r"ajoyib", r"yaxshi", r"barakalla",
-        r"спасибо", r"отлично", r"здорово", r"класс", r"супер",
-        r"😊", r"😄", r"🎉", r"❤️", r"👍",
-    ],
-    Emotion.CONFUSED: [
-        r"confused", r"don'?t\s+understand", r"what\s+do\s+you\s+mean",
-        r"unclear", r"help\s+me\s+understand",
-        r"tushunmadim", r"nima\s+demoqchisiz", r"qanday",
-        r"не понимаю", r"не понял", r"что значит", r"как это",
-        r"🤔", r"\?\?+",
-    ],
-    Emotion.FRUSTRATED: [
-        r"frustrat", r"annoying", r"doesn'?t\s+work", r"broken",
-        r"terrible", r"useless",
-        r"ishlamayapti", r"buzilgan", r"yomon",
-        r"не работает", r"ужас", r"бесполезн",
-        r"😤", r"😡",
-    ],
-    Emotion.ANGRY: [
-        r"angry", r"furious", r"worst", r"hate", r"stupid",
-        r"horrible", r"disgusting",
-        r"g'azab", r"nafrat", r"eng yomon",
-        r"злой", r"ненавижу", r"худший", r"отврат",
-        r"🤬", r"💢",
-    ],
-    Emotion.EXCITED: [
-        r"excited", r"amazing", r"incredible", r"wow", r"can'?t\s+wait",
-        r"fantastic",
-        r"hayajon", r"ajab", r"zo'r-ku",
-        r"ура", r"круто", r"невероятно", r"вау",
-        r"🤩", r"🔥", r"💥", r"⚡",
-    ],
-}
-
-COMPILED_EMOTION_KEYWORDS = {
-    emotion: [re.compile(p, re.IGNORECASE) for p in keywords]
-    for emotion, keywords in EMOTION_KEYWORDS.items()
-}
-
-
 # ── Tone Adjustments ─────────────────────────────────────────
 
 TONE_ADJUSTMENTS = {
@@ -97,11 +53,9 @@ def detect_emotion(text: str) -> Tuple[Emotion, float]:
     """
     scores = {}
 
-    for emotion, patterns in COMPILED_EMOTION_KEYWORDS.items():
-        match_count = sum(1 for p in patterns if p.search(text))
-        if match_count > 0:
-            confidence = min(0.5 + (match_count * 0.15), 0.95)
-            scores[emotion] = confidence
+    for emotion, match_count in analyze_text(text).emotion_matches.items():
+        confidence = min(0.5 + (match_count * 0.15), 0.95)
+        scores[emotion] = confidence
 
     if not scores:
         return Emotion.NEUTRAL, 0.8
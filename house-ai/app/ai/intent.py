@@ -1,157 +1,22 @@
 """
 House AI — Intent Classification
-Rule-based fast detection with GPT-4o-mini fallback.
+Rule-based fast detection, local model, then GPT-4o-mini fallback.
 """
 
-import re
+import json
 import logging
 from typing import Tuple
 
+from app.config import get_settings
 from app.models.schemas import Intent
+from app.ai.classifier_cache import classifier_cache
+from app.ai.keywords import INTENT_PATTERNS  # noqa: F401 (re-exported)
+from app.ai.text_analysis import analyze_text
+from app.ai.intent_model import get_intent_model
 
 logger = logging.getLogger("house_ai")
 
 
-# ── Keyword Patterns ─────────────────────────────────────────
-
-INTENT_PATTERNS = {
-    Intent.RECOMMENDATION: [
-        r"recommend",
-        r"suggest",
-        r"tavsiya",
-        r"qaysi.*yaxshi",
-        r"eng yaxshi",
-        r"best\s+(phone|smartphone|device)",
-        r"top\s+\d+",
-        r"what\s+should\s+i\s+(buy|get)",
-        r"рекоменд",
-        r"посоветуй",
-        r"какой.*лучш",
-        r"самый лучший",
-        r"nima olsam",
-        r"qanday telefon",
-    ],
-    Intent.COMPARISON: [
-        r"compare",
-        r"vs\.?",
-        r"versus",
-        r"difference\s+between",
-        r"taqqosla",
-        r"farqi\s+nima",
-        r"qaysi\s+biri",
-        r"сравни",
-        r"разница",
-        r"что лучше",
-        r"или",
-        r"yoki",
-    ],
-    Intent.PRODUCT_DETAIL: [
-        r"specifications?",
-        r"specs?\b",
-        r"details?\s+about",
-        r"tell\s+me\s+about",
-        r"xarakter",
-        r"texnik",
-        r"ma'lumot",
-        r"haqida",
-        r"характеристик",
-        r"подробн",
-        r"расскаж",
-        r"price\s+of",
-        r"narxi",
-        r"цена",
-        r"how\s+much",
-        r"qancha",
-        r"сколько\s+стоит",
-    ],
-    Intent.BLOG_SEARCH: [
-        r"blog",
-        r"article",
-        r"maqola",
-        r"news",
-        r"yangilik",
-        r"review",
-        r"обзор",
-        r"статья",
-        r"новост",
-    ],
-    Intent.TREND_INQUIRY: [
-        r"trend",
-        r"popular",
-        r"mashhur",
-        r"ommabop",
-        r"trending",
-        r"what'?s\s+hot",
-        r"тренд",
-        r"популярн",
-        r"хит",
-    ],
-    Intent.BUDGET_CONVERSION: [
-        r"convert",
-        r"currency",
-        r"dollar",
-        r"valyuta",
-        r"so'm",
-        r"sum\b",
-        r"usd",
-        r"eur",
-        r"uzs",
-        r"конверт",
-        r"валют",
-        r"доллар",
-        r"necha dollar",
-        r"necha so'm",
-    ],
-    Intent.PLATFORM_HELP: [
-        # English
-        r"how\s+do\s+i",
-        r"where\s+(is|are|can\s+i\s+find)",
-        r"how\s+to\s+(change|switch|find|access|open|apply|become|register)",
-        r"how\s+can\s+i",
-        r"language\s+(change|switch|setting)",
-        r"apply\s+(for\s+)?(blogger|seller)",
-        r"become\s+a?\s+(seller|blogger)",
-        r"my\s+orders",
-        r"order\s+history",
-        r"where\s+is\s+(cart|basket|favorites|profile|menu)",
-        r"edit\s+profile",
-        # Uzbek
-        r"qanday\s+qilsam",
-        r"qayerda",
-        r"qanday\s+o[''`]zgartirish",
-        r"til\s+(o[''`]zgartirish|sozlash)",
-        r"blogerlikga\s+ariza",
-        r"sotuvchiga\s+ariza",
-        r"mening\s+buyurtmalarim",
-        r"profil\s+tahrirlash",
-        r"savatcha",
-        r"sevimlilar",
-        r"sozlamalar",
-        r"qanday\s+ulash",
-        r"qanday\s+ro[''`]yxatdan",
-        r"ilovada\s+qayerdan",
-        r"qayerdan\s+topaman",
-        # Russian
-        r"как\s+(изменить|переключить|найти|зайти|подать)",
-        r"где\s+(находится|найти)",
-        r"смена\s+языка",
-        r"настройки",
-        r"стать\s+(продавцом|блогером)",
-        r"подать\s+заявку",
-        r"мои\s+заказы",
-        r"редактировать\s+профиль",
-        r"корзина",
-        r"избранное",
-    ],
-}
-
-# Compile patterns
-COMPILED_INTENT_PATTERNS = {
-    intent: [re.compile(p, re.IGNORECASE) for p in patterns]
-    for intent, patterns in INTENT_PATTERNS.items()
-}
-
-
 def classify_intent_rule_based(text: str) -> Tuple[Intent, float]:
     """
     Rule-based intent classification.
@@ -159,12 +24,10 @@ def classify_intent_rule_based(text: str) -> Tuple[Intent, float]:
     """
     scores = {}
 
-    for intent, patterns in COMPILED_INTENT_PATTERNS.items():
-        match_count = sum(1 for p in patterns if p.search(text))
-        if match_count > 0:
-            # Confidence scales with number of matching patterns
-            confidence = min(0.5 + (match_count * 0.15), 0.95)
-            scores[intent] = confidence
+    for intent, match_count in analyze_text(text).intent_matches.items():
+        # Confidence scales with number of matching patterns
+        confidence = min(0.5 + (match_count * 0.15), 0.95)
+        scores[intent] = confidence
 
     if not scores:
         return Intent.GENERAL_CHAT, 0.9
@@ -177,6 +40,7 @@ def classify_intent_rule_based(text: str) -> Tuple[Intent, float]:
 async def classify_intent_llm(text: str, llm_service) -> Tuple[Intent, float]:
     """
     LLM-based intent classification fallback.
+    Answers are cached by normalized text (see classifier_cache).
     """
     messages = [
         {
@@ -199,33 +63,65 @@ async def classify_intent_llm(text: str, llm_service) -> Tuple[Intent, float]:
         {"role": "user", "content": text},
     ]
 
-    try:
+    async def ask() -> Tuple[str, float]:
         result = await llm_service.complete(
             messages, temperature=0.1, max_tokens=20
         )
         intent_str = result["content"].strip().lower().replace(" ", "_")
 
         try:
-            intent = Intent(intent_str)
-            return intent, 0.85
+            return Intent(intent_str).value, 0.85
         except ValueError:
-            return Intent.GENERAL_CHAT, 0.6
+            return Intent.GENERAL_CHAT.value, 0.6
+
+    try:
+        label, confidence = await classifier_cache.get_or_compute("intent", text, ask)
+        return Intent(label), confidence
 
     except Exception as e:
         logger.error(f"LLM intent classification error: {e}")
         return Intent.GENERAL_CHAT, 0.5
 
 
+def _log_sample(text: str, intent: Intent, confidence: float, source: str) -> None:
+    """Emit a (message, intent) pair for scripts/train_intent_model.py."""
+    if get_settings().INTENT_LOG_SAMPLES:
+        logger.info(json.dumps({
+            "event": "intent_sample",
+            "text": text,
+            "intent": intent.value,
+            "confidence": confidence,
+            "source": source,
+        }, ensure_ascii=False))
+
+
 async def classify_intent(text: str, llm_service=None) -> Tuple[Intent, float]:
     """
     Hybrid intent classification:
     1. Try rule-based first
-    2. Fall back to LLM if confidence is low
+    2. Local model when no rule matched or rule confidence is low
+    3. Fall back to LLM only if the model is uncertain too
     """
     intent, confidence = classify_intent_rule_based(text)
+    matched = intent != Intent.GENERAL_CHAT  # general_chat has no patterns
 
     # If rule-based confidence is high enough, use it
-    if confidence >= 0.65:
+    if matched and confidence >= 0.65:
+        logger.info(f"Intent (rule-based): {intent.value}, confidence={confidence}")
+        _log_sample(text, intent, confidence, "rule")
+        return intent, confidence
+
+    model = get_intent_model()
+    if model:
+        model_intent, probability = model.predict(text)
+        if probability >= get_settings().INTENT_MODEL_THRESHOLD:
+            confidence = round(probability, 3)
+            logger.info(f"Intent (model {model.version}): {model_intent.value}, confidence={confidence}")
+            _log_sample(text, model_intent, confidence, "model")
+            return model_intent, confidence
+
+    if not matched:
+        # Nothing matched and the model is unsure — plain chat, as before
         logger.info(f"Intent (rule-based): {intent.value}, confidence={confidence}")
         return intent, confidence
 
@@ -233,6 +129,7 @@ async def classify_intent(text: str, llm_service=None) -> Tuple[Intent, float]:
     if llm_service:
         intent, confidence = await classify_intent_llm(text, llm_service)
         logger.info(f"Intent (LLM): {intent.value}, confidence={confidence}")
+        _log_sample(text, intent, confidence, "llm")
         return intent, confidence
 
     return intent, confidence
@@ -0,0 +1,181 @@
+"""
+House AI — Local Intent Model
+Hashed character n-gram features with a softmax linear model (NumPy, CPU-only).
+"""
+
+import logging
+import os
+import time
+import unicodedata
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models.schemas import Intent
+
+logger = logging.getLogger("house_ai")
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+N_FEATURES = 2 ** 16
+NGRAM_RANGE = (2, 4)
+
+
+# ── Features ─────────────────────────────────────────────────
+
+def featurize(text: str, n_features: int = N_FEATURES) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sparse feature vector for `text` as (indices, values).
+
+    Character n-grams (with word-boundary padding) and whole words are
+    hashed with crc32 into `n_features` buckets; counts are L2-normalized.
+    """
+    text = " ".join(unicodedata.normalize("NFKC", text).lower().split())
+    padded = f" {text} "
+    grams = [
+        padded[i:i + n]
+        for n in range(NGRAM_RANGE[0], NGRAM_RANGE[1] + 1)
+        for i in range(len(padded) - n + 1)
+    ]
+    grams.extend(f"w:{word}" for word in text.split())
+    if not grams:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+    hashed = np.fromiter(
+        (zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.int64, count=len(grams)
+    ) & (n_features - 1)
+    indices, counts = np.unique(hashed, return_counts=True)
+    values = counts.astype(np.float32)
+    values /= np.linalg.norm(values)
+    return indices, values
+
+
+# ── Model ────────────────────────────────────────────────────
+
+class IntentModel:
+    """Multinomial logistic regression over hashed n-gram features."""
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        bias: np.ndarray,
+        classes: List[str],
+        version: str = "dev",
+        meta: Optional[Dict[str, str]] = None,
+    ):
+        self.weights = weights.astype(np.float32)
+        self.bias = bias.astype(np.float32)
+        self.classes = list(classes)
+        self.intents = [Intent(c) for c in self.classes]
+        self.version = version
+        self.meta = meta or {}
+        self.n_features = weights.shape[0]
+
+    def predict_proba(self, text: str) -> np.ndarray:
+        indices, values = featurize(text, self.n_features)
+        logits = values @ self.weights[indices] + self.bias
+        logits -= logits.max()
+        exp = np.exp(logits)
+        return exp / exp.sum()
+
+    def predict(self, text: str) -> Tuple[Intent, float]:
+        """Return (intent, probability) of the most likely class."""
+        probs = self.predict_proba(text)
+        best = int(np.argmax(probs))
+        return self.intents[best], float(probs[best])
+
+    # ── Training ─────────────────────────────────────────
+
+    @classmethod
+    def fit(
+        cls,
+        texts: Sequence[str],
+        labels: Sequence[str],
+        epochs: int = 30,
+        learning_rate: float = 0.5,
+        l2: float = 1e-5,
+        n_features: int = N_FEATURES,
+        version: str = "dev",
+        seed: int = 13,
+    ) -> "IntentModel":
+        """Train with per-sample SGD on the softmax cross-entropy loss."""
+        classes = sorted(set(labels))
+        class_index = {c: i for i, c in enumerate(classes)}
+        targets = np.array([class_index[label] for label in labels])
+        features = [featurize(t, n_features) for t in texts]
+
+        weights = np.zeros((n_features, len(classes)), dtype=np.float32)
+        bias = np.zeros(len(classes), dtype=np.float32)
+        rng = np.random.default_rng(seed)
+
+        for epoch in range(epochs):
+            lr = learning_rate / (1 + epoch * 0.1)
+            for i in rng.permutation(len(features)):
+                indices, values = features[i]
+                rows = weights[indices]
+                logits = values @ rows + bias
+                logits -= logits.max()
+                probs = np.exp(logits)
+                probs /= probs.sum()
+                probs[targets[i]] -= 1.0  # d(loss)/d(logits)
+                weights[indices] = rows - lr * (np.outer(values, probs) + l2 * rows)
+                bias -= lr * probs
+
+        meta = {
+            "trained_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "samples": str(len(texts)),
+            "epochs": str(epochs),
+        }
+        return cls(weights, bias, classes, version=version, meta=meta)
+
+    # ── Persistence ──────────────────────────────────────
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(
+            path,
+            weights=self.weights,
+            bias=self.bias,
+            classes=np.array(self.classes),
+            version=np.array(self.version),
+            meta_keys=np.array(list(self.meta.keys())),
+            meta_values=np.array(list(self.meta.values())),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "IntentModel":
+        with np.load(path, allow_pickle=False) as data:
+            meta = dict(zip(data["meta_keys"].tolist(), data["meta_values"].tolist()))
+            return cls(
+                data["weights"],
+                data["bias"],
+                data["classes"].tolist(),
+                version=str(data["version"]),
+                meta=meta,
+            )
+
+
+# ── Startup Loading ──────────────────────────────────────────
+
+_model: Optional[IntentModel] = None
+
+
+def load_intent_model(path: str) -> Optional[IntentModel]:
+    """Load the artifact at `path` (relative paths from the service root)."""
+    global _model
+    if not path:
+        _model = None
+        return None
+    if not os.path.isabs(path):
+        path = os.path.join(BASE_DIR, path)
+    try:
+        _model = IntentModel.load(path)
+        logger.info(f"Intent model loaded: version={_model.version}, classes={len(_model.classes)}")
+    except (OSError, KeyError, ValueError) as e:
+        logger.warning(f"Intent model not loaded ({path}): {e}")
+        _model = None
+    return _model
+
+
+def get_intent_model() -> Optional[IntentModel]:
+    return _model
@@ -0,0 +1,203 @@
+"""
+House AI — Keyword Patterns
+Intent, emotion and language patterns shared by the rule-based
+classifiers and the single-pass text analysis index.
+"""
+
+from typing import Dict
+
+from app.models.schemas import Emotion, Intent
+
+
+# ── Keyword Patterns ─────────────────────────────────────────
+
+INTENT_PATTERNS = {
+    Intent.RECOMMENDATION: [
+        r"recommend",
+        r"suggest",
+        r"tavsiya",
+        r"qaysi.*yaxshi",
+        r"eng yaxshi",
+        r"best\s+(phone|smartphone|device)",
+        r"top\s+\d+",
+        r"what\s+should\s+i\s+(buy|get)",
+        r"рекоменд",
+        r"посоветуй",
+        r"какой.*лучш",
+        r"самый лучший",
+        r"nima olsam",
+        r"qanday telefon",
+    ],
+    Intent.COMPARISON: [
+        r"compare",
+        r"vs\.?",
+        r"versus",
+        r"difference\s+between",
+        r"taqqosla",
+        r"farqi\s+nima",
+        r"qaysi\s+biri",
+        r"сравни",
+        r"разница",
+        r"что лучше",
+        r"или",
+        r"yoki",
+    ],
+    Intent.PRODUCT_DETAIL: [
+        r"specifications?",
+        r"specs?\b",
+        r"details?\s+about",
+        r"tell\s+me\s+about",
+        r"xarakter",
+        r"texnik",
+        r"ma'lumot",
+        r"haqida",
+        r"характеристик",
+        r"подробн",
+        r"расскаж",
+        r"price\s+of",
+        r"narxi",
+        r"цена",
+        r"how\s+much",
+        r"qancha",
+        r"сколько\s+стоит",
+    ],
+    Intent.BLOG_SEARCH: [
+        r"blog",
+        r"article",
+        r"maqola",
+        r"news",
+        r"yangilik",
+        r"review",
+        r"обзор",
+        r"статья",
+        r"новост",
+    ],
+    Intent.TREND_INQUIRY: [
+        r"trend",
+        r"popular",
+        r"mashhur",
+        r"ommabop",
+        r"trending",
+        r"what'?s\s+hot",
+        r"тренд",
+        r"популярн",
+        r"хит",
+    ],
+    Intent.BUDGET_CONVERSION: [
+        r"convert",
+        r"currency",
+        r"dollar",
+        r"valyuta",
+        r"so'm",
+        r"sum\b",
+        r"usd",
+        r"eur",
+        r"uzs",
+        r"конверт",
+        r"валют",
+        r"доллар",
+        r"necha dollar",
+        r"necha so'm",
+    ],
+    Intent.PLATFORM_HELP: [
+        # English
+        r"how\s+do\s+i",
+        r"where\s+(is|are|can\s+i\s+find)",
+        r"how\s+to\s+(change|switch|find|access|open|apply|become|register)",
+        r"how\s+can\s+i",
+        r"language\s+(change|switch|setting)",
+        r"apply\s+(for\s+)?(blogger|seller)",
+        r"become\s+a?\s+(seller|blogger)",
+        r"my\s+orders",
+        r"order\s+history",
+        r"where\s+is\s+(cart|basket|favorites|profile|menu)",
+        r"edit\s+profile",
+        # Uzbek
+        r"qanday\s+qilsam",
+        r"qayerda",
+        r"qanday\s+o[''`]zgartirish",
+        r"til\s+(o[''`]zgartirish|sozlash)",
+        r"blogerlikga\s+ariza",
+        r"sotuvchiga\s+ariza",
+        r"mening\s+buyurtmalarim",
+        r"profil\s+tahrirlash",
+        r"savatcha",
+        r"sevimlilar",
+        r"sozlamalar",
+        r"qanday\s+ulash",
+        r"qanday\s+ro[''`]yxatdan",
+        r"ilovada\s+qayerdan",
+        r"qayerdan\s+topaman",
+        # Russian
+        r"как\s+(изменить|переключить|найти|зайти|подать)",
+        r"где\s+(находится|найти)",
+        r"смена\s+языка",
+        r"настройки",
+        r"стать\s+(продавцом|блогером)",
+        r"подать\s+заявку",
+        r"мои\s+заказы",
+        r"редактировать\s+профиль",
+        r"корзина",
+        r"избранное",
+    ],
+}
+
+
+# ── Emotion Keywords (multi-language) ────────────────────────
+
+EMOTION_KEYWORDS: Dict[Emotion, list] = {
+    Emotion.HAPPY: [
+        r"thank", r"thanks", r"great", r"awesome", r"love", r"perfect",
+        r"rahmat", r"zo'r", r"ajoyib", r"yaxshi", r"barakalla",
+        r"спасибо", r"отлично", r"здорово", r"класс", r"супер",
+        r"😊", r"😄", r"🎉", r"❤️", r"👍",
+    ],
+    Emotion.CONFUSED: [
+        r"confused", r"don'?t\s+understand", r"what\s+do\s+you\s+mean",
+        r"unclear", r"help\s+me\s+understand",
+        r"tushunmadim", r"nima\s+demoqchisiz", r"qanday",
+        r"не понимаю", r"не понял", r"что значит", r"как это",
+        r"🤔", r"\?\?+",
+    ],
+    Emotion.FRUSTRATED: [
+        r"frustrat", r"annoying", r"doesn'?t\s+work", r"broken",
+        r"terrible", r"useless",
+        r"ishlamayapti", r"buzilgan", r"yomon",
+        r"не работает", r"ужас", r"бесполезн",
+        r"😤", r"😡",
+    ],
+    Emotion.ANGRY: [
+        r"angry", r"furious", r"worst", r"hate", r"stupid",
+        r"horrible", r"disgusting",
+        r"g'azab", r"nafrat", r"eng yomon",
+        r"злой", r"ненавижу", r"худший", r"отврат",
+        r"🤬", r"💢",
+    ],
+    Emotion.EXCITED: [
+        r"excited", r"amazing", r"incredible", r"wow", r"can'?t\s+wait",
+        r"fantastic",
+        r"hayajon", r"ajab", r"zo'r-ku",
+        r"ура", r"круто", r"невероятно", r"вау",
+        r"🤩", r"🔥", r"💥", r"⚡",
+    ],
+}
+
+
+# ── Character Set Detection ──────────────────────────────────
+
+# Uzbek-specific Latin characters and common words
+UZBEK_MARKERS = [
+    r"[oʻOʻ]",  # O'zbek o'
+    r"[gʻGʻ]",  # O'zbek g'
+    r"\b(salom|rahmat|telefon|narx|qancha|yaxshi|qaysi|menga|uchun|kerak|bor|yo'q)\b",
+    r"\b(tavsiya|taqqosla|eng|kamera|o'yin|arzon|qimmat)\b",
+    r"\b(tushunmadim|nima|qanday|qayerda|iltimos)\b",
+]
+
+# Cyrillic characters (Russian)
+RUSSIAN_MARKERS = [
+    r"[а-яА-ЯёЁ]",
+    r"\b(привет|спасибо|телефон|цена|сколько|хороший|какой|мне|для|нужно)\b",
+    r"\b(рекомендуй|сравни|лучший|камера|игра|дешевый|дорогой)\b",
+    r"\b(не понимаю|что|как|где|пожалуйста)\b",
+]
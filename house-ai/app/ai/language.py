@@ -3,51 +3,31 @@ House AI — Language Detection & Typo Correction
 Auto-detect Uzbek/Russian/English with manual override support.
 """
 
-import re
 import logging
 from typing import Optional, Tuple
 
 from app.models.schemas import Language
+from app.config import get_settings
+from app.ai.spelling import TypoCorrector, load_typo_file, load_word_file
+from app.ai.classifier_cache import classifier_cache
+from app.ai.keywords import UZBEK_MARKERS, RUSSIAN_MARKERS  # noqa: F401 (re-exported)
+from app.ai.text_analysis import analyze_text
 
 logger = logging.getLogger("house_ai")
 
 
-# ── Character Set Detection ──────────────────────────────────
-
-# Uzbek-specific Latin characters and common words
-UZBEK_MARKERS = [
-    r"[oʻOʻ]",  # O'zbek o'
-    r"[gʻGʻ]",  # O'zbek g'
-    r"\b(salom|rahmat|telefon|narx|qancha|yaxshi|qaysi|menga|uchun|kerak|bor|yo'q)\b",
-    r"\b(tavsiya|taqqosla|eng|kamera|o'yin|arzon|qimmat)\b",
-    r"\b(tushunmadim|nima|qanday|qayerda|iltimos)\b",
-]
-
-# Cyrillic characters (Russian)
-RUSSIAN_MARKERS = [
-    r"[а-яА-ЯёЁ]",
-    r"\b(привет|спасибо|телефон|цена|сколько|хороший|какой|мне|для|нужно)\b",
-    r"\b(рекомендуй|сравни|лучший|камера|игра|дешевый|дорогой)\b",
-    r"\b(не понимаю|что|как|где|пожалуйста)\b",
-]
-
-COMPILED_UZBEK = [re.compile(p, re.IGNORECASE | re.UNICODE) for p in UZBEK_MARKERS]
-COMPILED_RUSSIAN = [re.compile(p, re.IGNORECASE | re.UNICODE) for p in RUSSIAN_MARKERS]
-
-
 def detect_language(text: str) -> Tuple[Language, float]:
     """
     Detect language from text using character-set heuristics.
     Returns (language, confidence).
     """
-    # Count pattern matches
-    uzbek_score = sum(1 for p in COMPILED_UZBEK if p.search(text))
-    russian_score = sum(1 for p in COMPILED_RUSSIAN if p.search(text))
+    # Count pattern matches (shared single pass with intent/emotion)
+    signals = analyze_text(text)
+    uzbek_score = signals.uzbek_score
+    russian_score = signals.russian_score
 
     # Check for Cyrillic characters specifically
-    cyrillic_count = len(re.findall(r"[а-яА-ЯёЁ]", text))
-    total_alpha = len(re.findall(r"[a-zA-Zа-яА-ЯёЁ]", text)) or 1
-    cyrillic_ratio = cyrillic_count / total_alpha
+    cyrillic_ratio = signals.cyrillic_count / (signals.alpha_count or 1)
 
     if cyrillic_ratio > 0.3 or russian_score >= 2:
         confidence = min(0.6 + (russian_score * 0.1) + (cyrillic_ratio * 0.3), 0.95)
@@ -67,7 +47,7 @@ def detect_language(text: str) -> Tuple[Language, float]:
 
 
 async def detect_language_llm(text: str, llm_service) -> Tuple[Language, float]:
-    """LLM-based language detection for ambiguous cases."""
+    """LLM-based language detection for ambiguous cases (cached by normalized text)."""
     messages = [
         {
             "role": "system",
@@ -79,16 +59,19 @@ async def detect_language_llm(text: str, llm_service) -> Tuple[Language, float]:
         {"role": "user", "content": text},
     ]
 
-    try:
+    async def ask() -> Tuple[str, float]:
         result = await llm_service.complete(
             messages, temperature=0.1, max_tokens=5
         )
         lang_str = result["content"].strip().lower()
         try:
-            lang = Language(lang_str)
-            return lang, 0.9
+            return Language(lang_str).value, 0.9
         except ValueError:
-            return Language.ENGLISH, 0.5
+            return Language.ENGLISH.value, 0.5
+
+    try:
+        label, confidence = await classifier_cache.get_or_compute("language", text, ask)
+        return Language(label), confidence
     except Exception:
         return Language.ENGLISH, 0.5
 
@@ -145,13 +128,41 @@ COMMON_TYPOS = {
 }
 
 
+# Brand/model words for optional fuzzy correction (TYPO_FUZZY_ENABLED).
+# Short or dictionary-like names (sony, oppo, apple ~ apply) are left out.
+FUZZY_VOCABULARY = [
+    "samsung", "galaxy", "iphone", "xiaomi", "redmi", "realme", "huawei",
+    "oneplus", "google", "pixel", "motorola", "nokia", "tecno", "infinix",
+    "smartphone", "telefon", "телефон", "смартфон",
+]
+
+
+def _build_typo_corrector() -> TypoCorrector:
+    """Compile the corrector once, merging any configured data files."""
+    settings = get_settings()
+    typos = dict(COMMON_TYPOS)
+    vocabulary = list(FUZZY_VOCABULARY)
+    try:
+        if settings.TYPO_DICTIONARY_PATH:
+            typos.update(load_typo_file(settings.TYPO_DICTIONARY_PATH))
+        if settings.TYPO_VOCABULARY_PATH:
+            vocabulary.extend(load_word_file(settings.TYPO_VOCABULARY_PATH))
+    except OSError as e:
+        logger.warning(f"Typo data file not loaded: {e}")
+    return TypoCorrector(
+        typos,
+        vocabulary,
+        fuzzy=settings.TYPO_FUZZY_ENABLED,
+        min_length=settings.TYPO_FUZZY_MIN_LENGTH,
+    )
+
+
+TYPO_CORRECTOR = _build_typo_corrector()
+
+
 def correct_typos(text: str) -> str:
-    """Light automatic typo correction."""
-    corrected = text
-    for typo, correction in COMMON_TYPOS.items():
-        pattern = re.compile(re.escape(typo), re.IGNORECASE)
-        corrected = pattern.sub(correction, corrected)
-    return corrected
+    """Light automatic typo correction (single precompiled pass)."""
+    return TYPO_CORRECTOR.correct(text)
 
 
 async def process_language(
@@ -3,12 +3,14 @@ House AI — Memory System
 Short-term (Redis) + Long-term (Supabase) memory management.
 """
 
+import asyncio
 import logging
 from typing import List, Dict, Optional
 
 from app.services.redis_service import RedisService
 from app.services.supabase_service import SupabaseService
 from app.services.llm_service import LLMService
+from app.services.message_writer import MessageWriter
 from app.config import Settings
 
 logger = logging.getLogger("house_ai")
@@ -23,10 +25,12 @@ class MemoryManager:
         supabase: SupabaseService,
         llm: LLMService,
         settings: Settings,
+        writer: Optional[MessageWriter] = None,
     ):
         self.redis = redis
         self.supabase = supabase
         self.llm = llm
+        self.writer = writer
         self.max_context_messages = settings.MAX_CONTEXT_MESSAGES
         self.summarize_threshold = settings.SUMMARIZE_TOKEN_THRESHOLD
 
@@ -37,11 +41,12 @@ class MemoryManager:
         - Load recent messages (short-term memory)
         - Combine into a compact context
         """
-        # 1. Get previous summary from Supabase
-        summary = await self.supabase.get_previous_summary(session_id)
-
-        # 2. Get recent messages from Redis
-        recent_messages = await self.redis.get_session_memory(session_id)
+        # 1–2. Previous summary (Supabase) and recent messages (Redis)
+        # are independent — load them concurrently
+        summary, recent_messages = await asyncio.gather(
+            self.supabase.get_previous_summary(session_id),
+            self.redis.get_session_memory(session_id),
+        )
 
         # 3. If no Redis messages, try Supabase
         if not recent_messages:
@@ -100,32 +105,48 @@ class MemoryManager:
         session_id: str,
         user_message: str,
         assistant_response: str,
-    ) -> None:
-        """Save user and assistant messages to both Redis and Supabase."""
-        # Short-term: Redis
-        await self.redis.add_to_session_memory(session_id, "user", user_message)
-        await self.redis.add_to_session_memory(session_id, "assistant", assistant_response)
+    ) -> int:
+        """
+        Save user and assistant messages to both Redis and Supabase.
+
+        Each message is tokenized once here and its count stored with it.
+        Returns the session's running token total (see should_summarize).
+
+        With a write-behind writer, only the Redis write is awaited; the
+        Supabase rows are persisted by the writer's background batches.
+        """
+        # Short-term: Redis (one round-trip)
+        token_total = await self.redis.append_exchange(
+            session_id, user_message, assistant_response,
+            user_tokens=self.llm.count_tokens(user_message),
+            assistant_tokens=self.llm.count_tokens(assistant_response),
+        )
 
         # Long-term: Supabase
-        await self.supabase.save_message(session_id, "user", user_message)
-        await self.supabase.save_message(session_id, "assistant", assistant_response)
+        if self.writer:
+            self.writer.enqueue(session_id, "user", user_message)
+            self.writer.enqueue(session_id, "assistant", assistant_response)
+        else:
+            await self.supabase.save_message(session_id, "user", user_message)
+            await self.supabase.save_message(session_id, "assistant", assistant_response)
+        return token_total
+
+    def should_summarize(self, token_total: int) -> bool:
+        """O(1) threshold check against the running session token total."""
+        return token_total >= self.summarize_threshold
 
     async def check_and_summarize(self, session_id: str) -> Optional[str]:
         """
         Check if conversation needs summarization.
         If token count exceeds threshold, summarize and store.
         """
-        # Get all messages from Redis
-        messages = await self.redis.get_session_memory(session_id)
-
-        if not messages:
+        # Running total maintained on write — no re-tokenization
+        token_count = await self.redis.get_session_tokens(session_id)
+        if not self.should_summarize(token_count):
             return None
 
-        # Count tokens
-        total_text = " ".join(m.get("content", "") for m in messages)
-        token_count = self.llm.count_tokens(total_text)
-
-        if token_count < self.summarize_threshold:
+        messages, seq = await self.redis.get_session_snapshot(session_id)
+        if not messages:
             return None
 
         logger.info(
@@ -140,13 +161,9 @@ class MemoryManager:
             # Store in Supabase
             await self.supabase.save_summary(session_id, summary)
 
-            # Clear Redis and keep only last 2 messages
-            last_two = messages[-2:] if len(messages) >= 2 else messages
-            await self.redis.clear_session_memory(session_id)
-            for msg in last_two:
-                await self.redis.add_to_session_memory(
-                    session_id, msg["role"], msg["content"]
-                )
+            # Keep the last 2 summarized messages plus anything the user
+            # added while the summary was being generated
+            await self.redis.trim_session_memory(session_id, seq, keep=2)
 
             logger.info(f"Session {session_id} summarized successfully")
             return summary
@@ -0,0 +1,206 @@
+"""
+House AI — Product Name Index
+In-process alias and trigram index over catalogue product names.
+"""
+
+import itertools
+import re
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Spellings users type for common name tokens; "" means the token may be dropped
+TOKEN_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "iphone": ("iphone", "ip", "i"),
+    "galaxy": ("galaxy", "g", ""),
+    "pixel": ("pixel", "px"),
+    "redmi": ("redmi", "rm"),
+    "note": ("note", "n"),
+    "pro": ("pro", "p"),
+    "max": ("max", "m"),
+    "ultra": ("ultra", "u"),
+    "plus": ("plus", "pl"),
+    "mini": ("mini", "mn"),
+    "lite": ("lite", "l"),
+}
+
+MAX_ALIASES_PER_PRODUCT = 256
+MAX_MENTION_TOKENS = 6
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+_NUMBER_RE = re.compile(r"\d+")
+
+
+def _tokens(text: str) -> List[str]:
+    text = unicodedata.normalize("NFKC", text).lower().replace("+", " plus ")
+    return _TOKEN_RE.findall(text)
+
+
+def compact(text: str) -> str:
+    """Lowercase alphanumerics only: "iPhone 15 Pro-Max" → "iphone15promax"."""
+    return "".join(_tokens(text))
+
+
+def _numbers(text: str) -> Set[str]:
+    return {n for token in _tokens(text) for n in _NUMBER_RE.findall(token)}
+
+
+def _trigrams(key: str) -> Set[str]:
+    padded = f"^{key}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _is_model_alias(alias: str) -> bool:
+    # Bare numbers ("14") or words ("galaxy") would match ordinary text
+    return len(alias) >= 3 and any(c.isdigit() for c in alias) and any(c.isalpha() for c in alias)
+
+
+def product_aliases(name: str, brand: str = "") -> Set[str]:
+    """
+    Compact spellings of `name`: every combination of TOKEN_ALIASES
+    variants, with the brand optional in front ("samsung s24 ultra",
+    "s24u"), e.g. "ip15pm" for "iPhone 15 Pro Max".
+    """
+    tokens = _tokens(name)
+    brand_tokens = _tokens(brand)
+    if tokens[:len(brand_tokens)] == brand_tokens:
+        tokens = tokens[len(brand_tokens):]
+    options = [(compact(brand), "")] if brand_tokens else []
+    options += [TOKEN_ALIASES.get(t, (t,)) for t in tokens]
+
+    aliases = {compact(name)}
+    for combo in itertools.islice(itertools.product(*options), MAX_ALIASES_PER_PRODUCT):
+        alias = "".join(combo)
+        if _is_model_alias(alias):
+            aliases.add(alias)
+    return aliases
+
+
+class ProductNameIndex:
+    """
+    Name → product id lookup built from catalogue rows.
+
+    Every compact spelling maps to product ids for exact hits; a trigram
+    index over compact names ranks near misses by Dice
+    similarity. Rows are upserted in place as the catalogue refreshes.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, Any]] = ()):
+        self.names: Dict[str, str] = {}             # id → display name
+        self.first_words: Dict[str, str] = {}       # id → leading name token
+        self.brands: Set[str] = set()
+        self._aliases: Dict[str, Set[str]] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        self._product_keys: Dict[str, Tuple[Set[str], Set[str]]] = {}  # id → (aliases, grams)
+        self.upsert(rows)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    # ── Maintenance ──────────────────────────────────────
+
+    def upsert(self, rows: Iterable[Dict[str, Any]]) -> None:
+        for row in rows:
+            product_id = row["id"]
+            self.remove(product_id)
+            name = row.get("name") or ""
+            key = compact(name)
+            if not key:
+                continue
+            aliases = product_aliases(name, row.get("brand") or "")
+            grams = _trigrams(key)
+            for alias in aliases:
+                self._aliases.setdefault(alias, set()).add(product_id)
+            for gram in grams:
+                self._grams.setdefault(gram, set()).add(product_id)
+            self._product_keys[product_id] = (aliases, grams)
+            self.names[product_id] = name
+            self.first_words[product_id] = _tokens(name)[0]
+            if row.get("brand"):
+                self.brands.add(row["brand"].lower())
+
+    def remove(self, product_id: str) -> None:
+        keys = self._product_keys.pop(product_id, None)
+        if keys is None:
+            return
+        aliases, grams = keys
+        for table, entries in ((self._aliases, aliases), (self._grams, grams)):
+            for entry in entries:
+                ids = table.get(entry)
+                if ids is not None:
+                    ids.discard(product_id)
+                    if not ids:
+                        del table[entry]
+        del self.names[product_id]
+        del self.first_words[product_id]
+
+    # ── Queries ──────────────────────────────────────────
+
+    def _rank_exact(self, key: str, ids: Set[str]) -> List[str]:
+        # Shortest name first: "ip15p" prefers "iPhone 15 Pro" to "iPhone 15 Pro Max"
+        return sorted(ids, key=lambda pid: (compact(self.names[pid]) != key, len(self.names[pid]), pid))
+
+    def lookup(self, text: str, limit: int = 5, min_score: float = 0.5) -> List[Tuple[str, float]]:
+        """Best (product_id, score) candidates for a product name, best first."""
+        key = compact(text)
+        if not key:
+            return []
+        exact = self._aliases.get(key)
+        if exact:
+            return [(pid, 1.0) for pid in self._rank_exact(key, exact)[:limit]]
+
+        grams = _trigrams(key)
+        overlaps: Counter = Counter()
+        for gram in grams:
+            overlaps.update(self._grams.get(gram, ()))
+        scored = [
+            (pid, 2 * shared / (len(grams) + len(self._product_keys[pid][1])))
+            for pid, shared in overlaps.items()
+        ]
+        scored = [(pid, round(score, 3)) for pid, score in scored if score >= min_score]
+        scored.sort(key=lambda item: (-item[1], len(self.names[item[0]])))
+        return scored[:limit]
+
+    def best(self, text: str, min_score: float = 0.5) -> Optional[str]:
+        """
+        Id of the product `text` names, or None. A near miss only counts
+        if its name carries every number in `text`, so "iPhone 16" never
+        resolves to "iPhone 15" while the catalogue lacks it.
+        """
+        numbers = _numbers(text)
+        for product_id, score in self.lookup(text, min_score=min_score):
+            if score == 1.0 or numbers <= _numbers(self.names[product_id]):
+                return product_id
+        return None
+
+    def find_in_text(self, text: str) -> List[str]:
+        """
+        Ids of products mentioned in free text, in order of appearance,
+        by greedy longest match of up to MAX_MENTION_TOKENS tokens.
+        """
+        tokens = _tokens(text)
+        found: List[str] = []
+        i = 0
+        while i < len(tokens):
+            for j in range(min(len(tokens), i + MAX_MENTION_TOKENS), i, -1):
+                key = "".join(tokens[i:j])
+                ids = self._aliases.get(key)
+                if ids:
+                    product_id = self._rank_exact(key, ids)[0]
+                    if product_id not in found:
+                        found.append(product_id)
+                    i = j
+                    break
+            else:
+                i += 1
+        return found
+
+    def brand_in_text(self, text: str) -> Optional[str]:
+        """First catalogue brand named as a word in `text`."""
+        for token in _tokens(text):
+            if token in self.brands:
+                return token
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        return {"products": len(self.names), "aliases": len(self._aliases), "trigrams": len(self._grams)}
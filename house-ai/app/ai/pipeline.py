@@ -0,0 +1,140 @@
+"""
+House AI — Chat Pre-processing Pipeline
+Runs the independent pre-routing stages of a chat turn concurrently.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from app.models.schemas import Language
+from app.services.llm_service import LLMService
+from app.services.supabase_service import SupabaseService
+from app.ai.intent import classify_intent
+from app.ai.emotion import detect_emotion
+from app.ai.language import process_language
+from app.ai.memory import MemoryManager
+from app.ai.cost_control import CostController
+
+logger = logging.getLogger("house_ai")
+
+
+class StageTimer:
+    """Collects wall-clock durations (ms) of named pipeline stages."""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._start = time.perf_counter()
+
+    async def run(self, name: str, coro) -> Any:
+        """Await a stage coroutine and record how long it took."""
+        start = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            self.timings[name] = round((time.perf_counter() - start) * 1000, 2)
+
+    def total(self) -> float:
+        return round((time.perf_counter() - self._start) * 1000, 2)
+
+
+async def _analyze_text(
+    message: str,
+    override: Optional[Language],
+    llm: Optional[LLMService],
+    timer: StageTimer,
+    language_llm: bool = True,
+) -> Dict[str, Any]:
+    """
+    Language → intent → emotion. Sequential: each needs the corrected text.
+    Without `llm` only the rule-based and local-model classifiers run.
+    """
+    corrected_text, language = await timer.run(
+        "language",
+        process_language(message, override=override, llm_service=llm if language_llm else None),
+    )
+    intent, intent_conf = await timer.run(
+        "intent", classify_intent(corrected_text, llm)
+    )
+    emotion, emotion_conf = detect_emotion(corrected_text)
+    return {
+        "corrected_text": corrected_text,
+        "language": language,
+        "intent": intent,
+        "intent_conf": intent_conf,
+        "emotion": emotion,
+        "emotion_conf": emotion_conf,
+    }
+
+
+async def _load_profile(
+    supabase: SupabaseService, user_id: str
+) -> Optional[Dict[str, Any]]:
+    try:
+        return await supabase.get_user_profile(user_id)
+    except Exception:
+        return None  # Personalization is optional — never fail the request
+
+
+async def preprocess(
+    message: str,
+    session_id: str,
+    user_id: Optional[str],
+    llm: LLMService,
+    supabase: SupabaseService,
+    memory: MemoryManager,
+    cost_ctrl: CostController,
+    language_override: Optional[Language] = None,
+    language_llm: bool = True,
+) -> Dict[str, Any]:
+    """
+    Run every pre-routing stage of a chat turn and join the results.
+
+    For a signed-in user the budget check runs first (one Redis read):
+    an exhausted budget skips every stage that could call the LLM, and
+    the caller only needs the rule-based language for its reply.
+    Otherwise text analysis (language → intent → emotion) is one
+    dependent chain, and the memory summary, recent messages and user
+    profile do not depend on it, so they run concurrently in a task group.
+    `language_llm=False` keeps language detection rule-based.
+    """
+    timer = StageTimer()
+    profile_task = None
+    budget = (True, cost_ctrl.daily_budget)
+
+    if user_id:
+        budget = await timer.run("budget", cost_ctrl.check_budget(user_id))
+        if not budget[0]:
+            result = await _analyze_text(message, language_override, None, timer)
+            result["context"] = {"summary": None, "recent_messages": []}
+            result["user_profile"] = None
+            result["budget"] = budget
+            result["timings"] = {**timer.timings, "total": timer.total()}
+            return result
+
+    async with asyncio.TaskGroup() as tg:
+        analysis_task = tg.create_task(
+            _analyze_text(message, language_override, llm, timer, language_llm)
+        )
+        context_task = tg.create_task(
+            timer.run("memory", memory.get_context(session_id))
+        )
+        if user_id:
+            profile_task = tg.create_task(
+                timer.run("profile", _load_profile(supabase, user_id))
+            )
+
+    result = analysis_task.result()
+    result["context"] = context_task.result()
+    result["user_profile"] = profile_task.result() if profile_task else None
+    result["budget"] = budget
+    result["timings"] = {**timer.timings, "total": timer.total()}
+
+    logger.info(json.dumps({
+        "event": "chat_preprocess",
+        "session_id": session_id,
+        "timings_ms": result["timings"],
+    }))
+    return result
@@ -3,13 +3,17 @@ House AI — RAG Pipeline
 Cost-efficient retrieval-augmented generation with vector search and Brave fallback.
 """
 
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+from contextlib import aclosing
+from typing import Any, AsyncGenerator, Dict, List, Optional
 
 from app.services.llm_service import LLMService
 from app.services.supabase_service import SupabaseService
 from app.services.search_service import SearchService
 from app.services.redis_service import RedisService
+from app.ai.semantic_cache import SemanticCache
+from app.models.response_models import StreamChunk
 from app.config import Settings
 
 logger = logging.getLogger("house_ai")
@@ -22,6 +26,8 @@ class RAGPipeline:
         self.top_k = settings.RAG_TOP_K
         self.similarity_threshold = settings.RAG_SIMILARITY_THRESHOLD
         self.cache_ttl = settings.CACHE_TTL_RAG
+        self.retrieval_timeout = settings.RAG_RETRIEVAL_TIMEOUT
+        self.speculative_web_search = settings.RAG_SPECULATIVE_WEB_SEARCH
 
     async def query(
         self,
@@ -33,35 +39,151 @@ class RAGPipeline:
         language: str = "en",
         system_context: str = "",
         conversation_history: Optional[Dict[str, Any]] = None,
+        semantic_cache: Optional[SemanticCache] = None,
     ) -> Dict:
         """
         Full RAG pipeline:
-        1. Check cache
+        1. Check cache (exact key, then semantic match on the embedding)
         2. Embed user query
-        3. Vector search in Supabase
-        4. If similarity low → call Web Search
+        3. Vector search in Supabase (products + blog posts concurrently,
+           bounded by RAG_RETRIEVAL_TIMEOUT)
+        4. If similarity low → call Web Search (or use the speculative one)
         5. Merge context
         6. Generate grounded response
         7. Cache result
         """
+        # 1–5. Cache lookup and retrieval
+        prepared = await self._prepare(
+            user_query, llm, supabase, search, redis, language, semantic_cache
+        )
+        if "cached" in prepared:
+            return prepared["cached"]
+
+        # 6. Generate grounded response
+        result = await self._generate_response(
+            llm=llm,
+            query=user_query,
+            context=prepared["context"],
+            has_context=prepared["has_context"],
+            used_web_search=prepared["used_web_search"],
+            sources=prepared["sources"],
+            language=language,
+            system_context=system_context,
+            conversation_history=conversation_history,
+        )
+
+        # 7. Cache result
+        await self._store(user_query, prepared, language, result, redis, semantic_cache)
+        return result
+
+    async def stream_query(
+        self,
+        user_query: str,
+        llm: LLMService,
+        supabase: SupabaseService,
+        search: SearchService,
+        redis: RedisService,
+        language: str = "en",
+        system_context: str = "",
+        conversation_history: Optional[Dict[str, Any]] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        result: Optional[Dict[str, Any]] = None,
+    ) -> AsyncGenerator[StreamChunk, None]:
+        """
+        Streaming variant of `query`: retrieval as before, then the answer
+        as `text` chunks token by token (a cache hit is sent in one chunk).
+        `result`, if given, is filled with the same dict `query` returns.
+        """
+        result = result if result is not None else {}
+        prepared = await self._prepare(
+            user_query, llm, supabase, search, redis, language, semantic_cache
+        )
+        if "cached" in prepared:
+            result.update(prepared["cached"])
+            yield StreamChunk(type="text", content=result.get("message", ""))
+            return
+
+        messages = self._build_messages(
+            user_query, prepared["context"], prepared["has_context"],
+            prepared["used_web_search"], prepared["sources"], language,
+            system_context, conversation_history,
+        )
+        usage: Dict[str, Any] = {}
+        parts: List[str] = []
+        try:
+            async with aclosing(llm.stream(messages, temperature=0.5, usage=usage)) as tokens:
+                async for token in tokens:
+                    parts.append(token)
+                    yield StreamChunk(type="text", content=token)
+        except Exception as e:
+            logger.error(f"RAG streaming error: {e}")
+            if not parts:
+                result.update(self._error_result(language))
+                yield StreamChunk(type="text", content=result["message"])
+                return
+            raise
+        finally:
+            # Partial answer if the consumer stopped early; the full one replaces it below
+            result.setdefault("message", "".join(parts))
+            result.setdefault("tokens_used", usage.get("total", 0))
+
+        result.update({
+            "message": "".join(parts),
+            "sources": prepared["sources"] if prepared["used_web_search"] else [],
+            "tokens_used": usage.get("total", 0),
+            "model": usage.get("model", ""),
+            "used_web_search": prepared["used_web_search"],
+            "context_found": prepared["has_context"],
+        })
+        await self._store(user_query, prepared, language, result, redis, semantic_cache)
+
+    async def _prepare(
+        self,
+        user_query: str,
+        llm: LLMService,
+        supabase: SupabaseService,
+        search: SearchService,
+        redis: RedisService,
+        language: str,
+        semantic_cache: Optional[SemanticCache],
+    ) -> Dict[str, Any]:
+        """
+        Cache checks and retrieval. Returns {"cached": result} on a hit,
+        otherwise the merged context and the embedding for storing later.
+        """
         # 1. Check cache
-        cache_key = redis.rag_cache_key(user_query)
+        cache_key = redis.rag_cache_key(user_query, language)
         cached = await redis.get_cached(cache_key)
         if cached:
             logger.info(f"RAG cache hit: {user_query[:50]}")
-            return cached
+            return {"cached": cached}
+
+        # Speculative web search does not need the embedding — start it now
+        web_task = None
+        if self.speculative_web_search:
+            web_task = asyncio.create_task(
+                search.search(f"smartphone {user_query}", count=3)
+            )
 
         # 2. Embed user query
-        query_embedding = await llm.embed_single(user_query)
+        try:
+            query_embedding = await llm.embed_single(user_query)
+        except BaseException:
+            if web_task:
+                web_task.cancel()
+            raise
 
-        # 3. Vector search — products
-        product_results = await supabase.search_products_by_embedding(
-            query_embedding, top_k=self.top_k, threshold=self.similarity_threshold
-        )
+        # 1b. Semantic cache — a near-identical query was already answered
+        if semantic_cache:
+            cached = await semantic_cache.lookup(query_embedding, language, redis)
+            if cached:
+                if web_task:
+                    web_task.cancel()
+                return {"cached": cached}
 
-        # 4. Vector search — blog posts
-        blog_results = await supabase.search_blog_posts_by_embedding(
-            query_embedding, top_k=self.top_k, threshold=self.similarity_threshold
+        # 3–4. Retrieval — products + blog posts (+ web search) concurrently
+        product_results, blog_results, search_results = await self._retrieve(
+            query_embedding, supabase, web_task
         )
 
         # 5. Build context
@@ -81,10 +203,11 @@ class RAGPipeline:
 
         # 6. If no results or low quality, try Web search
         if not product_results and not blog_results:
-            logger.info("No vector results, falling back to Web search")
-            search_results = await search.search(
-                f"smartphone {user_query}", count=3
-            )
+            if search_results is None:
+                logger.info("No vector results, falling back to Web search")
+                search_results = await search.search(
+                    f"smartphone {user_query}", count=3
+                )
             if search_results:
                 search_context = search.build_context(search_results)
                 context_parts.append(search_context)
@@ -92,26 +215,77 @@ class RAGPipeline:
                 used_web_search = True
 
         # 7. Merge context
-        merged_context = "\n\n".join(context_parts) if context_parts else ""
+        return {
+            "cache_key": cache_key,
+            "embedding": query_embedding,
+            "context": "\n\n".join(context_parts) if context_parts else "",
+            "has_context": bool(context_parts),
+            "used_web_search": used_web_search,
+            "sources": sources,
+        }
 
-        # 8. Generate grounded response
-        result = await self._generate_response(
-            llm=llm,
-            query=user_query,
-            context=merged_context,
-            has_context=bool(context_parts),
-            used_web_search=used_web_search,
-            sources=sources,
-            language=language,
-            system_context=system_context,
-            conversation_history=conversation_history,
+    async def _store(
+        self,
+        user_query: str,
+        prepared: Dict[str, Any],
+        language: str,
+        result: Dict,
+        redis: RedisService,
+        semantic_cache: Optional[SemanticCache],
+    ) -> None:
+        """Cache a successful answer under the exact and semantic keys."""
+        if result.get("message") and result.get("model"):
+            await redis.set_cached(prepared["cache_key"], result, self.cache_ttl)
+            if semantic_cache:
+                await semantic_cache.store(
+                    user_query, prepared["embedding"], language, result, redis
+                )
+
+    async def _retrieve(
+        self,
+        query_embedding: List[float],
+        supabase: SupabaseService,
+        web_task: Optional[asyncio.Task] = None,
+    ) -> tuple:
+        """
+        Issue all retrievals concurrently and wait at most
+        `retrieval_timeout` seconds; stragglers are cancelled and treated
+        as empty. Returns (products, blog_posts, web_results) where
+        web_results is None unless a speculative web search was started.
+        """
+        tasks = {
+            "products": asyncio.create_task(
+                supabase.search_products_by_embedding(
+                    query_embedding, top_k=self.top_k, threshold=self.similarity_threshold
+                )
+            ),
+            "blog": asyncio.create_task(
+                supabase.search_blog_posts_by_embedding(
+                    query_embedding, top_k=self.top_k, threshold=self.similarity_threshold
+                )
+            ),
+        }
+        if web_task:
+            tasks["web"] = web_task
+
+        done, pending = await asyncio.wait(
+            tasks.values(), timeout=self.retrieval_timeout
         )
+        for task in pending:
+            task.cancel()
 
-        # 9. Cache result
-        if result.get("message"):
-            await redis.set_cached(cache_key, result, self.cache_ttl)
+        results = {}
+        for name, task in tasks.items():
+            if task in done and not task.cancelled() and task.exception() is None:
+                results[name] = task.result()
+            else:
+                if task in pending:
+                    logger.warning(
+                        f"RAG retrieval '{name}' exceeded {self.retrieval_timeout}s deadline"
+                    )
+                results[name] = [] if name != "web" else None
 
-        return result
+        return results["products"], results["blog"], results.get("web")
 
     def _format_product_context(self, products: List[Dict]) -> str:
         """Format product results as context for LLM."""
@@ -143,9 +317,8 @@ class RAGPipeline:
             )
         return "\n".join(parts)
 
-    async def _generate_response(
+    def _build_messages(
         self,
-        llm: LLMService,
         query: str,
         context: str,
         has_context: bool,
@@ -154,8 +327,8 @@ class RAGPipeline:
         language: str,
         system_context: str = "",
         conversation_history: Optional[Dict[str, Any]] = None,
-    ) -> Dict:
-        """Generate a grounded response using retrieved context."""
+    ) -> List[Dict[str, str]]:
+        """Prompt for a grounded response using retrieved context."""
         lang_instruction = {
             "en": "Respond in English.",
             "uz": "O'zbek tilida javob bering.",
@@ -210,6 +383,26 @@ class RAGPipeline:
         # Add current user query
         messages.append({"role": "user", "content": query})
 
+        return messages
+
+    async def _generate_response(
+        self,
+        llm: LLMService,
+        query: str,
+        context: str,
+        has_context: bool,
+        used_web_search: bool,
+        sources: List[str],
+        language: str,
+        system_context: str = "",
+        conversation_history: Optional[Dict[str, Any]] = None,
+    ) -> Dict:
+        """Generate a grounded response using retrieved context."""
+        messages = self._build_messages(
+            query, context, has_context, used_web_search, sources,
+            language, system_context, conversation_history,
+        )
+
         try:
             result = await llm.complete(messages, temperature=0.5)
             return {
@@ -222,14 +415,17 @@ class RAGPipeline:
             }
         except Exception as e:
             logger.error(f"RAG generation error: {e}")
-            return {
-                "message": self._fallback_message(language),
-                "sources": [],
-                "tokens_used": 0,
-                "model": "",
-                "used_web_search": False,
-                "context_found": False,
-            }
+            return self._error_result(language)
+
+    def _error_result(self, language: str) -> Dict:
+        return {
+            "message": self._fallback_message(language),
+            "sources": [],
+            "tokens_used": 0,
+            "model": "",
+            "used_web_search": False,
+            "context_found": False,
+        }
 
     @staticmethod
     def _fallback_message(language: str) -> str:
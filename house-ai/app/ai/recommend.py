@@ -4,21 +4,26 @@ Dynamic scoring with user intent-based weight adjustment.
 """
 
 import logging
-from typing import List, Dict, Optional
+from contextlib import aclosing
+from typing import AsyncGenerator, Dict, List, Optional, Tuple
 
 from app.models.schemas import Product, Intent
-from app.models.response_models import ProductCard
+from app.models.response_models import ProductCard, StreamChunk
 from app.services.supabase_service import SupabaseService
 from app.services.llm_service import LLMService
+from app.ai.catalogue import ProductCatalogue
 from app.config import Settings
 
 logger = logging.getLogger("house_ai")
 
+EXPLANATION_FALLBACK = "Here are my top recommendations based on your preferences:"
+
 
 class RecommendationEngine:
     """Dynamic product recommendation engine."""
 
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, catalogue: Optional[ProductCatalogue] = None):
+        self.catalogue = catalogue
         self.base_weights = {
             "value": settings.WEIGHT_VALUE,
             "gaming": settings.WEIGHT_GAMING,
@@ -93,35 +98,112 @@ class RecommendationEngine:
     ) -> Dict:
         """
         Full recommendation pipeline:
-        1. Fetch products (optionally filtered by budget)
-        2. Score and rank
+        1. Rank the whole catalogue snapshot (or fetch from DB until it loads)
+        2. Build product cards
         3. Generate explanation via LLM
         """
-        # 1. Fetch products
-        products = await supabase.get_products(
-            min_price=budget_min,
-            max_price=budget_max,
-            limit=20,
-        )
+        weights = self.adjust_weights(focus)
 
-        if not products:
+        # 1. Score and rank
+        top_products = await self._rank(supabase, weights, budget_min, budget_max, top_k)
+        if not top_products:
             return {
                 "products": [],
                 "message": self._no_products_message(language),
                 "tokens_used": 0,
             }
 
-        # 2. Score and rank
+        # 2. Build product cards
+        cards = self._build_cards(top_products, weights)
+
+        # 3. Generate explanation
+        explanation, tokens = await self._generate_explanation(
+            llm, cards, query, focus, language
+        )
+
+        return {
+            "products": cards,
+            "message": explanation,
+            "tokens_used": tokens,
+        }
+
+    async def stream_recommend(
+        self,
+        supabase: SupabaseService,
+        llm: LLMService,
+        query: str,
+        focus: Optional[str] = None,
+        budget_min: Optional[float] = None,
+        budget_max: Optional[float] = None,
+        language: str = "en",
+        top_k: int = 5,
+        result: Optional[Dict] = None,
+    ) -> AsyncGenerator[StreamChunk, None]:
+        """
+        Streaming variant of `recommend`: one `product` chunk with the
+        cards as soon as ranking is done, then the explanation token by
+        token. `result`, if given, is filled with what `recommend` returns.
+        """
+        result = result if result is not None else {}
         weights = self.adjust_weights(focus)
-        scored = []
-        for p in products:
-            score = self.calculate_score(p, weights)
-            scored.append((score, p))
 
+        top_products = await self._rank(supabase, weights, budget_min, budget_max, top_k)
+        if not top_products:
+            result.update(products=[], message=self._no_products_message(language), tokens_used=0)
+            yield StreamChunk(type="text", content=result["message"])
+            return
+
+        cards = self._build_cards(top_products, weights)
+        yield StreamChunk(
+            type="product", data={"products": [c.model_dump() for c in cards]}
+        )
+
+        usage: Dict = {}
+        parts: List[str] = []
+        messages = self._explanation_messages(cards, query, focus, language)
+        try:
+            async with aclosing(llm.stream(messages, temperature=0.7, usage=usage)) as tokens:
+                async for token in tokens:
+                    parts.append(token)
+                    yield StreamChunk(type="text", content=token)
+        except Exception as e:
+            logger.error(f"Recommendation explanation stream error: {e}")
+            if parts:
+                raise
+            parts = [EXPLANATION_FALLBACK]
+            yield StreamChunk(type="text", content=EXPLANATION_FALLBACK)
+        finally:
+            # Partial answer if the consumer stopped early; the full one replaces it below
+            result.setdefault("message", "".join(parts))
+            result.setdefault("tokens_used", usage.get("total", 0))
+
+        result.update(products=cards, message="".join(parts), tokens_used=usage.get("total", 0))
+
+    async def _rank(
+        self,
+        supabase: SupabaseService,
+        weights: Dict[str, float],
+        budget_min: Optional[float],
+        budget_max: Optional[float],
+        top_k: int,
+    ) -> List[Tuple[float, Dict]]:
+        """Top (score, product) pairs, from the catalogue or the DB until it loads."""
+        if self.catalogue is not None and self.catalogue.ready:
+            return self.catalogue.top_k(
+                weights, top_k, min_price=budget_min, max_price=budget_max
+            )
+        products = await supabase.get_products(
+            min_price=budget_min,
+            max_price=budget_max,
+            limit=20,
+        )
+        scored = [(self.calculate_score(p, weights), p) for p in products]
         scored.sort(key=lambda x: x[0], reverse=True)
-        top_products = scored[:top_k]
+        return scored[:top_k]
 
-        # 3. Build product cards
+    def _build_cards(
+        self, top_products: List[Tuple[float, Dict]], weights: Dict[str, float]
+    ) -> List[ProductCard]:
         cards = []
         for score, p in top_products:
             card = ProductCard(
@@ -145,17 +227,7 @@ class RecommendationEngine:
                 best_for=self._best_use_case(p, weights),
             )
             cards.append(card)
-
-        # 4. Generate explanation
-        explanation, tokens = await self._generate_explanation(
-            llm, cards, query, focus, language
-        )
-
-        return {
-            "products": cards,
-            "message": explanation,
-            "tokens_used": tokens,
-        }
+        return cards
 
     def _identify_strengths(
         self, product: Dict, weights: Dict[str, float]
@@ -213,15 +285,14 @@ class RecommendationEngine:
         else:
             return "Balanced daily use"
 
-    async def _generate_explanation(
+    def _explanation_messages(
         self,
-        llm: LLMService,
         cards: List[ProductCard],
         query: str,
         focus: Optional[str],
         language: str,
-    ) -> tuple:
-        """Generate a natural language explanation of recommendations."""
+    ) -> List[Dict[str, str]]:
+        """Prompt for a natural language explanation of recommendations."""
         products_text = "\n".join(
             f"- {c.name} ({c.brand}): Score {c.overall_score}/10, "
             f"Price: {c.price:,.0f} {c.currency}, "
@@ -256,12 +327,25 @@ class RecommendationEngine:
         if focus:
             messages[0]["content"] += f"\nUser's focus: {focus}"
 
+        return messages
+
+    async def _generate_explanation(
+        self,
+        llm: LLMService,
+        cards: List[ProductCard],
+        query: str,
+        focus: Optional[str],
+        language: str,
+    ) -> tuple:
+        """Generate a natural language explanation of recommendations."""
+        messages = self._explanation_messages(cards, query, focus, language)
+
         try:
             result = await llm.complete(messages, temperature=0.7)
             return result["content"], result["tokens"]["total"]
         except Exception as e:
             logger.error(f"Recommendation explanation error: {e}")
-            return "Here are my top recommendations based on your preferences:", 0
+            return EXPLANATION_FALLBACK, 0
 
     @staticmethod
     def _no_products_message(language: str) -> str:
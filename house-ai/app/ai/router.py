@@ -1,14 +1,17 @@
 """
 House AI — Main API Router
-REST + WebSocket streaming endpoints. Central chat orchestrator.
+REST, WebSocket and SSE streaming endpoints. Central chat orchestrator.
 """
 
 import json
 import uuid
+import asyncio
 import logging
-from typing import Optional
+from contextlib import aclosing
+from typing import AsyncGenerator, Optional, Set
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
+from fastapi import APIRouter, WebSocket, Depends, Request
+from fastapi.responses import StreamingResponse
 
 from app.config import get_settings, Settings
 from app.models.schemas import (
@@ -21,6 +24,7 @@ from app.models.response_models import (
 )
 from app.dependencies import (
     get_llm, get_supabase, get_redis, get_search, get_currency,
+    get_semantic_cache, get_message_writer, get_summarizer, get_catalogue,
     get_current_user,
 )
 from app.services.llm_service import LLMService
@@ -28,14 +32,20 @@ from app.services.supabase_service import SupabaseService
 from app.services.redis_service import RedisService
 from app.services.search_service import SearchService
 from app.services.currency_service import CurrencyService
-from app.ai.intent import classify_intent
-from app.ai.emotion import detect_emotion, get_tone_instruction
-from app.ai.language import process_language, get_language_instruction
+from app.services.message_writer import MessageWriter
+from app.ai.emotion import get_tone_instruction
+from app.ai.language import get_language_instruction
 from app.ai.memory import MemoryManager
 from app.ai.cost_control import CostController
 from app.ai.recommend import RecommendationEngine
+from app.ai.catalogue import ProductCatalogue
+from app.ai.name_index import ProductNameIndex
 from app.ai.compare import ComparisonEngine
 from app.ai.rag import RAGPipeline
+from app.ai.semantic_cache import SemanticCache
+from app.ai.summarizer import BackgroundSummarizer
+from app.ai.pipeline import preprocess
+from app.ai.connection import ChatConnection, Turn
 from app.middleware import detect_prompt_injection
 
 logger = logging.getLogger("house_ai")
@@ -120,6 +130,10 @@ async def chat(
     redis: RedisService = Depends(get_redis),
     search: SearchService = Depends(get_search),
     currency: CurrencyService = Depends(get_currency),
+    semantic_cache: SemanticCache = Depends(get_semantic_cache),
+    writer: MessageWriter = Depends(get_message_writer),
+    summarizer: BackgroundSummarizer = Depends(get_summarizer),
+    catalogue: ProductCatalogue = Depends(get_catalogue),
     user: Optional[dict] = Depends(get_current_user),
     settings: Settings = Depends(get_settings),
 ):
@@ -137,60 +151,35 @@ async def chat(
         session_id = request.session_id or str(uuid.uuid4())
         user_id = request.user_id or (user["user_id"] if user else None)
 
-        # 2. Cost control: budget check
+        # 2–6. Pre-processing: text analysis runs alongside memory,
+        # profile and budget lookups (see app/ai/pipeline.py)
         cost_ctrl = CostController(redis, settings)
-        if user_id:
-            allowed, remaining = await cost_ctrl.check_budget(user_id)
-            if not allowed:
-                lang = request.language.value if request.language else "en"
-                return ChatResponse(
-                    message=cost_ctrl.budget_exceeded_message(lang),
-                    session_id=session_id,
-                )
-
-        # 3. Language processing
-        corrected_text, language = await process_language(
-            request.message,
-            override=request.language,
-            llm_service=llm,
+        memory = MemoryManager(redis, supabase, llm, settings, writer)
+        prep = await preprocess(
+            request.message, session_id, user_id,
+            llm, supabase, memory, cost_ctrl,
+            language_override=request.language,
         )
-
-        # 4. Intent classification
-        intent, intent_conf = await classify_intent(corrected_text, llm)
-
-        # 5. Emotion detection
-        emotion, emotion_conf = detect_emotion(corrected_text)
-
-        # 6. Memory context
-        memory = MemoryManager(redis, supabase, llm, settings)
-        context = await memory.get_context(session_id)
-
-        # 6b. Fetch user profile for personalization (non-blocking)
-        user_profile = None
-        if user_id:
-            try:
-                user_profile = await supabase.get_user_profile(user_id)
-            except Exception:
-                pass  # Personalization is optional — never fail the request
+        corrected_text = prep["corrected_text"]
+        language = prep["language"]
+        intent, intent_conf = prep["intent"], prep["intent_conf"]
+        emotion = prep["emotion"]
+        context = prep["context"]
+        user_profile = prep["user_profile"]
+
+        allowed, _ = prep["budget"]
+        if not allowed:
+            return ChatResponse(
+                message=cost_ctrl.budget_exceeded_message(language.value),
+                session_id=session_id,
+            )
 
         # 7. Build system prompt
-        personalization_context = ""
-        if user_profile:
-            name = user_profile.get("full_name") or user_profile.get("username", "")
-            order_count = user_profile.get("order_count", 0)
-            role = user_profile.get("role", "user")
-            if name:
-                personalization_context += f"\nUser's name: {name}. Address them personally when appropriate."
-            if order_count > 0:
-                personalization_context += f"\nThis user has made {order_count} previous orders — they are an experienced buyer."
-            if role in ("seller", "blogger"):
-                personalization_context += f"\nUser is a {role} on the platform."
-
         system_prompt = (
             BASE_SYSTEM_PROMPT
             + get_language_instruction(language) + "\n"
             + get_tone_instruction(emotion) + "\n"
-            + personalization_context
+            + _personalization_context(user_profile)
         )
 
         # 8. Route by intent
@@ -203,7 +192,7 @@ async def chat(
             try:
                 # Extract focus from query
                 focus = _extract_focus(corrected_text)
-                rec_engine = RecommendationEngine(settings)
+                rec_engine = RecommendationEngine(settings, catalogue)
                 rec_result = await rec_engine.recommend(
                     supabase, llm, corrected_text,
                     focus=focus, language=language.value,
@@ -213,7 +202,9 @@ async def chat(
                 tokens_used = rec_result.get("tokens_used", 0)
                 # Supplement with real platform listings (non-blocking)
                 try:
-                    brand_term = _extract_brand_from_query(corrected_text)
+                    brand_term = _extract_brand_from_query(
+                        corrected_text, catalogue.names if catalogue.ready else None
+                    )
                     platform_prods = await supabase.get_platform_products(
                         search_term=brand_term, limit=5
                     )
@@ -258,9 +249,11 @@ async def chat(
 
         elif intent == Intent.COMPARISON:
             # Extract product names
-            product_names = _extract_product_names(corrected_text)
+            product_names = _extract_product_names(
+                corrected_text, catalogue.names if catalogue.ready else None
+            )
             if len(product_names) >= 2:
-                comp_engine = ComparisonEngine()
+                comp_engine = ComparisonEngine(settings, redis, catalogue)
                 comp_result = await comp_engine.compare(
                     supabase, llm, product_names, language=language.value,
                 )
@@ -274,7 +267,7 @@ async def chat(
                     rag_result = await rag.query(
                         corrected_text, llm, supabase, search, redis,
                         language=language.value, system_context=system_prompt,
-                        conversation_history=context,
+                        conversation_history=context, semantic_cache=semantic_cache,
                     )
                     response_text = rag_result["message"]
                     sources = rag_result.get("sources")
@@ -314,6 +307,7 @@ async def chat(
                 rag_result = await rag.query(
                     corrected_text, llm, supabase, search, redis,
                     language=language.value, system_context=system_prompt,
+                    semantic_cache=semantic_cache,
                 )
                 response_text = rag_result["message"]
                 sources = rag_result.get("sources")
@@ -367,10 +361,11 @@ async def chat(
             tokens_used = result["tokens"]["total"]
 
         # 9. Save exchange to memory
-        await memory.save_exchange(session_id, request.message, response_text)
+        token_total = await memory.save_exchange(session_id, request.message, response_text)
 
-        # 10. Check if summarization needed
-        await memory.check_and_summarize(session_id)
+        # 10. Summarize in the background once the session crosses the threshold
+        if memory.should_summarize(token_total):
+            summarizer.schedule(session_id)
 
         # 11. Track token usage
         if user_id and tokens_used > 0:
@@ -411,135 +406,344 @@ async def chat_stream(
     redis: RedisService = Depends(get_redis),
     search: SearchService = Depends(get_search),
     currency: CurrencyService = Depends(get_currency),
+    semantic_cache: SemanticCache = Depends(get_semantic_cache),
+    writer: MessageWriter = Depends(get_message_writer),
+    summarizer: BackgroundSummarizer = Depends(get_summarizer),
+    catalogue: ProductCatalogue = Depends(get_catalogue),
     settings: Settings = Depends(get_settings),
 ):
-    """WebSocket endpoint for streaming chat responses with full intent routing."""
+    """
+    WebSocket endpoint for streaming chat responses with full intent routing.
+
+    Client frames are `{"message": ..., "session_id": ...}` or
+    `{"type": "cancel"}`; see ChatConnection for queueing and cancel.
+    """
     await websocket.accept()
 
-    try:
-        while True:
-            # Receive message
-            data = await websocket.receive_text()
-            request = json.loads(data)
+    # Stateless wrappers over the shared services; one pair per connection
+    memory = MemoryManager(redis, supabase, llm, settings, writer)
+    cost_ctrl = CostController(redis, settings)
 
-            message = request.get("message", "")
-            session_id = request.get("session_id", str(uuid.uuid4()))
+    async def prepare(turn: Turn) -> dict:
+        # Language, intent, emotion and memory context (concurrent).
+        # Language detection stays rule-based here, as before the pipeline.
+        return await preprocess(
+            turn.message, turn.session_id, None, llm, supabase, memory, cost_ctrl,
+            language_llm=False,
+        )
 
-            if not message:
-                await websocket.send_json(
-                    StreamChunk(type="error", content="Empty message").model_dump()
-                )
-                continue
+    def respond(prep: dict, reply: dict) -> AsyncGenerator[StreamChunk, None]:
+        return _stream_reply(
+            prep, memory, cost_ctrl, llm, supabase, redis, search,
+            currency, semantic_cache, catalogue, settings, reply,
+        )
 
-            # Prompt injection check
-            if detect_prompt_injection(message):
-                await websocket.send_json(
-                    StreamChunk(
-                        type="text",
-                        content="I'm sorry, I can only help with smartphone-related questions."
-                    ).model_dump()
-                )
-                await websocket.send_json(StreamChunk(type="done").model_dump())
-                continue
+    async def finish(turn: Turn, reply: dict) -> None:
+        # Save exchange to memory
+        token_total = await memory.save_exchange(turn.session_id, turn.message, reply.get("message", ""))
+        if memory.should_summarize(token_total):
+            summarizer.schedule(turn.session_id)
 
-            # Process language, intent, emotion
-            corrected_text, language = await process_language(message)
-            intent, intent_conf = await classify_intent(corrected_text, llm)
-            emotion, _ = detect_emotion(corrected_text)
+    try:
+        await ChatConnection(websocket, settings, prepare, respond, finish).run()
+    except Exception as e:
+        import traceback
+        logger.error(f"WebSocket error: {type(e).__name__}: {e}\n{traceback.format_exc()}")
+        try:
+            await websocket.send_json(
+                StreamChunk(type="error", content="A server error occurred. Please reconnect.").model_dump()
+            )
+        except Exception:
+            pass
 
-            # Memory context
-            memory = MemoryManager(redis, supabase, llm, settings)
-            context = await memory.get_context(session_id)
-            cost_ctrl = CostController(redis, settings)
+async def _stream_llm(
+    llm: LLMService,
+    messages: list,
+    reply: dict,
+    model: Optional[str] = None,
+) -> AsyncGenerator[StreamChunk, None]:
+    """Stream a plain completion as text chunks, filling `reply` (partially if stopped early)."""
+    usage: dict = {}
+    parts = []
+    try:
+        async with aclosing(llm.stream(messages, model=model, usage=usage)) as tokens:
+            async for token in tokens:
+                parts.append(token)
+                yield StreamChunk(type="text", content=token)
+    finally:
+        reply.update(message="".join(parts), tokens_used=usage.get("total", 0))
+
+
+async def _stream_reply(
+    prep: dict,
+    memory: MemoryManager,
+    cost_ctrl: CostController,
+    llm: LLMService,
+    supabase: SupabaseService,
+    redis: RedisService,
+    search: SearchService,
+    currency: CurrencyService,
+    semantic_cache: SemanticCache,
+    catalogue: ProductCatalogue,
+    settings: Settings,
+    reply: dict,
+) -> AsyncGenerator[StreamChunk, None]:
+    """
+    Route a preprocessed message by intent and stream the answer.
+
+    Recommendations and comparisons send their `product` / `comparison`
+    chunk first, then every intent streams text token by token. `reply`
+    is filled with the full message, tokens used and any products,
+    comparison or sources.
+    """
+    corrected_text, language = prep["corrected_text"], prep["language"]
+    intent, intent_conf = prep["intent"], prep["intent_conf"]
+    emotion = prep["emotion"]
+    context = prep["context"]
+    names = catalogue.names if catalogue.ready else None
+
+    system_prompt = (
+        BASE_SYSTEM_PROMPT
+        + get_language_instruction(language) + "\n"
+        + get_tone_instruction(emotion) + "\n"
+        + _personalization_context(prep.get("user_profile"))
+    )
 
-            # Base system prompt
-            system_prompt = (
-                BASE_SYSTEM_PROMPT
-                + get_language_instruction(language) + "\n"
-                + get_tone_instruction(emotion) + "\n"
-            )
+    async def stream_rag():
+        # Fall back to a plain LLM stream only if nothing was sent yet
+        rag = RAGPipeline(settings)
+        sent = False
+        try:
+            async with aclosing(rag.stream_query(
+                corrected_text, llm, supabase, search, redis,
+                language=language.value, system_context=system_prompt,
+                conversation_history=context, semantic_cache=semantic_cache,
+                result=reply,
+            )) as chunks:
+                async for chunk in chunks:
+                    sent = True
+                    yield chunk
+        except Exception as rag_err:
+            if sent:
+                raise
+            logger.warning(f"Streaming RAG failed: {rag_err}")
+            messages = memory.build_messages(system_prompt, context, corrected_text)
+            async with aclosing(_stream_llm(llm, messages, reply)) as chunks:
+                async for chunk in chunks:
+                    yield chunk
 
-            full_response = ""
+    if intent == Intent.PLATFORM_HELP:
+        # Platform navigation — inject knowledge prompt
+        platform_system = (
+            BASE_SYSTEM_PROMPT
+            + PLATFORM_KNOWLEDGE_PROMPT
+            + "\n" + get_language_instruction(language) + "\n"
+            + get_tone_instruction(emotion) + "\n"
+            + "\nGive clear step-by-step navigation instructions. Always mention the exact menu path or URL."
+        )
+        messages = memory.build_messages(platform_system, context, corrected_text)
+        async with aclosing(_stream_llm(llm, messages, reply)) as chunks:
+            async for chunk in chunks:
+                yield chunk
+
+    elif intent == Intent.BUDGET_CONVERSION:
+        # Currency — computed, sent as a single chunk
+        response_text = await _handle_currency(corrected_text, currency, language.value)
+        reply.update(message=response_text, tokens_used=0)
+        yield StreamChunk(type="text", content=response_text)
+
+    elif intent in (Intent.PRODUCT_DETAIL, Intent.BLOG_SEARCH, Intent.TREND_INQUIRY):
+        async with aclosing(stream_rag()) as chunks:
+            async for chunk in chunks:
+                yield chunk
+
+    elif intent == Intent.RECOMMENDATION:
+        rec_engine = RecommendationEngine(settings, catalogue)
+        sent = False
+        try:
+            async with aclosing(rec_engine.stream_recommend(
+                supabase, llm, corrected_text,
+                focus=_extract_focus(corrected_text), language=language.value,
+                result=reply,
+            )) as chunks:
+                async for chunk in chunks:
+                    sent = True
+                    yield chunk
+        except Exception as e:
+            if sent:
+                raise
+            logger.warning(f"Streaming recommendation failed: {e}")
+            fallback_sys = system_prompt + "\n(Note: Product Database unavailable. Answer based on general knowledge.)"
+            messages = memory.build_messages(fallback_sys, context, corrected_text)
+            async with aclosing(_stream_llm(llm, messages, reply)) as chunks:
+                async for chunk in chunks:
+                    yield chunk
+
+    elif intent == Intent.COMPARISON:
+        product_names = _extract_product_names(corrected_text, names)
+        if len(product_names) >= 2:
+            comp_engine = ComparisonEngine(settings, redis, catalogue)
+            async with aclosing(comp_engine.stream_compare(
+                supabase, llm, product_names, language=language.value, result=reply,
+            )) as chunks:
+                async for chunk in chunks:
+                    yield chunk
+        else:
+            # Not enough product names detected — use RAG
+            async with aclosing(stream_rag()) as chunks:
+                async for chunk in chunks:
+                    yield chunk
 
-            if intent == Intent.PLATFORM_HELP:
-                # Platform navigation — inject knowledge prompt, stream response
-                platform_system = (
-                    BASE_SYSTEM_PROMPT
-                    + PLATFORM_KNOWLEDGE_PROMPT
-                    + "\n" + get_language_instruction(language) + "\n"
-                    + get_tone_instruction(emotion) + "\n"
-                    + "\nGive clear step-by-step navigation instructions. Always mention the exact menu path or URL."
-                )
-                ws_messages = memory.build_messages(platform_system, context, corrected_text)
-                async for chunk in llm.stream(ws_messages):
-                    full_response += chunk
-                    await websocket.send_json(
-                        StreamChunk(type="text", content=chunk).model_dump()
-                    )
+    else:
+        # General chat
+        model = cost_ctrl.select_model(intent, intent_conf)
+        messages = memory.build_messages(system_prompt, context, corrected_text)
+        async with aclosing(_stream_llm(llm, messages, reply, model=model)) as chunks:
+            async for chunk in chunks:
+                yield chunk
 
-            elif intent == Intent.BUDGET_CONVERSION:
-                # Currency — compute and send as single chunk
-                response_text = await _handle_currency(corrected_text, currency, language.value)
-                full_response = response_text
-                await websocket.send_json(
-                    StreamChunk(type="text", content=response_text).model_dump()
-                )
 
-            elif intent in (Intent.PRODUCT_DETAIL, Intent.BLOG_SEARCH, Intent.TREND_INQUIRY):
-                # RAG — retrieve context then send full response
-                try:
-                    rag = RAGPipeline(settings)
-                    rag_result = await rag.query(
-                        corrected_text, llm, supabase, search, redis,
-                        language=language.value, system_context=system_prompt,
-                        conversation_history=context,
-                    )
-                    full_response = rag_result["message"]
-                    await websocket.send_json(
-                        StreamChunk(type="text", content=full_response).model_dump()
-                    )
-                except Exception as rag_err:
-                    logger.warning(f"WebSocket RAG failed: {rag_err}")
-                    # Fallback: plain LLM stream
-                    ws_messages = memory.build_messages(system_prompt, context, corrected_text)
-                    async for chunk in llm.stream(ws_messages):
-                        full_response += chunk
-                        await websocket.send_json(
-                            StreamChunk(type="text", content=chunk).model_dump()
-                        )
+# ── Server-Sent Events Streaming ────────────────────────────
 
-            else:
-                # General chat (and RECOMMENDATION/COMPARISON — keep as general LLM stream)
-                model = cost_ctrl.select_model(intent, intent_conf)
-                ws_messages = memory.build_messages(system_prompt, context, corrected_text)
-                async for chunk in llm.stream(ws_messages, model=model):
-                    full_response += chunk
-                    await websocket.send_json(
-                        StreamChunk(type="text", content=chunk).model_dump()
-                    )
+# Accounting of SSE answers still running after their client went away
+_accounting_tasks: Set[asyncio.Task] = set()
 
-            # Save exchange to memory
-            await memory.save_exchange(session_id, message, full_response)
+@router.post("/chat/sse")
+async def chat_sse(
+    request: ChatRequest,
+    http_request: Request,
+    llm: LLMService = Depends(get_llm),
+    supabase: SupabaseService = Depends(get_supabase),
+    redis: RedisService = Depends(get_redis),
+    search: SearchService = Depends(get_search),
+    currency: CurrencyService = Depends(get_currency),
+    semantic_cache: SemanticCache = Depends(get_semantic_cache),
+    writer: MessageWriter = Depends(get_message_writer),
+    summarizer: BackgroundSummarizer = Depends(get_summarizer),
+    catalogue: ProductCatalogue = Depends(get_catalogue),
+    user: Optional[dict] = Depends(get_current_user),
+    settings: Settings = Depends(get_settings),
+):
+    """
+    Chat over `text/event-stream`: the same routing as `chat()`, with each
+    StreamChunk sent as a `data:` event and a final `done` event carrying
+    the session id, intent and tokens used.
+    """
+    session_id = request.session_id or str(uuid.uuid4())
+    user_id = request.user_id or (user["user_id"] if user else None)
 
-            # Send done signal
-            await websocket.send_json(
-                StreamChunk(
-                    type="done",
-                    data={"session_id": session_id, "intent": intent.value}
-                ).model_dump()
+    async def chunks() -> AsyncGenerator[StreamChunk, None]:
+        if detect_prompt_injection(request.message):
+            yield StreamChunk(
+                type="text",
+                content="I'm sorry, I can only help with smartphone-related questions. How can I assist you today?",
             )
+            yield StreamChunk(type="done", data={"session_id": session_id})
+            return
 
-    except WebSocketDisconnect:
-        logger.info("WebSocket client disconnected")
-    except Exception as e:
-        import traceback
-        logger.error(f"WebSocket error: {type(e).__name__}: {e}\n{traceback.format_exc()}")
-        try:
-            await websocket.send_json(
-                StreamChunk(type="error", content="A server error occurred. Please reconnect.").model_dump()
+        cost_ctrl = CostController(redis, settings)
+        memory = MemoryManager(redis, supabase, llm, settings, writer)
+        prep = await preprocess(
+            request.message, session_id, user_id,
+            llm, supabase, memory, cost_ctrl,
+            language_override=request.language,
+        )
+        intent = prep["intent"]
+
+        allowed, _ = prep["budget"]
+        if not allowed:
+            yield StreamChunk(
+                type="text", content=cost_ctrl.budget_exceeded_message(prep["language"].value)
             )
-        except Exception:
-            pass
+            yield StreamChunk(type="done", data={"session_id": session_id, "intent": intent.value})
+            return
+
+        async def account(reply: dict, complete: bool) -> int:
+            # Same accounting as the REST path; a partial answer is saved
+            # only if some text was sent
+            tokens_used = reply.get("tokens_used", 0)
+            if complete or reply.get("message"):
+                token_total = await memory.save_exchange(session_id, request.message, reply.get("message", ""))
+                if memory.should_summarize(token_total):
+                    summarizer.schedule(session_id)
+            if user_id and tokens_used > 0:
+                await cost_ctrl.track_usage(user_id, tokens_used, settings.LLM_MODEL_DEFAULT)
+            return tokens_used
+
+        reply: dict = {}
+        complete = False
+        try:
+            async with aclosing(_stream_reply(
+                prep, memory, cost_ctrl, llm, supabase, redis, search,
+                currency, semantic_cache, catalogue, settings, reply,
+            )) as answer:
+                async for chunk in answer:
+                    yield chunk
+            complete = True
+        finally:
+            # Also runs when the client disconnects or the stream fails: the
+            # LLM tokens were spent either way (closing the stream above has
+            # filled `reply` with the partial answer and its usage). Shielded
+            # so the disconnect's cancellation cannot interrupt it.
+            accounting = asyncio.ensure_future(account(reply, complete))
+            _accounting_tasks.add(accounting)
+            accounting.add_done_callback(_accounting_tasks.discard)
+            tokens_used = await asyncio.shield(accounting)
+
+        yield StreamChunk(
+            type="done",
+            data={"session_id": session_id, "intent": intent.value, "tokens_used": tokens_used},
+        )
+
+    return StreamingResponse(
+        _sse_events(chunks(), http_request, settings.SSE_HEARTBEAT_INTERVAL, session_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _sse_events(
+    chunks: AsyncGenerator[StreamChunk, None],
+    http_request: Request,
+    heartbeat: float,
+    session_id: str,
+) -> AsyncGenerator[str, None]:
+    """
+    Encode chunks as SSE events, with a `: ping` comment whenever no chunk
+    arrived for `heartbeat` seconds. If the client goes away (the response
+    task is cancelled or a heartbeat finds it disconnected), the pending
+    chunk is cancelled and the generator closed, which closes the
+    upstream LLM stream.
+    """
+    pending: Optional[asyncio.Task] = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(chunks.__anext__())
+            done, _ = await asyncio.wait({pending}, timeout=heartbeat)
+            if not done:
+                if await http_request.is_disconnected():
+                    logger.info(f"SSE client disconnected: session={session_id}")
+                    return
+                yield ": ping\n\n"
+                continue
+            task, pending = pending, None
+            try:
+                chunk = task.result()
+            except StopAsyncIteration:
+                return
+            except Exception as e:
+                import traceback
+                logger.error(f"SSE stream error: {type(e).__name__}: {e}\n{traceback.format_exc()}")
+                chunk = StreamChunk(type="error", content="A server error occurred. Please try again.")
+                yield f"data: {chunk.model_dump_json()}\n\n"
+                return
+            yield f"data: {chunk.model_dump_json()}\n\n"
+    finally:
+        if pending is not None:
+            pending.cancel()
+            await asyncio.gather(pending, return_exceptions=True)
+        await chunks.aclose()
 
 
 # ── Recommendation Endpoint ─────────────────────────────────
@@ -550,22 +754,30 @@ async def recommend(
     llm: LLMService = Depends(get_llm),
     supabase: SupabaseService = Depends(get_supabase),
     redis: RedisService = Depends(get_redis),
+    catalogue: ProductCatalogue = Depends(get_catalogue),
     settings: Settings = Depends(get_settings),
 ):
     """Dedicated recommendation endpoint."""
     # Check cache
-    cache_key = redis.product_cache_key(request.query)
+    language = request.language.value if request.language else "en"
+    cache_key = redis.product_cache_key(
+        request.query,
+        focus=request.focus,
+        budget_min=request.budget_min,
+        budget_max=request.budget_max,
+        language=language,
+    )
     cached = await redis.get_cached(cache_key)
     if cached:
         return RecommendationResponse(**cached)
 
-    engine = RecommendationEngine(settings)
+    engine = RecommendationEngine(settings, catalogue)
     result = await engine.recommend(
         supabase, llm, request.query,
         focus=request.focus,
         budget_min=request.budget_min,
         budget_max=request.budget_max,
-        language=request.language.value if request.language else "en",
+        language=language,
     )
 
     session_id = request.session_id or str(uuid.uuid4())
@@ -591,19 +803,21 @@ async def compare(
     llm: LLMService = Depends(get_llm),
     supabase: SupabaseService = Depends(get_supabase),
     redis: RedisService = Depends(get_redis),
+    catalogue: ProductCatalogue = Depends(get_catalogue),
     settings: Settings = Depends(get_settings),
 ):
     """Dedicated comparison endpoint."""
     # Check cache
-    cache_key = redis.comparison_cache_key(request.product_names)
+    language = request.language.value if request.language else "en"
+    cache_key = redis.comparison_cache_key(request.product_names, language)
     cached = await redis.get_cached(cache_key)
     if cached:
         return ComparisonResponse(**cached)
 
-    engine = ComparisonEngine()
+    engine = ComparisonEngine(settings, redis, catalogue)
     result = await engine.compare(
         supabase, llm, request.product_names,
-        language=request.language.value if request.language else "en",
+        language=language,
     )
 
     session_id = request.session_id or str(uuid.uuid4())
@@ -643,6 +857,23 @@ async def create_session(
 
 # ── Helper Functions ─────────────────────────────────────────
 
+def _personalization_context(user_profile: Optional[dict]) -> str:
+    """System-prompt lines about the signed-in user, if a profile was found."""
+    if not user_profile:
+        return ""
+    context = ""
+    name = user_profile.get("full_name") or user_profile.get("username", "")
+    order_count = user_profile.get("order_count", 0)
+    role = user_profile.get("role", "user")
+    if name:
+        context += f"\nUser's name: {name}. Address them personally when appropriate."
+    if order_count > 0:
+        context += f"\nThis user has made {order_count} previous orders — they are an experienced buyer."
+    if role in ("seller", "blogger"):
+        context += f"\nUser is a {role} on the platform."
+    return context
+
+
 def _extract_focus(text: str) -> Optional[str]:
     """Extract user's focus from query text."""
     text_lower = text.lower()
@@ -662,7 +893,9 @@ def _extract_focus(text: str) -> Optional[str]:
     return None
 
 
-def _extract_brand_from_query(text: str) -> Optional[str]:
+def _extract_brand_from_query(
+    text: str, names: Optional[ProductNameIndex] = None
+) -> Optional[str]:
     """Extract a brand/model keyword from user query for platform product search."""
     brands = [
         "samsung", "apple", "iphone", "xiaomi", "redmi", "realme", "poco",
@@ -673,11 +906,22 @@ def _extract_brand_from_query(text: str) -> Optional[str]:
     for brand in brands:
         if brand in text_lower:
             return brand
+    if names is not None:
+        # Catalogue models typed as shorthand ("s24u") or brands not listed above
+        mentioned = names.find_in_text(text)
+        if mentioned:
+            return names.first_words[mentioned[0]]
+        return names.brand_in_text(text)
     return None
 
 
-def _extract_product_names(text: str) -> list:
-    """Extract product names from comparison query."""
+def _extract_product_names(text: str, names: Optional[ProductNameIndex] = None) -> list:
+    """
+    Extract product names from comparison query.
+
+    With the catalogue name index, each part is narrowed to the catalogue
+    model it mentions, and known models are found even without a separator.
+    """
     import re
 
     # Common patterns: "X vs Y", "X yoki Y", "X или Y", "X and Y"
@@ -685,7 +929,7 @@ def _extract_product_names(text: str) -> list:
     parts = re.split(separators, text, flags=re.IGNORECASE)
 
     # Clean up and filter
-    names = []
+    product_names = []
     for part in parts:
         # Remove common filler words
         cleaned = re.sub(
@@ -693,9 +937,18 @@ def _extract_product_names(text: str) -> list:
             "", part, flags=re.IGNORECASE
         ).strip()
         if cleaned and len(cleaned) > 2:
-            names.append(cleaned)
-
-    return names
+            product_names.append(cleaned)
+
+    if names is not None:
+        resolved = []
+        for part in product_names:
+            mentioned = names.find_in_text(part)
+            resolved.append(names.names[mentioned[0]] if mentioned else part)
+        if len(resolved) < 2:
+            resolved = [names.names[pid] for pid in names.find_in_text(text)] or resolved
+        product_names = resolved
+
+    return product_names
 
 
 async def _handle_currency(
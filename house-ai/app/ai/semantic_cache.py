@@ -0,0 +1,225 @@
+"""
+House AI — Semantic Response Cache
+Serves cached RAG answers for queries whose embeddings are near-identical.
+"""
+
+import base64
+import hashlib
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.services.redis_service import RedisService
+from app.config import Settings
+
+logger = logging.getLogger("house_ai")
+
+
+class _LanguageIndex:
+    """In-process vector index for one language (row-normalized float32 matrix)."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.vectors: Optional[np.ndarray] = None
+        self.size = 0
+        self.ids: List[str] = []
+        self.responses: List[Dict[str, Any]] = []
+        self.created = np.zeros(0, dtype=np.float64)
+        self.last_used = np.zeros(0, dtype=np.float64)
+        self.positions: Dict[str, int] = {}
+
+    def _grow(self, dim: int) -> None:
+        """Double the backing arrays (up to capacity) to keep appends amortized O(1)."""
+        current = 0 if self.vectors is None else self.vectors.shape[0]
+        new_rows = min(self.capacity, max(16, current * 2))
+        vectors = np.zeros((new_rows, dim), dtype=np.float32)
+        created = np.zeros(new_rows, dtype=np.float64)
+        last_used = np.zeros(new_rows, dtype=np.float64)
+        if self.vectors is not None:
+            vectors[:current] = self.vectors
+            created[:current] = self.created
+            last_used[:current] = self.last_used
+        self.vectors, self.created, self.last_used = vectors, created, last_used
+
+    def add(
+        self, entry_id: str, vector: np.ndarray, response: Dict[str, Any], created: float
+    ) -> None:
+        if entry_id in self.positions:
+            return
+        if self.size >= self.capacity:
+            # LRU eviction: overwrite the least recently used row
+            row = int(np.argmin(self.last_used[: self.size]))
+            del self.positions[self.ids[row]]
+        else:
+            if self.vectors is None or self.size >= self.vectors.shape[0]:
+                self._grow(vector.shape[0])
+            row = self.size
+            self.size += 1
+            self.ids.append("")
+            self.responses.append({})
+        self.vectors[row] = vector
+        self.ids[row] = entry_id
+        self.responses[row] = response
+        self.created[row] = created
+        self.last_used[row] = time.time()
+        self.positions[entry_id] = row
+
+    def expire(self, cutoff: float) -> None:
+        """Drop entries created before `cutoff` (compacts the arrays)."""
+        if not self.size:
+            return
+        keep = np.nonzero(self.created[: self.size] >= cutoff)[0]
+        if len(keep) == self.size:
+            return
+        self.vectors[: len(keep)] = self.vectors[keep]
+        self.created[: len(keep)] = self.created[keep]
+        self.last_used[: len(keep)] = self.last_used[keep]
+        self.ids = [self.ids[i] for i in keep]
+        self.responses = [self.responses[i] for i in keep]
+        self.size = len(keep)
+        self.positions = {entry_id: i for i, entry_id in enumerate(self.ids)}
+
+    def nearest(self, vector: np.ndarray) -> tuple:
+        """Return (row, cosine similarity) of the closest entry, or (-1, 0.0)."""
+        if not self.size:
+            return -1, 0.0
+        sims = self.vectors[: self.size] @ vector
+        row = int(np.argmax(sims))
+        return row, float(sims[row])
+
+
+class SemanticCache:
+    """
+    Embedding-keyed response cache in front of the RAG pipeline.
+
+    Each worker keeps a per-language in-process index for lookups; new
+    entries are also written to Redis and periodically pulled by the
+    other workers, so a cache fill on one worker serves all of them.
+    """
+
+    def __init__(self, settings: Settings):
+        self.enabled = settings.SEMANTIC_CACHE_ENABLED
+        self.threshold = settings.SEMANTIC_CACHE_THRESHOLD
+        self.max_entries = settings.SEMANTIC_CACHE_MAX_ENTRIES
+        self.sync_interval = settings.SEMANTIC_CACHE_SYNC_INTERVAL
+        self.ttl = settings.CACHE_TTL_RAG
+        self._indexes: Dict[str, _LanguageIndex] = {}
+        self._last_sync: Dict[str, float] = {}
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self._hit_similarities: deque = deque(maxlen=1000)
+        self._miss_similarities: deque = deque(maxlen=1000)
+
+    def _index(self, language: str) -> _LanguageIndex:
+        if language not in self._indexes:
+            self._indexes[language] = _LanguageIndex(self.max_entries)
+        return self._indexes[language]
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @staticmethod
+    def entry_id(query: str, language: str) -> str:
+        return hashlib.sha1(f"{language}:{query.lower().strip()}".encode()).hexdigest()[:20]
+
+    # ── Lookup / Store ───────────────────────────────────
+
+    async def lookup(
+        self,
+        embedding: List[float],
+        language: str,
+        redis: RedisService,
+    ) -> Optional[Dict[str, Any]]:
+        """Return a cached response whose query is similar enough, if any."""
+        if not self.enabled:
+            return None
+
+        await self._sync(language, redis)
+        index = self._index(language)
+        index.expire(time.time() - self.ttl)
+
+        row, similarity = index.nearest(self._normalize(embedding))
+        if row >= 0 and similarity >= self.threshold:
+            self.hits += 1
+            self._hit_similarities.append(similarity)
+            index.last_used[row] = time.time()
+            logger.info(f"Semantic cache hit: lang={language}, similarity={similarity:.3f}")
+            return index.responses[row]
+
+        self.misses += 1
+        if row >= 0:
+            self._miss_similarities.append(similarity)
+        return None
+
+    async def store(
+        self,
+        query: str,
+        embedding: List[float],
+        language: str,
+        response: Dict[str, Any],
+        redis: RedisService,
+    ) -> None:
+        """Add a response to the local index and share it through Redis."""
+        if not self.enabled:
+            return
+
+        entry_id = self.entry_id(query, language)
+        vector = self._normalize(embedding)
+        created = time.time()
+        self._index(language).add(entry_id, vector, response, created)
+
+        payload = {
+            "embedding": base64.b64encode(vector.tobytes()).decode("ascii"),
+            "response": response,
+            "created": created,
+        }
+        await redis.add_semantic_entry(language, entry_id, payload, created, self.ttl)
+
+    async def _sync(self, language: str, redis: RedisService) -> None:
+        """Pull entries added by other workers since the last sync."""
+        now = time.time()
+        last = self._last_sync.get(language)
+        if last is not None and now - last < self.sync_interval:
+            return
+        # Mark before awaiting so concurrent lookups don't sync twice
+        self._last_sync[language] = now
+        # Entries are scored by the writer's `created`, which can predate
+        # their ZADD (slow write, clock skew): re-read one interval back.
+        # `add` skips ids already indexed.
+        since = last - self.sync_interval if last is not None else now - self.ttl
+
+        entries = await redis.get_semantic_entries_since(language, since, now - self.ttl)
+        index = self._index(language)
+        for entry_id, payload in entries:
+            try:
+                vector = np.frombuffer(
+                    base64.b64decode(payload["embedding"]), dtype=np.float32
+                )
+                index.add(entry_id, vector, payload["response"], float(payload["created"]))
+            except (KeyError, ValueError, TypeError) as e:
+                logger.warning(f"Skipping malformed semantic cache entry {entry_id}: {e}")
+
+    # ── Metrics ──────────────────────────────────────────
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        hit_sims = list(self._hit_similarities)
+        miss_sims = list(self._miss_similarities)
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "avg_hit_similarity": round(float(np.mean(hit_sims)), 4) if hit_sims else None,
+            "avg_miss_similarity": round(float(np.mean(miss_sims)), 4) if miss_sims else None,
+            "entries": {lang: idx.size for lang, idx in self._indexes.items()},
+        }
@@ -0,0 +1,193 @@
+"""
+House AI — Typo Correction Engine
+Single-pass dictionary replacement plus optional fuzzy vocabulary correction.
+"""
+
+import json
+import logging
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger("house_ai")
+
+
+# ── Dictionary Replacement ───────────────────────────────────
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    Build a regex matching any of `words`, factored as a character trie.
+
+    A flat alternation makes the engine try every entry at every position;
+    the trie shares prefixes, so matching cost tracks word length rather
+    than dictionary size. Greedy optional tails prefer the longest entry.
+    """
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def render(node: Dict) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + render(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            body = (f"(?:{body})" if len(branches) == 1 and len(body) > 1 else body) + "?"
+        return body
+
+    return render(trie)
+
+
+def load_typo_file(path: str) -> Dict[str, str]:
+    """
+    Load extra typo → correction entries.
+
+    Accepts a JSON object, or text lines of `typo<TAB>correction`
+    (blank lines and `#` comments ignored).
+    """
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return {str(k): str(v) for k, v in json.load(f).items()}
+        entries = {}
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            typo, _, correction = line.partition("\t")
+            if typo and correction:
+                entries[typo] = correction
+        return entries
+
+
+def load_word_file(path: str) -> List[str]:
+    """One vocabulary word per line; `#` comments ignored."""
+    with open(path, encoding="utf-8") as f:
+        return [w.strip() for w in f if w.strip() and not w.startswith("#")]
+
+
+# ── Fuzzy Vocabulary (SymSpell-style) ────────────────────────
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """All strings reachable from `word` by up to `max_distance` deletions."""
+    result = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        result |= frontier
+    return result
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Damerau-Levenshtein (optimal string alignment), capped at limit + 1."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2: Optional[List[int]] = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if (
+                prev2 is not None and i > 1 and j > 1
+                and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]
+            ):
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class SymSpellIndex:
+    """
+    Delete-neighbourhood index for nearest-word lookup.
+
+    Each vocabulary word is stored under every string obtained by deleting
+    up to `max_distance` characters; a query only generates its own
+    deletes and verifies the few words sharing one, instead of comparing
+    against the whole vocabulary.
+    """
+
+    def __init__(self, words: Iterable[str] = (), max_distance: int = 2):
+        self.max_distance = max_distance
+        self.words: Set[str] = set()
+        self._deletes: Dict[str, Set[str]] = {}
+        self.add(words)
+
+    def add(self, words: Iterable[str]) -> None:
+        for word in words:
+            word = word.lower()
+            if word in self.words:
+                continue
+            self.words.add(word)
+            for key in _deletes(word, self.max_distance):
+                self._deletes.setdefault(key, set()).add(word)
+
+    def lookup(self, token: str, max_distance: Optional[int] = None) -> Optional[str]:
+        """Closest vocabulary word within `max_distance` edits, or None."""
+        limit = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        token = token.lower()
+        if token in self.words:
+            return token
+
+        candidates: Set[str] = set()
+        for key in _deletes(token, limit):
+            candidates |= self._deletes.get(key, set())
+
+        best, best_distance = None, limit + 1
+        for word in sorted(candidates):
+            distance = _edit_distance(token, word, limit)
+            if distance < best_distance:
+                best, best_distance = word, distance
+        return best
+
+
+# ── Corrector ────────────────────────────────────────────────
+
+class TypoCorrector:
+    """
+    Compiled typo corrector.
+
+    Dictionary typos are replaced case-insensitively wherever they occur
+    (as substrings) in one regex pass. With `fuzzy` enabled, whole words
+    of at least `min_length` letters are additionally snapped to the
+    nearest vocabulary word (brands, product names) within 1 edit, or 2
+    for words of 8+ letters.
+    """
+
+    def __init__(
+        self,
+        typos: Dict[str, str],
+        vocabulary: Iterable[str] = (),
+        fuzzy: bool = False,
+        min_length: int = 5,
+    ):
+        self.typos = {typo.lower(): correction for typo, correction in typos.items()}
+        self.pattern = (
+            re.compile(_trie_pattern(self.typos), re.IGNORECASE) if self.typos else None
+        )
+        self.fuzzy = fuzzy
+        self.min_length = min_length
+        self.vocabulary = SymSpellIndex(vocabulary, max_distance=2)
+
+    def _replace(self, match: re.Match) -> str:
+        found = match.group(0)
+        return self.typos.get(found.lower(), found)
+
+    def _snap(self, match: re.Match) -> str:
+        token = match.group(0)
+        if len(token) < self.min_length or token.lower() in self.vocabulary.words:
+            return token
+        limit = 2 if len(token) >= 8 else 1
+        return self.vocabulary.lookup(token, limit) or token
+
+    def correct(self, text: str) -> str:
+        if self.pattern is not None:
+            text = self.pattern.sub(self._replace, text)
+        if self.fuzzy and self.vocabulary.words:
+            text = re.sub(r"[^\W\d_]+", self._snap, text)
+        return text
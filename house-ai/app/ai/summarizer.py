@@ -1,14 +1,28 @@
 """
 House AI — Conversation Summarizer
-Standalone summarization utilities for token-efficient memory.
+Background summarization off the response path, plus standalone
+summarization utilities for token-efficient memory.
 """
 
+import asyncio
 import logging
-from typing import List, Dict, Optional
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from app.services.redis_service import RedisService
+from app.services.supabase_service import SupabaseService
+from app.services.llm_service import LLMService
+from app.ai.memory import MemoryManager
+from app.config import Settings
 
 logger = logging.getLogger("house_ai")
 
 
+# ── Utilities ────────────────────────────────────────────────
+
 async def summarize_conversation(
     messages: List[Dict[str, str]],
     llm_service,
@@ -95,3 +109,108 @@ def estimate_summary_savings(
         "saved_tokens": original_tokens - summary_tokens,
         "compression_ratio": round(summary_tokens / max(original_tokens, 1), 2),
     }
+
+
+# ── Background Queue ─────────────────────────────────────────
+
+class BackgroundSummarizer:
+    """
+    Per-worker job queue for MemoryManager.check_and_summarize.
+
+    A session is queued at most once at a time, and each job takes a
+    Redis lock on the session so that several workers never summarize
+    the same conversation concurrently.
+    """
+
+    def __init__(
+        self,
+        redis: RedisService,
+        supabase: SupabaseService,
+        llm: LLMService,
+        settings: Settings,
+    ):
+        self.redis = redis
+        self.memory = MemoryManager(redis, supabase, llm, settings)
+        self.concurrency = settings.SUMMARY_WORKERS
+        self.lock_ttl = settings.SUMMARY_LOCK_TTL
+
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._pending: Set[str] = set()
+        self._workers: list = []
+
+        # Metrics
+        self.running = 0
+        self.completed = 0
+        self.summarized = 0
+        self.skipped_locked = 0
+        self.failed = 0
+        self._latencies: deque = deque(maxlen=500)
+
+    # ── Lifecycle ────────────────────────────────────────
+
+    def start(self) -> None:
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker()) for _ in range(self.concurrency)
+            ]
+
+    async def stop(self) -> None:
+        """Cancel workers. Queued sessions are re-checked on their next turn."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    # ── Scheduling ───────────────────────────────────────
+
+    def schedule(self, session_id: str) -> None:
+        """Queue a summarization check; no-op if one is already pending."""
+        if session_id in self._pending:
+            return
+        self._pending.add(session_id)
+        self._queue.put_nowait((session_id, time.perf_counter()))
+
+    async def _worker(self) -> None:
+        while True:
+            session_id, queued_at = await self._queue.get()
+            # Let the session be re-queued by turns that arrive from now on
+            self._pending.discard(session_id)
+            self.running += 1
+            try:
+                await self._run(session_id)
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Background summarization failed for {session_id}: {e}")
+            finally:
+                self.running -= 1
+                self._latencies.append((time.perf_counter() - queued_at) * 1000)
+                self._queue.task_done()
+
+    async def _run(self, session_id: str) -> None:
+        lock_name = f"summarize:{session_id}"
+        token = await self.redis.acquire_lock(lock_name, self.lock_ttl)
+        if token is None:
+            self.skipped_locked += 1
+            return
+        try:
+            summary = await self.memory.check_and_summarize(session_id)
+            self.completed += 1
+            if summary:
+                self.summarized += 1
+        finally:
+            await self.redis.release_lock(lock_name, token)
+
+    # ── Metrics ──────────────────────────────────────────
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = list(self._latencies)
+        return {
+            "pending": self._queue.qsize(),
+            "running": self.running,
+            "completed": self.completed,
+            "summarized": self.summarized,
+            "skipped_locked": self.skipped_locked,
+            "failed": self.failed,
+            "latency_ms_p50": round(float(np.percentile(latencies, 50)), 2) if latencies else None,
+            "latency_ms_p95": round(float(np.percentile(latencies, 95)), 2) if latencies else None,
+        }
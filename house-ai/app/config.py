@@ -30,40 +30,97 @@ class Settings(BaseSettings):
     LLM_MODEL_FALLBACK: str = "llama-3.3-70b-versatile"
     EMBEDDING_MODEL: str = "text-embedding-3-small"
     EMBEDDING_DIMENSIONS: int = 1536
+    EMBEDDING_CACHE_SIZE: int = 2048        # in-process LRU entries
+    EMBEDDING_BATCH_WINDOW_MS: int = 5      # coalescing window for embed_single
+    EMBEDDING_BATCH_MAX_SIZE: int = 64
     CONFIDENCE_THRESHOLD: float = 0.7
+    INTENT_MODEL_PATH: str = "app/ai/artifacts/intent_model_v1.npz"   # "" disables
+    INTENT_MODEL_THRESHOLD: float = 0.6   # below this the LLM fallback decides
+    INTENT_LOG_SAMPLES: bool = False      # log (message, intent) pairs for retraining
     MAX_CONTEXT_MESSAGES: int = 5
 
+    # ── LLM Routing ──────────────────────────────────────
+    LLM_TIMEOUT: float = 30.0             # seconds per provider for a completion
+    LLM_FIRST_TOKEN_TIMEOUT: float = 10.0 # seconds per provider for a stream's first token
+    LLM_MAX_RETRIES: int = 0              # SDK retries of chat calls when a fallback provider exists
+    LLM_HEDGE_ENABLED: bool = True        # start the fallback when the primary is slow
+    LLM_HEDGE_QUANTILE: float = 0.95      # ...slower than this latency quantile
+    LLM_HEDGE_MIN_DELAY: float = 0.5      # hedge delay bounds, seconds
+    LLM_HEDGE_MAX_DELAY: float = 8.0      # also the delay until enough samples exist
+    LLM_DEMOTE_ERROR_RATE: float = 0.5    # primary goes second at this rolling error rate
+    LLM_DEMOTE_LATENCY_RATIO: float = 3.0 # ...or when its p95 is this many times the fallback's
+    LLM_STATS_WINDOW_S: float = 120.0     # rolling window for latency/error stats
+    LLM_STATS_MIN_SAMPLES: int = 10
+    LLM_STATS_MAX_SAMPLES: int = 500
+
     # ── Token Budget ─────────────────────────────────────
     DAILY_TOKEN_BUDGET_PER_USER: int = 100_000
     SUMMARIZE_TOKEN_THRESHOLD: int = 3000
+    SUMMARY_WORKERS: int = 2              # background summarization tasks per worker
+    SUMMARY_LOCK_TTL: int = 60            # seconds; per-session lock across workers
     MAX_RESPONSE_TOKENS: int = 1024
 
     # ── Supabase ─────────────────────────────────────────
     SUPABASE_URL: str = ""
     SUPABASE_KEY: str = ""
     SUPABASE_SERVICE_KEY: str = ""
+    SUPABASE_TIMEOUT: int = 10            # seconds per PostgREST request
 
     # ── Redis ────────────────────────────────────────────
     REDIS_URL: str = "redis://localhost:6379/0"
     CACHE_TTL_PRODUCTS: int = 86400       # 24h
     CACHE_TTL_COMPARISONS: int = 43200    # 12h
+    CACHE_TTL_PRODUCT_IDS: int = 86400    # 24h; compared name → product id
     CACHE_TTL_RAG: int = 21600            # 6h
     CACHE_TTL_CURRENCY: int = 172800      # 48h
+    CACHE_TTL_EMBEDDINGS: int = 604800    # 7d
+    CACHE_TTL_CLASSIFIER: int = 604800    # 7d
+    CLASSIFIER_CACHE_SIZE: int = 4096     # in-process LRU entries
     SESSION_MEMORY_MAX_MESSAGES: int = 20
 
+    # ── Message Write-Behind ─────────────────────────────
+    MESSAGE_WRITE_BATCH_SIZE: int = 50         # rows per multi-row insert
+    MESSAGE_WRITE_FLUSH_INTERVAL: float = 1.0  # seconds between flushes
+    MESSAGE_WRITE_MAX_RETRIES: int = 5
+    MESSAGE_WRITE_MAX_PENDING: int = 10000     # oldest rows shed beyond this
+    MESSAGE_WRITE_DRAIN_TIMEOUT: float = 10.0  # seconds allowed on shutdown
+
+    # ── Typo Correction ──────────────────────────────────
+    TYPO_DICTIONARY_PATH: str = ""        # extra typos: JSON object or typo<TAB>fix lines
+    TYPO_VOCABULARY_PATH: str = ""        # extra fuzzy-correction words, one per line
+    TYPO_FUZZY_ENABLED: bool = False      # snap near-miss words to brand/product names
+    TYPO_FUZZY_MIN_LENGTH: int = 5
+
     # ── Tavily Search ────────────────────────────────────
     TAVILY_API_KEY: str = ""
     TAVILY_SEARCH_COUNT: int = 5
 
+    # ── Outbound HTTP Pools ──────────────────────────────
+    HTTP_HTTP2: bool = True
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0     # seconds an idle connection is kept
+    SEARCH_HTTP_TIMEOUT: float = 10.0
+    SEARCH_HTTP_MAX_CONNECTIONS: int = 20
+    CURRENCY_HTTP_TIMEOUT: float = 10.0
+    CURRENCY_HTTP_MAX_CONNECTIONS: int = 5
+
     # ── RAG ──────────────────────────────────────────────
     RAG_TOP_K: int = 3
     RAG_SIMILARITY_THRESHOLD: float = 0.75
+    RAG_RETRIEVAL_TIMEOUT: float = 3.0    # seconds for all retrievals together
+    RAG_SPECULATIVE_WEB_SEARCH: bool = False
+
+    # ── Semantic Cache ───────────────────────────────────
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_THRESHOLD: float = 0.93   # cosine similarity for a hit
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 1000   # per language, per worker
+    SEMANTIC_CACHE_SYNC_INTERVAL: int = 15   # seconds between Redis pulls
 
     # ── Security ─────────────────────────────────────────
     JWT_SECRET: str = ""
     JWT_ALGORITHM: str = "HS256"
     RATE_LIMIT_PER_MINUTE: int = 30
     RATE_LIMIT_PER_MINUTE_ANON: int = 10
+    RATE_LIMIT_FALLBACK_MAX_KEYS: int = 10000   # in-memory keys kept while Redis is down
 
     # ── Recommendation Weights ───────────────────────────
     WEIGHT_VALUE: float = 0.40
@@ -71,6 +128,18 @@ class Settings(BaseSettings):
     WEIGHT_CAMERA: float = 0.20
     WEIGHT_TREND: float = 0.15
 
+    # ── Product Catalogue ────────────────────────────────
+    CATALOGUE_REFRESH_INTERVAL: float = 30.0        # seconds between incremental pulls
+    CATALOGUE_FULL_RELOAD_INTERVAL: float = 3600.0  # full reload also drops deleted rows
+
+    # ── Streaming ────────────────────────────────────────
+    SSE_HEARTBEAT_INTERVAL: float = 15.0  # seconds of silence before a keep-alive comment
+    STREAM_COALESCE_MS: int = 30          # WebSocket: tokens per frame collected for up to this long
+    STREAM_COALESCE_MAX_BYTES: int = 512  # ...or until this much text is pending
+    STREAM_QUEUE_SIZE: int = 32           # frames queued for a slow client before the LLM stream is paused
+    WS_MAX_PENDING_MESSAGES: int = 4      # messages queued behind the answer being streamed
+    WS_PIPELINE_PREPROCESS: bool = True   # preprocess queued messages while the current one streams
+
     @property
     def allowed_origins_list(self) -> list[str]:
         return [o.strip() for o in self.ALLOWED_ORIGINS.split(",") if o.strip()]
@@ -14,6 +14,13 @@ from app.services.supabase_service import SupabaseService
 from app.services.redis_service import RedisService
 from app.services.search_service import SearchService
 from app.services.currency_service import CurrencyService
+from app.services.message_writer import MessageWriter
+from app.ai.semantic_cache import SemanticCache
+from app.ai.summarizer import BackgroundSummarizer
+from app.ai.catalogue import ProductCatalogue
+from app.ai.classifier_cache import classifier_cache
+from app.ai.intent_model import load_intent_model
+from app.middleware import rate_limiter
 
 logger = logging.getLogger("house_ai")
 
@@ -25,26 +32,61 @@ _supabase_service: Optional[SupabaseService] = None
 _redis_service: Optional[RedisService] = None
 _search_service: Optional[SearchService] = None
 _currency_service: Optional[CurrencyService] = None
+_semantic_cache: Optional[SemanticCache] = None
+_message_writer: Optional[MessageWriter] = None
+_summarizer: Optional[BackgroundSummarizer] = None
+_catalogue: Optional[ProductCatalogue] = None
 
 
 async def init_services(settings: Settings) -> None:
     """Initialize all services on startup."""
     global _llm_service, _supabase_service, _redis_service, _search_service, _currency_service
+    global _semantic_cache, _message_writer, _summarizer, _catalogue
 
     _llm_service = LLMService(settings)
     _supabase_service = SupabaseService(settings)
     _redis_service = RedisService(settings)
     _search_service = SearchService(settings)
     _currency_service = CurrencyService(settings)
-
+    _semantic_cache = SemanticCache(settings)
+    load_intent_model(settings.INTENT_MODEL_PATH)
+    _message_writer = MessageWriter(_supabase_service, settings)
+    _summarizer = BackgroundSummarizer(
+        _redis_service, _supabase_service, _llm_service, settings
+    )
+    _catalogue = ProductCatalogue(_supabase_service, settings)
+
+    await _supabase_service.connect()
+    _message_writer.start()
+    _catalogue.start()
     await _redis_service.connect()
+    await _search_service.connect()
+    await _currency_service.connect()
+    _llm_service.set_redis(_redis_service)
+    classifier_cache.set_redis(_redis_service)
+    rate_limiter.set_redis(_redis_service.client)
+    _summarizer.start()
     logger.info("All services initialized")
 
 
 async def shutdown_services() -> None:
     """Cleanup services on shutdown."""
-    global _redis_service
+    global _supabase_service, _redis_service
+    if _search_service:
+        await _search_service.close()
+    if _currency_service:
+        await _currency_service.close()
+    if _summarizer:
+        await _summarizer.stop()
+    if _catalogue:
+        await _catalogue.stop()
+    if _message_writer:
+        # Drain queued chat messages while Supabase is still connected
+        await _message_writer.stop()
+    if _supabase_service:
+        await _supabase_service.disconnect()
     if _redis_service:
+        rate_limiter.set_redis(None)
         await _redis_service.disconnect()
     logger.info("All services shut down")
 
@@ -81,6 +123,30 @@ def get_currency() -> CurrencyService:
     return _currency_service
 
 
+def get_semantic_cache() -> SemanticCache:
+    if _semantic_cache is None:
+        raise RuntimeError("SemanticCache not initialized")
+    return _semantic_cache
+
+
+def get_message_writer() -> MessageWriter:
+    if _message_writer is None:
+        raise RuntimeError("MessageWriter not initialized")
+    return _message_writer
+
+
+def get_summarizer() -> BackgroundSummarizer:
+    if _summarizer is None:
+        raise RuntimeError("BackgroundSummarizer not initialized")
+    return _summarizer
+
+
+def get_catalogue() -> ProductCatalogue:
+    if _catalogue is None:
+        raise RuntimeError("ProductCatalogue not initialized")
+    return _catalogue
+
+
 # ── Auth Dependency ──────────────────────────────────────────
 
 async def get_current_user(
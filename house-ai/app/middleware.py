@@ -3,16 +3,21 @@ House AI — Middleware Stack
 CORS, rate limiting, error handling, logging, prompt injection filter.
 """
 
+import itertools
+import math
 import time
 import json
 import re
 import logging
-from typing import Callable, Dict
-from collections import defaultdict
-from fastapi import FastAPI, Request, Response
+from typing import Tuple
+from collections import OrderedDict, deque
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.redis_service import start_round_trip_count
 
 
 logger = logging.getLogger("house_ai")
@@ -46,83 +51,138 @@ def detect_prompt_injection(text: str) -> bool:
 
 # ── Rate Limiter ─────────────────────────────────────────────
 
+# Sliding-window log in a sorted set, checked and updated atomically.
+# KEYS[1] = window key; ARGV = now_ms, window_ms, limit, member
+# Returns {allowed (0/1), remaining, retry_after_ms}
+SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+
+if count >= limit then
+    local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    local retry = window
+    if oldest[2] then
+        retry = tonumber(oldest[2]) + window - now
+    end
+    return {0, 0, retry}
+end
+
+redis.call('ZADD', key, now, ARGV[4])
+redis.call('PEXPIRE', key, window)
+return {1, limit - count - 1, 0}
+"""
+
+
 class RateLimiter:
-    """Redis-backed sliding window rate limiter with in-memory fallback."""
+    """
+    Redis-backed sliding window rate limiter with in-memory fallback.
+
+    With Redis the limit is shared by every worker (one Lua round-trip per
+    check). The fallback — used only while Redis is unavailable — keeps a
+    fixed-size ring buffer of timestamps per key and evicts the least
+    recently seen keys beyond `max_keys`, so memory stays bounded.
+    """
 
-    def __init__(self, redis_client=None):
+    def __init__(self, redis_client=None, max_keys: int = 10000):
         self._redis = redis_client
-        self._fallback: Dict[str, list] = defaultdict(list)
+        self._script = None
+        self.max_keys = max_keys
+        self._fallback: "OrderedDict[str, deque]" = OrderedDict()
+        self._seq = itertools.count()
 
     def set_redis(self, redis_client):
         """Set Redis client after initialization."""
         self._redis = redis_client
+        self._script = redis_client.register_script(SLIDING_WINDOW_LUA) if redis_client else None
 
-    def is_allowed(self, key: str, limit: int, window: int = 60) -> bool:
-        # Try Redis first
-        if self._redis:
-            try:
-                import asyncio
-                # Sync wrapper — middleware dispatch is sync context for rate check
-                rl_key = f"rl:{key}"
-                # Fallback to in-memory if event loop issues
-            except Exception:
-                pass
-
-        # In-memory fallback
-        now = time.time()
-        self._fallback[key] = [
-            t for t in self._fallback[key] if t > now - window
-        ]
-        if len(self._fallback[key]) >= limit:
-            return False
-        self._fallback[key].append(now)
-        return True
-
-    def get_remaining(self, key: str, limit: int, window: int = 60) -> int:
+    async def check(self, key: str, limit: int, window: int = 60) -> Tuple[bool, int, int]:
+        """
+        Record a request against `key` if it is within the limit.
+
+        Returns (allowed, remaining, retry_after_seconds).
+        """
         now = time.time()
-        self._fallback[key] = [
-            t for t in self._fallback[key] if t > now - window
-        ]
-        return max(0, limit - len(self._fallback[key]))
+        if self._script is not None:
+            try:
+                allowed, remaining, retry_ms = await self._script(
+                    keys=[f"rl:{key}"],
+                    args=[int(now * 1000), window * 1000, limit, f"{now:.6f}:{next(self._seq)}"],
+                )
+                return bool(allowed), int(remaining), math.ceil(int(retry_ms) / 1000)
+            except Exception as e:
+                logger.warning(f"Redis rate limit check failed, using local fallback: {e}")
+
+        return self._check_local(key, limit, window, now)
+
+    def _check_local(self, key: str, limit: int, window: int, now: float) -> Tuple[bool, int, int]:
+        hits = self._fallback.get(key)
+        if hits is None or hits.maxlen != limit:
+            hits = deque(hits or (), maxlen=limit)
+            self._fallback[key] = hits
+        self._fallback.move_to_end(key)
+        while len(self._fallback) > self.max_keys:
+            self._fallback.popitem(last=False)
+
+        while hits and hits[0] <= now - window:
+            hits.popleft()
+        if len(hits) >= limit:
+            return False, 0, max(1, math.ceil(hits[0] + window - now))
+        hits.append(now)
+        return True, limit - len(hits), 0
 
 
 rate_limiter = RateLimiter()
 
 
 # ── Logging Middleware ───────────────────────────────────────
+#
+# The middleware below is plain ASGI rather than BaseHTTPMiddleware:
+# no per-request task or memory stream is created, and streamed response
+# bodies pass straight through to the server.
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+class RequestLoggingMiddleware:
     """Structured JSON request/response logging."""
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         start_time = time.time()
         request_id = f"{int(start_time * 1000)}"
+        client = scope.get("client")
+        status_code = 500
+        round_trips = start_round_trip_count()
 
         # Log request
         logger.info(json.dumps({
             "event": "request_start",
             "request_id": request_id,
-            "method": request.method,
-            "path": str(request.url.path),
-            "client_ip": request.client.host if request.client else "unknown",
+            "method": scope["method"],
+            "path": scope["path"],
+            "client_ip": client[0] if client else "unknown",
         }))
 
-        try:
-            response = await call_next(request)
-            duration = time.time() - start_time
-
-            # Log response
-            logger.info(json.dumps({
-                "event": "request_end",
-                "request_id": request_id,
-                "status_code": response.status_code,
-                "duration_ms": round(duration * 1000, 2),
-            }))
-
-            response.headers["X-Request-ID"] = request_id
-            response.headers["X-Response-Time"] = f"{round(duration * 1000, 2)}ms"
-            return response
+        async def send_with_headers(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                duration = time.time() - start_time
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = request_id
+                headers["X-Response-Time"] = f"{round(duration * 1000, 2)}ms"
+            await send(message)
 
+        try:
+            await self.app(scope, receive, send_with_headers)
         except Exception as e:
             duration = time.time() - start_time
             logger.error(json.dumps({
@@ -130,29 +190,43 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
                 "request_id": request_id,
                 "error": str(e),
                 "duration_ms": round(duration * 1000, 2),
+                "redis_round_trips": round_trips.count,
             }))
             raise
 
+        # Log response (duration includes the full body for streamed responses)
+        duration = time.time() - start_time
+        logger.info(json.dumps({
+            "event": "request_end",
+            "request_id": request_id,
+            "status_code": status_code,
+            "duration_ms": round(duration * 1000, 2),
+            "redis_round_trips": round_trips.count,
+        }))
+
 
 # ── Rate Limit Middleware ────────────────────────────────────
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+class RateLimitMiddleware:
     """Per-IP rate limiting middleware."""
 
-    def __init__(self, app, rate_limit: int = 30, anon_rate_limit: int = 10):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, rate_limit: int = 30, anon_rate_limit: int = 10, window: int = 60):
+        self.app = app
         self.rate_limit = rate_limit
         self.anon_rate_limit = anon_rate_limit
+        self.window = window
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Skip rate limiting for health checks
-        if request.url.path in ("/health", "/docs", "/openapi.json"):
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Skip rate limiting for websockets/lifespan and health checks
+        if scope["type"] != "http" or scope["path"] in ("/health", "/docs", "/openapi.json"):
+            await self.app(scope, receive, send)
+            return
 
-        client_ip = request.client.host if request.client else "unknown"
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
 
         # Check for authenticated user (JWT in header)
-        auth_header = request.headers.get("authorization", "")
+        auth_header = Headers(scope=scope).get("authorization", "")
         if auth_header.startswith("Bearer "):
             limit = self.rate_limit
             key = f"rate:{auth_header[7:20]}:{client_ip}"
@@ -160,9 +234,9 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             limit = self.anon_rate_limit
             key = f"rate:anon:{client_ip}"
 
-        if not rate_limiter.is_allowed(key, limit):
-            remaining = rate_limiter.get_remaining(key, limit)
-            return JSONResponse(
+        allowed, remaining, retry_after = await rate_limiter.check(key, limit, self.window)
+        if not allowed:
+            response = JSONResponse(
                 status_code=429,
                 content={
                     "error": "Rate limit exceeded",
@@ -171,46 +245,74 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 headers={
                     "X-RateLimit-Limit": str(limit),
                     "X-RateLimit-Remaining": str(remaining),
-                    "Retry-After": "60",
+                    "Retry-After": str(retry_after),
                 },
             )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-RateLimit-Limit"] = str(limit)
+                headers["X-RateLimit-Remaining"] = str(remaining)
+            await send(message)
 
-        response = await call_next(request)
-        remaining = rate_limiter.get_remaining(key, limit)
-        response.headers["X-RateLimit-Limit"] = str(limit)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        return response
+        await self.app(scope, receive, send_with_headers)
 
 
 # ── Error Handler Middleware ─────────────────────────────────
 
-class ErrorHandlerMiddleware(BaseHTTPMiddleware):
+class ErrorHandlerMiddleware:
     """Global exception handler — returns structured JSON errors."""
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_tracking(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
         try:
-            return await call_next(request)
-        except ValueError as e:
+            await self.app(scope, receive, send_tracking)
+        except Exception as e:
+            if response_started:
+                # Headers are already on the wire — nothing left to rewrite
+                raise
+            response = self._error_response(e)
+            await response(scope, receive, send)
+
+    @staticmethod
+    def _error_response(e: Exception) -> JSONResponse:
+        if isinstance(e, ValueError):
             logger.warning(f"Validation error: {e}")
             return JSONResponse(
                 status_code=400,
                 content={"error": "Bad Request", "detail": str(e)},
             )
-        except PermissionError as e:
+        if isinstance(e, PermissionError):
             logger.warning(f"Permission error: {e}")
             return JSONResponse(
                 status_code=403,
                 content={"error": "Forbidden", "detail": str(e)},
             )
-        except Exception as e:
-            logger.exception(f"Unhandled error: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={
-                    "error": "Internal Server Error",
-                    "detail": "An unexpected error occurred. Please try again later.",
-                },
-            )
+        logger.exception(f"Unhandled error: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={
+                "error": "Internal Server Error",
+                "detail": "An unexpected error occurred. Please try again later.",
+            },
+        )
 
 
 # ── Setup Function ───────────────────────────────────────────
@@ -226,6 +328,7 @@ def setup_middleware(app: FastAPI, settings) -> None:
         rate_limit=settings.RATE_LIMIT_PER_MINUTE,
         anon_rate_limit=settings.RATE_LIMIT_PER_MINUTE_ANON,
     )
+    rate_limiter.max_keys = settings.RATE_LIMIT_FALLBACK_MAX_KEYS
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.allowed_origins_list,
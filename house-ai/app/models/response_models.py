@@ -41,7 +41,7 @@ class ChatResponse(BaseModel):
 
 
 class StreamChunk(BaseModel):
-    type: str = "text"  # "text", "product", "comparison", "done", "error"
+    type: str = "text"  # "text", "product", "comparison", "done", "cancelled", "error"
     content: str = ""
     data: Optional[Dict[str, Any]] = None
 
@@ -1,11 +1,19 @@
 """
 House AI — Top-Level Routes
-Health check and router inclusion.
+Health check, worker metrics and router inclusion.
 """
 
+import os
+
 from fastapi import APIRouter
 from app.models.response_models import HealthResponse
 from app.config import get_settings
+from app.ai.classifier_cache import classifier_cache
+from app.services.stream_writer import stream_stats
+from app.dependencies import (
+    get_llm, get_semantic_cache, get_message_writer, get_summarizer,
+    get_catalogue,
+)
 
 router = APIRouter()
 
@@ -30,3 +38,19 @@ async def root():
         "docs": "/docs",
         "health": "/health",
     }
+
+
+@router.get("/metrics", tags=["System"])
+async def metrics():
+    """Per-worker cache and queue metrics."""
+    return {
+        "worker_pid": os.getpid(),
+        "semantic_cache": get_semantic_cache().stats(),
+        "embeddings": get_llm().embedding_stats(),
+        "llm": get_llm().llm_stats(),
+        "classifier_cache": classifier_cache.stats(),
+        "message_writer": get_message_writer().stats(),
+        "summarizer": get_summarizer().stats(),
+        "catalogue": get_catalogue().stats(),
+        "streaming": stream_stats.stats(),
+    }
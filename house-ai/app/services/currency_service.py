@@ -9,6 +9,7 @@ from typing import Optional, Dict
 import httpx
 
 from app.config import Settings
+from app.services.http_client import create_http_client
 
 logger = logging.getLogger("house_ai")
 
@@ -32,6 +33,27 @@ class CurrencyService:
     def __init__(self, settings: Settings):
         self.cache_ttl = settings.CACHE_TTL_CURRENCY
         self._rates_cache: Dict[str, float] = {}
+        self.timeout = settings.CURRENCY_HTTP_TIMEOUT
+        self.max_connections = settings.CURRENCY_HTTP_MAX_CONNECTIONS
+        self.keepalive_expiry = settings.HTTP_KEEPALIVE_EXPIRY
+        self.http2 = settings.HTTP_HTTP2
+        self.client: Optional[httpx.AsyncClient] = None
+
+    async def connect(self) -> None:
+        """Create the pooled HTTP client."""
+        self.client = create_http_client(
+            timeout=self.timeout,
+            max_connections=self.max_connections,
+            keepalive_expiry=self.keepalive_expiry,
+            http2=self.http2,
+            base_url=self.API_URL,
+        )
+
+    async def close(self) -> None:
+        """Close the pooled HTTP client."""
+        if self.client:
+            await self.client.aclose()
+            self.client = None
 
     async def get_rate(self, from_currency: str, to_currency: str) -> float:
         """Get exchange rate between two currencies."""
@@ -67,11 +89,13 @@ class CurrencyService:
         self, from_currency: str, to_currency: str
     ) -> Optional[float]:
         """Fetch rate from external API."""
+        if self.client is None:
+            await self.connect()
+
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                response = await client.get(f"{self.API_URL}/{from_currency}")
-                response.raise_for_status()
-                data = response.json()
+            response = await self.client.get(f"/{from_currency}")
+            response.raise_for_status()
+            data = response.json()
 
             rates = data.get("rates", {})
             rate = rates.get(to_currency)
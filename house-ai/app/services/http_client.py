@@ -0,0 +1,32 @@
+"""
+House AI — Shared HTTP Clients
+Factory for long-lived, pooled httpx clients owned by the services.
+"""
+
+from typing import Optional
+
+import httpx
+
+
+def create_http_client(
+    timeout: float,
+    max_connections: int,
+    keepalive_expiry: float = 30.0,
+    http2: bool = True,
+    base_url: Optional[str] = None,
+) -> httpx.AsyncClient:
+    """
+    Build a pooled AsyncClient that is created once in `init_services`
+    and closed in `shutdown_services`, so connections (and TLS sessions)
+    are reused across requests instead of re-established per call.
+    """
+    return httpx.AsyncClient(
+        base_url=base_url or "",
+        timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        http2=http2,
+    )
@@ -0,0 +1,232 @@
+"""
+House AI — LLM Provider Routing
+Rolling per-route latency/error statistics and hedged provider races.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from app.config import Settings
+
+logger = logging.getLogger("house_ai")
+
+
+class Route:
+    """One provider/model pair an LLM call can be sent to."""
+
+    __slots__ = ("provider", "client", "model")
+
+    def __init__(self, provider: str, client: Any, model: str):
+        self.provider = provider
+        self.client = client
+        self.model = model
+
+    @property
+    def key(self) -> str:
+        return f"{self.provider}:{self.model}"
+
+
+class LatencyWindow:
+    """
+    Outcomes of the last `window_s` seconds (at most `max_samples`) for
+    one route and call kind: successful latencies and the error rate.
+    """
+
+    def __init__(self, window_s: float, max_samples: int):
+        self.window_s = window_s
+        self._samples: Deque[Tuple[float, float, bool]] = deque(maxlen=max_samples)  # (at, latency, ok)
+
+    def record(self, latency: float, ok: bool) -> None:
+        self._samples.append((time.monotonic(), latency, ok))
+
+    def _recent(self) -> List[Tuple[float, float, bool]]:
+        cutoff = time.monotonic() - self.window_s
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+        return list(self._samples)
+
+    def __len__(self) -> int:
+        return len(self._recent())
+
+    def quantile(self, q: float) -> Optional[float]:
+        latencies = sorted(latency for _, latency, ok in self._recent() if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    def error_rate(self) -> float:
+        samples = self._recent()
+        if not samples:
+            return 0.0
+        return sum(1 for _, _, ok in samples if not ok) / len(samples)
+
+    def stats(self) -> Dict[str, Any]:
+        p50, p95 = self.quantile(0.5), self.quantile(0.95)
+        return {
+            "samples": len(self),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "error_rate": round(self.error_rate(), 3),
+        }
+
+
+class ProviderRouter:
+    """
+    Orders routes by recent health and races them with hedging.
+
+    The configured primary goes first unless, over the rolling window,
+    its error rate reaches LLM_DEMOTE_ERROR_RATE or its p95 is more than
+    LLM_DEMOTE_LATENCY_RATIO times the fallback's. Windows expire, so a
+    demoted primary is tried again once its bad samples age out.
+
+    `race` starts the first route and, if it has not finished within a
+    p95-derived delay (clamped to LLM_HEDGE_MIN_DELAY..LLM_HEDGE_MAX_DELAY),
+    starts the next one too; the first success wins and the rest are
+    cancelled. A failure starts the next route right away. A loser
+    cancelled that way is recorded as a failure with the time it had
+    run, so a primary that keeps losing hedges gets demoted.
+    """
+
+    def __init__(self, settings: Settings):
+        self.hedge_enabled = settings.LLM_HEDGE_ENABLED
+        self.hedge_quantile = settings.LLM_HEDGE_QUANTILE
+        self.hedge_min_delay = settings.LLM_HEDGE_MIN_DELAY
+        self.hedge_max_delay = settings.LLM_HEDGE_MAX_DELAY
+        self.demote_error_rate = settings.LLM_DEMOTE_ERROR_RATE
+        self.demote_latency_ratio = settings.LLM_DEMOTE_LATENCY_RATIO
+        self.min_samples = settings.LLM_STATS_MIN_SAMPLES
+        self.window_s = settings.LLM_STATS_WINDOW_S
+        self.max_samples = settings.LLM_STATS_MAX_SAMPLES
+        self._windows: Dict[Tuple[str, str], LatencyWindow] = {}
+
+        # Metrics
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.fallbacks = 0
+        self.demoted_calls = 0
+
+    def window(self, route: Route, kind: str) -> LatencyWindow:
+        """Stats of `route` for `kind` ("complete" or "first_token")."""
+        window = self._windows.get((route.key, kind))
+        if window is None:
+            window = self._windows[(route.key, kind)] = LatencyWindow(self.window_s, self.max_samples)
+        return window
+
+    def record(self, route: Route, kind: str, latency: float, ok: bool) -> None:
+        self.window(route, kind).record(latency, ok)
+
+    def order(self, routes: Sequence[Route], kind: str) -> List[Route]:
+        """`routes` with the primary moved behind the fallback while it is degraded."""
+        routes = list(routes)
+        if len(routes) < 2:
+            return routes
+        primary, fallback = self.window(routes[0], kind), self.window(routes[1], kind)
+        if len(primary) < self.min_samples:
+            return routes
+        degraded = primary.error_rate() >= self.demote_error_rate
+        if not degraded and len(fallback) >= self.min_samples:
+            primary_p95, fallback_p95 = primary.quantile(0.95), fallback.quantile(0.95)
+            degraded = (
+                primary_p95 is not None and fallback_p95 is not None
+                and primary_p95 > fallback_p95 * self.demote_latency_ratio
+                and fallback.error_rate() < self.demote_error_rate
+            )
+        if degraded:
+            self.demoted_calls += 1
+            routes[0], routes[1] = routes[1], routes[0]
+        return routes
+
+    def hedge_delay(self, route: Route, kind: str) -> float:
+        window = self.window(route, kind)
+        threshold = window.quantile(self.hedge_quantile) if len(window) >= self.min_samples else None
+        if threshold is None:
+            return self.hedge_max_delay
+        return min(max(threshold, self.hedge_min_delay), self.hedge_max_delay)
+
+    async def race(
+        self,
+        routes: Sequence[Route],
+        kind: str,
+        attempt: Callable[[Route], Awaitable[Any]],
+        discard: Optional[Callable[[Any], Awaitable[None]]] = None,
+    ) -> Any:
+        """
+        Result of the first route whose `attempt` succeeds. `discard` is
+        awaited for any other result that completes anyway (e.g. to close
+        a losing stream). Raises the last error if every route fails.
+        """
+        queue = list(routes)
+        running: Dict[asyncio.Task, Route] = {}
+        started: Dict[asyncio.Task, float] = {}
+        first_route = queue[0]
+
+        def launch() -> None:
+            route = queue.pop(0)
+            task = asyncio.create_task(attempt(route))
+            running[task] = route
+            started[task] = time.perf_counter()
+
+        launch()
+        delay = self.hedge_delay(first_route, kind)
+        hedged = False
+        won = False
+        error: Optional[BaseException] = None
+        try:
+            while running:
+                hedge = self.hedge_enabled and queue and len(running) == 1
+                done, _ = await asyncio.wait(
+                    running, timeout=delay if hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    self.hedges += 1
+                    hedged = True
+                    logger.info(f"Hedging {kind}: {first_route.key} slower than {delay:.2f}s, starting {queue[0].key}")
+                    launch()
+                    continue
+
+                winner = None
+                for task in done:
+                    route = running.pop(task)
+                    if task.exception() is not None:
+                        error = task.exception()
+                        logger.warning(f"LLM {kind} via {route.key} failed: {type(error).__name__}: {error}")
+                    elif winner is None:
+                        winner = (route, task.result())
+                    elif discard is not None:
+                        await discard(task.result())
+                if winner is not None:
+                    route, result = winner
+                    if hedged and route is not first_route:
+                        self.hedge_wins += 1
+                    won = True
+                    return result
+                if not running and queue:
+                    self.fallbacks += 1
+                    launch()
+            raise error
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                cancelled_at = time.perf_counter()
+                results = await asyncio.gather(*running, return_exceptions=True)
+                for (task, route), result in zip(running.items(), results):
+                    if isinstance(result, asyncio.CancelledError):
+                        if won:
+                            # Censored sample: the loser would have taken at least this long
+                            self.record(route, kind, cancelled_at - started[task], ok=False)
+                    elif discard is not None and not isinstance(result, BaseException):
+                        await discard(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "routes": {f"{key}:{kind}": w.stats() for (key, kind), w in self._windows.items()},
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "fallbacks": self.fallbacks,
+            "demoted_calls": self.demoted_calls,
+        }
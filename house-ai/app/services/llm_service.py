@@ -3,13 +3,20 @@ House AI — LLM Service
 Async OpenAI client with smart model routing, streaming, and embeddings.
 """
 
+import asyncio
 import logging
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Any, AsyncGenerator, Dict, List, Optional, Set, Tuple
+
 import tiktoken
-from typing import AsyncGenerator, List, Optional
 
 from openai import AsyncOpenAI
 
 from app.config import Settings
+from app.services.llm_routing import ProviderRouter, Route
 
 logger = logging.getLogger("house_ai")
 
@@ -18,13 +25,22 @@ class LLMService:
     """OpenAI LLM service with smart routing and token tracking."""
 
     def __init__(self, settings: Settings):
+        # SDK retries (default) for embeddings and single-provider calls
         self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
         self.client_groq = None
+        self._client_failover = None
         if settings.GROQ_API_KEY:
+            # With a second provider, failover (see ProviderRouter) replaces
+            # SDK retries of chat calls; embeddings keep self.client
             self.client_groq = AsyncOpenAI(
                 base_url="https://api.groq.com/openai/v1",
-                api_key=settings.GROQ_API_KEY
+                api_key=settings.GROQ_API_KEY,
+                max_retries=settings.LLM_MAX_RETRIES,
             )
+            self._client_failover = self.client.with_options(max_retries=settings.LLM_MAX_RETRIES)
+        self.router = ProviderRouter(settings)
+        self.timeout = settings.LLM_TIMEOUT
+        self.first_token_timeout = settings.LLM_FIRST_TOKEN_TIMEOUT
         self.model_default = settings.LLM_MODEL_DEFAULT
         self.model_advanced = settings.LLM_MODEL_ADVANCED
         self.model_fallback = settings.LLM_MODEL_FALLBACK
@@ -33,6 +49,25 @@ class LLMService:
         self.confidence_threshold = settings.CONFIDENCE_THRESHOLD
         self._encoding = None
 
+        # Embedding cache (in-process LRU → Redis) and micro-batcher
+        self._redis = None
+        self.embedding_cache_size = settings.EMBEDDING_CACHE_SIZE
+        self.embedding_cache_ttl = settings.CACHE_TTL_EMBEDDINGS
+        self.embed_batch_window = settings.EMBEDDING_BATCH_WINDOW_MS / 1000
+        self.embed_batch_max = settings.EMBEDDING_BATCH_MAX_SIZE
+        self._embedding_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._pending_embeds: Dict[str, asyncio.Future] = {}
+        self._batch_timer: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self._embed_stats = {
+            "local_hits": 0, "redis_hits": 0, "misses": 0,
+            "batches": 0, "batched_texts": 0,
+        }
+
+    def set_redis(self, redis_service) -> None:
+        """Attach RedisService for the shared embedding cache."""
+        self._redis = redis_service
+
     @property
     def encoding(self):
         if self._encoding is None:
@@ -47,11 +82,15 @@ class LLMService:
         return len(self.encoding.encode(text))
 
     def count_messages_tokens(self, messages: list[dict]) -> int:
-        """Count tokens across a list of chat messages."""
+        """
+        Count tokens across a list of chat messages.
+        Uses the per-message "tokens" count stored in session memory when present.
+        """
         total = 0
         for msg in messages:
             total += 4  # message overhead
-            total += self.count_tokens(msg.get("content", ""))
+            cached = msg.get("tokens")
+            total += cached if cached is not None else self.count_tokens(msg.get("content", ""))
             total += self.count_tokens(msg.get("role", ""))
         total += 2  # reply priming
         return total
@@ -64,6 +103,15 @@ class LLMService:
             return self.model_advanced
         return self.model_default
 
+    def _routes(self, model: str, kind: str) -> List[Route]:
+        if not self.client_groq:
+            return [Route("openai", self.client, model)]
+        routes = [
+            Route("openai", self._client_failover, model),
+            Route("groq", self.client_groq, self.model_fallback),
+        ]
+        return self.router.order(routes, kind)
+
     async def complete(
         self,
         messages: list[dict],
@@ -73,23 +121,34 @@ class LLMService:
     ) -> dict:
         """
         Single completion call. Returns dict with 'content', 'model', 'tokens'.
+
+        Each provider gets LLM_TIMEOUT; a slow one is hedged and a failed
+        one replaced by the next route (see ProviderRouter).
         """
         model = model or self.model_default
         max_tokens = max_tokens or self.max_response_tokens
 
-        try:
-            response = await self.client.chat.completions.create(
-                model=model,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens,
-            )
+        async def attempt(route: Route) -> dict:
+            start = time.perf_counter()
+            try:
+                async with asyncio.timeout(self.timeout):
+                    response = await route.client.chat.completions.create(
+                        model=route.model,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                    )
+            except asyncio.CancelledError:
+                raise
+            except BaseException:
+                self.router.record(route, "complete", time.perf_counter() - start, ok=False)
+                raise
+            self.router.record(route, "complete", time.perf_counter() - start, ok=True)
             choice = response.choices[0]
             usage = response.usage
-
             return {
                 "content": choice.message.content or "",
-                "model": model,
+                "model": route.model,
                 "tokens": {
                     "prompt": usage.prompt_tokens if usage else 0,
                     "completion": usage.completion_tokens if usage else 0,
@@ -97,33 +156,8 @@ class LLMService:
                 },
                 "finish_reason": choice.finish_reason,
             }
-        except Exception as e:
-            logger.warning(f"Primary LLM failed: {e}")
-            if self.client_groq:
-                logger.info("Switching to Groq fallback...")
-                try:
-                    response = await self.client_groq.chat.completions.create(
-                        model=self.model_fallback,
-                        messages=messages,
-                        temperature=temperature,
-                        max_tokens=max_tokens,
-                    )
-                    choice = response.choices[0]
-                    usage = response.usage
-                    return {
-                        "content": choice.message.content or "",
-                        "model": self.model_fallback,
-                        "tokens": {
-                            "prompt": usage.prompt_tokens if usage else 0,
-                            "completion": usage.completion_tokens if usage else 0,
-                            "total": usage.total_tokens if usage else 0,
-                        },
-                        "finish_reason": choice.finish_reason,
-                    }
-                except Exception as e2:
-                    logger.error(f"Groq fallback failed: {e2}")
-                    raise e2
-            raise e
+
+        return await self.router.race(self._routes(model, "complete"), "complete", attempt)
 
     async def stream(
         self,
@@ -131,44 +165,106 @@ class LLMService:
         model: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
+        usage: Optional[dict] = None,
     ) -> AsyncGenerator[str, None]:
         """
         Streaming completion — yields text chunks.
+
+        Providers race for the first token: each gets
+        LLM_FIRST_TOKEN_TIMEOUT, a slow one is hedged, and the loser's
+        stream is closed. Once text has been yielded there is no failover,
+        so a mid-stream error is raised rather than repeating the answer.
+
+        Pass a dict as `usage` to have it filled with the model used and
+        prompt/completion/total token counts once the stream finishes.
+        Counts come from the provider's final chunk (OpenAI `usage`, Groq
+        `x_groq.usage`); if it reported none, e.g. because the consumer
+        stopped early, they are estimated with tiktoken and `estimated`
+        is set.
         """
         model = model or self.model_default
         max_tokens = max_tokens or self.max_response_tokens
 
-        try:
-            stream = await self.client.chat.completions.create(
-                model=model,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                stream=True,
+        async def attempt(route: Route) -> Tuple[Route, Any, Any, list]:
+            # Open the stream and read up to the first content chunk
+            extra = (
+                {"stream_options": {"include_usage": True}}
+                if usage is not None and route.provider == "openai" else {}
             )
-            async for chunk in stream:
-                if chunk.choices and chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
-        except Exception as e:
-            logger.warning(f"Primary LLM stream failed: {e}")
-            if self.client_groq:
-                logger.info("Switching to Groq fallback stream...")
-                try:
-                    stream = await self.client_groq.chat.completions.create(
-                        model=self.model_fallback,
+            start = time.perf_counter()
+            stream = None
+            try:
+                async with asyncio.timeout(self.first_token_timeout):
+                    stream = await route.client.chat.completions.create(
+                        model=route.model,
                         messages=messages,
                         temperature=temperature,
                         max_tokens=max_tokens,
                         stream=True,
+                        **extra,
                     )
-                    async for chunk in stream:
+                    chunks = stream.__aiter__()
+                    head = []
+                    async for chunk in chunks:
+                        head.append(chunk)
                         if chunk.choices and chunk.choices[0].delta.content:
-                            yield chunk.choices[0].delta.content
-                    return
-                except Exception as e2:
-                    logger.error(f"Groq fallback stream failed: {e2}")
-                    raise e2
-            raise e
+                            break
+            except BaseException as e:
+                if stream is not None:
+                    await stream.close()
+                if not isinstance(e, asyncio.CancelledError):
+                    self.router.record(route, "first_token", time.perf_counter() - start, ok=False)
+                raise
+            self.router.record(route, "first_token", time.perf_counter() - start, ok=True)
+            return route, stream, chunks, head
+
+        async def discard(opened: Tuple[Route, Any, Any, list]) -> None:
+            await opened[1].close()
+
+        route, stream, chunks, head = await self.router.race(
+            self._routes(model, "first_token"), "first_token", attempt, discard
+        )
+        parts: List[str] = []
+        try:
+            for chunk in head:
+                self._record_stream_usage(usage, route.model, chunk)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+            async for chunk in chunks:
+                self._record_stream_usage(usage, route.model, chunk)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            logger.error(f"LLM stream via {route.key} failed mid-answer: {e}")
+            raise
+        finally:
+            # Release the upstream connection when the consumer stops early
+            await stream.close()
+            if usage is not None and not usage.get("total"):
+                prompt = self.count_messages_tokens(messages)
+                completion = self.count_tokens("".join(parts))
+                usage.update(prompt=prompt, completion=completion, total=prompt + completion, estimated=True)
+
+    def llm_stats(self) -> Dict:
+        return self.router.stats()
+
+    @staticmethod
+    def _record_stream_usage(usage: Optional[dict], model: str, chunk) -> None:
+        if usage is None:
+            return
+        usage["model"] = model
+        stats = getattr(chunk, "usage", None)
+        if not stats:
+            # Groq reports usage under `x_groq` on the final chunk
+            x_groq = getattr(chunk, "x_groq", None)
+            stats = x_groq.get("usage") if isinstance(x_groq, dict) else getattr(x_groq, "usage", None)
+        if stats:
+            field = stats.get if isinstance(stats, dict) else (lambda name: getattr(stats, name, 0))
+            usage["prompt"] = field("prompt_tokens") or 0
+            usage["completion"] = field("completion_tokens") or 0
+            usage["total"] = field("total_tokens") or 0
 
     async def embed(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings for a list of texts."""
@@ -182,7 +278,106 @@ class LLMService:
             logger.error(f"Embedding error: {e}")
             raise
 
+    @staticmethod
+    def normalize_embedding_text(text: str) -> str:
+        """
+        Canonical form of `text` for cache keys (embeddings and classifier
+        results); never sent to the API, which embeds the original text.
+        """
+        text = unicodedata.normalize("NFKC", text)
+        return " ".join(text.lower().split())
+
     async def embed_single(self, text: str) -> List[float]:
-        """Generate embedding for a single text."""
-        embeddings = await self.embed([text])
-        return embeddings[0]
+        """
+        Generate embedding for a single text.
+
+        Looks in the in-process LRU, then Redis (float32 bytes), and only
+        then joins the micro-batcher that coalesces concurrent calls into
+        one embeddings request. The normalized text only keys the caches;
+        the API always embeds `text` as given.
+        """
+        normalized = self.normalize_embedding_text(text)
+        key = self._redis.embedding_cache_key(self.embedding_model, normalized) if self._redis else normalized
+
+        cached = self._embedding_cache.get(key)
+        if cached is not None:
+            self._embedding_cache.move_to_end(key)
+            self._embed_stats["local_hits"] += 1
+            return cached
+
+        if self._redis:
+            raw = await self._redis.get_bytes(key)
+            if raw:
+                vector = array("f")
+                vector.frombytes(raw)
+                embedding = vector.tolist()
+                self._remember_embedding(key, embedding)
+                self._embed_stats["redis_hits"] += 1
+                return embedding
+
+        self._embed_stats["misses"] += 1
+        embedding = await self._batched_embed(text)
+        self._remember_embedding(key, embedding)
+        if self._redis:
+            await self._redis.set_bytes(
+                key, array("f", embedding).tobytes(), self.embedding_cache_ttl
+            )
+        return embedding
+
+    def _remember_embedding(self, key: str, embedding: List[float]) -> None:
+        self._embedding_cache[key] = embedding
+        self._embedding_cache.move_to_end(key)
+        while len(self._embedding_cache) > self.embedding_cache_size:
+            self._embedding_cache.popitem(last=False)
+
+    async def _batched_embed(self, text: str) -> List[float]:
+        """Queue a text for the next batch; identical in-flight texts share one slot."""
+        future = self._pending_embeds.get(text)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending_embeds[text] = future
+            if len(self._pending_embeds) >= self.embed_batch_max:
+                self._start_flush()
+            elif self._batch_timer is None:
+                self._batch_timer = loop.call_later(self.embed_batch_window, self._start_flush)
+        # Shield so one cancelled caller doesn't fail the others sharing the future
+        return await asyncio.shield(future)
+
+    def _start_flush(self) -> None:
+        # Keep a reference so the loop can't garbage-collect a flush mid-request
+        task = asyncio.create_task(self._flush_embeds())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush_embeds(self) -> None:
+        """Send all queued texts as one embeddings.create call."""
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        batch, self._pending_embeds = self._pending_embeds, {}
+        if not batch:
+            return
+
+        texts = list(batch.keys())
+        self._embed_stats["batches"] += 1
+        self._embed_stats["batched_texts"] += len(texts)
+        try:
+            embeddings = await self.embed(texts)
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for text, embedding in zip(texts, embeddings):
+            future = batch[text]
+            if not future.done():
+                future.set_result(embedding)
+
+    def embedding_stats(self) -> Dict:
+        stats = dict(self._embed_stats)
+        stats["cache_size"] = len(self._embedding_cache)
+        stats["avg_batch_size"] = (
+            round(stats["batched_texts"] / stats["batches"], 2) if stats["batches"] else 0.0
+        )
+        return stats
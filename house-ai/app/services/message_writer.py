@@ -0,0 +1,155 @@
+"""
+House AI — Message Write-Behind Queue
+Persists chat messages to Supabase in background batches, off the response path.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.services.supabase_service import SupabaseService
+from app.config import Settings
+
+logger = logging.getLogger("house_ai")
+
+
+class MessageWriter:
+    """
+    Per-worker write-behind queue for `chat_messages`.
+
+    Rows are stamped with `created_at` when enqueued (so ordering is kept
+    regardless of when they land) and flushed as multi-row inserts when
+    the batch fills up or every `flush_interval` seconds. Failed batches
+    are retried with exponential backoff; the queue is drained on shutdown.
+    """
+
+    def __init__(self, supabase: SupabaseService, settings: Settings):
+        self.supabase = supabase
+        self.batch_size = settings.MESSAGE_WRITE_BATCH_SIZE
+        self.flush_interval = settings.MESSAGE_WRITE_FLUSH_INTERVAL
+        self.max_retries = settings.MESSAGE_WRITE_MAX_RETRIES
+        self.max_pending = settings.MESSAGE_WRITE_MAX_PENDING
+        self.drain_timeout = settings.MESSAGE_WRITE_DRAIN_TIMEOUT
+
+        self._pending: deque = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        # Metrics
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.retries = 0
+        self.dropped = 0
+        self.in_flight = 0
+        self.last_flush_ms: Optional[float] = None
+
+    # ── Lifecycle ────────────────────────────────────────
+
+    def start(self) -> None:
+        """Start the background flush loop."""
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop after draining everything still queued."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        done, _ = await asyncio.wait({self._task}, timeout=self.drain_timeout)
+        if not done:
+            # Count before cancelling: the batch being written is lost too
+            in_flight = self.in_flight
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            logger.error(
+                f"Message writer drain timed out, {len(self._pending) + in_flight} messages "
+                f"not persisted ({in_flight} in flight)"
+            )
+        self._task = None
+
+    # ── Enqueue ──────────────────────────────────────────
+
+    def enqueue(self, session_id: str, role: str, content: str) -> None:
+        """Queue a chat message for persistence. Never blocks."""
+        if len(self._pending) >= self.max_pending:
+            # Supabase has been failing for a while — shed the oldest rows
+            self._pending.popleft()
+            self.dropped += 1
+        self._pending.append({
+            "session_id": session_id,
+            "role": role,
+            "content": content,
+            "created_at": datetime.utcnow().isoformat(),
+        })
+        self.enqueued += 1
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    # ── Flushing ─────────────────────────────────────────
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._flush_pending()
+            if self._stopping and not self._pending:
+                return
+
+    async def _flush_pending(self) -> None:
+        while self._pending:
+            batch = [
+                self._pending.popleft()
+                for _ in range(min(self.batch_size, len(self._pending)))
+            ]
+            await self._write(batch)
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        """Insert one batch, retrying transient failures with backoff."""
+        self.in_flight = len(batch)
+        start = time.perf_counter()
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    await self.supabase.save_messages(batch)
+                    self.written += len(batch)
+                    self.batches += 1
+                    self.last_flush_ms = round((time.perf_counter() - start) * 1000, 2)
+                    return
+                except Exception as e:
+                    if attempt == self.max_retries:
+                        self.dropped += len(batch)
+                        logger.error(
+                            f"Message batch dropped after {attempt + 1} attempts "
+                            f"({len(batch)} rows): {e}"
+                        )
+                        return
+                    self.retries += 1
+                    delay = min(30.0, 0.5 * 2 ** attempt)
+                    logger.warning(f"Message batch insert failed, retrying in {delay}s: {e}")
+                    await asyncio.sleep(delay)
+        finally:
+            self.in_flight = 0
+
+    # ── Metrics ──────────────────────────────────────────
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": len(self._pending),
+            "in_flight": self.in_flight,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "retries": self.retries,
+            "dropped": self.dropped,
+            "last_flush_ms": self.last_flush_ms,
+        }
@@ -0,0 +1,57 @@
+"""
+House AI — Query Normalization
+Canonical form of user queries and fixed-length hashed cache keys.
+"""
+
+import hashlib
+import re
+import unicodedata
+from typing import Iterable, Optional
+
+# Uzbek oʻ/gʻ and the apostrophe are typed with any of these
+APOSTROPHES = str.maketrans({c: "'" for c in "ʻʼʹʽ‘’‚‛`´′"})
+
+_TOKEN_RE = re.compile(r"[^\W_]+(?:'[^\W_]+)*\+*")
+
+# Words that never change the answer. Negations and question words stay.
+STOPWORDS = {
+    "en": frozenset({
+        "a", "an", "the", "is", "are", "am", "be", "i", "me", "my", "you",
+        "can", "could", "would", "will", "do", "does", "please", "pls", "plz",
+        "just", "some", "hi", "hello", "hey", "thanks", "thank",
+    }),
+    "uz": frozenset({
+        "iltimos", "men", "menga", "mening", "siz", "sizga", "sizda",
+        "salom", "rahmat", "ham", "edi", "bu", "shu", "endi",
+    }),
+    "ru": frozenset({
+        "пожалуйста", "я", "мне", "мой", "моя", "вы", "вам", "подскажите",
+        "скажите", "здравствуйте", "привет", "спасибо", "а", "и", "же",
+        "ли", "бы", "это", "вот",
+    }),
+}
+
+
+def normalize_query(text: str, language: Optional[str] = None, strip_stopwords: bool = True) -> str:
+    """
+    Canonical text for cache keys: NFKC, lowercase, one apostrophe,
+    punctuation dropped ("+" kept, as in "Pro+"), whitespace collapsed
+    and, for a known `language`, its stopwords removed. A query made
+    only of stopwords keeps them rather than collapsing to "".
+    """
+    text = unicodedata.normalize("NFKC", text).translate(APOSTROPHES).lower()
+    tokens = _TOKEN_RE.findall(text)
+    stopwords = STOPWORDS.get(language or "", frozenset()) if strip_stopwords else frozenset()
+    kept = [t for t in tokens if t not in stopwords]
+    return " ".join(kept or tokens)
+
+
+def cache_digest(*parts: object) -> str:
+    """Fixed-length key fragment for any number of already-normalized parts."""
+    joined = "\x1f".join("" if p is None else str(p) for p in parts)
+    return hashlib.sha1(joined.encode("utf-8")).hexdigest()
+
+
+def normalize_names(names: Iterable[str]) -> list:
+    """Sorted, de-duplicated canonical product names (order-insensitive keys)."""
+    return sorted({normalize_query(n, strip_stopwords=False) for n in names} - {""})
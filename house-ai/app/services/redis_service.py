@@ -3,16 +3,140 @@ House AI — Redis Service
 Async Redis client for caching, session memory, and token tracking.
 """
 
+import hashlib
 import json
 import logging
-from typing import Optional, Any, List, Dict
+import uuid
+from contextvars import ContextVar
+from typing import Optional, Any, List, Dict, Tuple
 
 import redis.asyncio as aioredis
+from redis.asyncio.client import Pipeline
 
 from app.config import Settings
+from app.services.normalization import cache_digest, normalize_names, normalize_query
 
 logger = logging.getLogger("house_ai")
 
+DAILY_TTL = 86400  # 24h
+
+
+# Sum the "tokens" field of JSON-encoded list items (missing → 0)
+_SUM_TOKENS_LUA = """
+local function sum_tokens(items)
+    local total = 0
+    for _, item in ipairs(items) do
+        local ok, msg = pcall(cjson.decode, item)
+        if ok and type(msg) == 'table' and tonumber(msg.tokens) then
+            total = total + tonumber(msg.tokens)
+        end
+    end
+    return total
+end
+
+local function add_total(meta, delta)
+    local total = redis.call('HINCRBY', meta, 'tokens', delta)
+    if total < 0 then
+        redis.call('HSET', meta, 'tokens', 0)
+        total = 0
+    end
+    return total
+end
+"""
+
+# KEYS = messages list, meta hash; ARGV = max_messages, ttl, message...
+# Returns the session's token total after the append and trim. The meta
+# hash's `seq` counts every message ever appended (see trim_session_memory).
+APPEND_SESSION_LUA = _SUM_TOKENS_LUA + """
+local new = {}
+for i = 3, #ARGV do new[#new + 1] = ARGV[i] end
+
+local length = redis.call('RPUSH', KEYS[1], unpack(new))
+redis.call('HINCRBY', KEYS[2], 'seq', #new)
+local dropped = 0
+local excess = length - tonumber(ARGV[1])
+if excess > 0 then
+    dropped = sum_tokens(redis.call('LRANGE', KEYS[1], 0, excess - 1))
+    redis.call('LTRIM', KEYS[1], excess, -1)
+end
+
+local total = add_total(KEYS[2], sum_tokens(new) - dropped)
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+return total
+"""
+
+# KEYS = messages list, meta hash; ARGV = seq when the list was read, keep
+# Keeps the last `keep` messages of that read plus everything appended
+# since, counted from the tail, so auto-trims and concurrent appends in
+# between can't shift what is dropped.
+TRIM_SESSION_LUA = _SUM_TOKENS_LUA + """
+local appended = tonumber(redis.call('HGET', KEYS[2], 'seq') or '0') - tonumber(ARGV[1])
+local keep = tonumber(ARGV[2]) + math.max(appended, 0)
+local drop = redis.call('LLEN', KEYS[1]) - keep
+if drop <= 0 then
+    return add_total(KEYS[2], 0)
+end
+local dropped = sum_tokens(redis.call('LRANGE', KEYS[1], 0, drop - 1))
+redis.call('LTRIM', KEYS[1], drop, -1)
+return add_total(KEYS[2], -dropped)
+"""
+
+# Delete the lock only if we still own it (token matches)
+RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+# ── Round-trip Instrumentation ──────────────────────────────
+
+class RoundTripCounter:
+    """Mutable per-request tally, shared with child tasks via the context."""
+
+    def __init__(self):
+        self.count = 0
+
+
+_round_trips: ContextVar[Optional[RoundTripCounter]] = ContextVar(
+    "redis_round_trips", default=None
+)
+
+
+def start_round_trip_count() -> RoundTripCounter:
+    """Begin counting Redis round-trips for the current request context."""
+    counter = RoundTripCounter()
+    _round_trips.set(counter)
+    return counter
+
+
+def _count_round_trip() -> None:
+    counter = _round_trips.get()
+    if counter is not None:
+        counter.count += 1
+
+
+class _CountingPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        if self.command_stack:
+            _count_round_trip()
+        return await super().execute(raise_on_error)
+
+
+class _CountingRedis(aioredis.Redis):
+    """Redis client that counts every command / pipeline sent to the server."""
+
+    async def execute_command(self, *args, **options):
+        _count_round_trip()
+        return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> Pipeline:
+        return _CountingPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
 
 class RedisService:
     """Async Redis service for caching and session management."""
@@ -21,26 +145,37 @@ class RedisService:
         self.url = settings.REDIS_URL
         self.max_session_messages = settings.SESSION_MEMORY_MAX_MESSAGES
         self.client: Optional[aioredis.Redis] = None
+        # Separate pool without response decoding, for compact binary values
+        self.binary_client: Optional[aioredis.Redis] = None
+        self._scripts: Dict[str, Any] = {}
 
     async def connect(self) -> None:
         """Connect to Redis."""
         try:
-            self.client = aioredis.from_url(
+            self.client = _CountingRedis.from_url(
                 self.url,
                 encoding="utf-8",
                 decode_responses=True,
                 socket_connect_timeout=5,
             )
             await self.client.ping()
+            self.binary_client = _CountingRedis.from_url(
+                self.url,
+                decode_responses=False,
+                socket_connect_timeout=5,
+            )
             logger.info("Redis connected")
         except Exception as e:
             logger.warning(f"Redis connection failed: {e}. Using fallback mode.")
             self.client = None
+            self.binary_client = None
 
     async def disconnect(self) -> None:
         """Disconnect from Redis."""
         if self.client:
             await self.client.close()
+            if self.binary_client:
+                await self.binary_client.close()
             logger.info("Redis disconnected")
 
     @property
@@ -71,6 +206,29 @@ class RedisService:
         except Exception as e:
             logger.warning(f"Redis set error: {e}")
 
+    async def get_many_cached(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several cached values in one MGET; misses are None."""
+        if not self.is_connected or not keys:
+            return [None] * len(keys)
+        try:
+            values = await self.client.mget(keys)
+            return [json.loads(v) if v else None for v in values]
+        except Exception as e:
+            logger.warning(f"Redis mget error: {e}")
+            return [None] * len(keys)
+
+    async def set_many_cached(self, items: Dict[str, Any], ttl: int = 3600) -> None:
+        """Set several cached values with one TTL in a single pipeline."""
+        if not self.is_connected or not items:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.setex(key, ttl, json.dumps(value, default=str))
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis set many error: {e}")
+
     async def delete_cached(self, key: str) -> None:
         """Delete a cached key."""
         if not self.is_connected:
@@ -80,12 +238,45 @@ class RedisService:
         except Exception as e:
             logger.warning(f"Redis delete error: {e}")
 
+    async def get_bytes(self, key: str) -> Optional[bytes]:
+        """Get a raw binary value by key."""
+        if not self.binary_client:
+            return None
+        try:
+            return await self.binary_client.get(key)
+        except Exception as e:
+            logger.warning(f"Redis get bytes error: {e}")
+            return None
+
+    async def set_bytes(self, key: str, value: bytes, ttl: int = 3600) -> None:
+        """Set a raw binary value with TTL."""
+        if not self.binary_client:
+            return
+        try:
+            await self.binary_client.setex(key, ttl, value)
+        except Exception as e:
+            logger.warning(f"Redis set bytes error: {e}")
+
     # ── Session Memory ───────────────────────────────────
+    #
+    # Each stored message carries its own token count ("tokens"), and a
+    # per-session hash keeps the running total of the retained messages,
+    # so the summarization threshold check never re-tokenizes history.
 
     def _session_key(self, session_id: str) -> str:
         return f"session:{session_id}:messages"
 
-    async def get_session_memory(self, session_id: str) -> List[Dict[str, str]]:
+    def _session_meta_key(self, session_id: str) -> str:
+        return f"session:{session_id}:meta"
+
+    def _script(self, source: str):
+        """Return a registered (EVALSHA-cached) script for the text client."""
+        script = self._scripts.get(source)
+        if script is None:
+            script = self._scripts[source] = self.client.register_script(source)
+        return script
+
+    async def get_session_memory(self, session_id: str) -> List[Dict[str, Any]]:
         """Get session messages from Redis (short-term memory)."""
         if not self.is_connected:
             return []
@@ -97,35 +288,131 @@ class RedisService:
             logger.warning(f"Redis session memory get error: {e}")
             return []
 
+    async def get_session_snapshot(self, session_id: str) -> Tuple[List[Dict[str, Any]], int]:
+        """Session messages and the append sequence number, read atomically."""
+        if not self.is_connected:
+            return [], 0
+        try:
+            pipe = self.client.pipeline(transaction=True)
+            pipe.lrange(self._session_key(session_id), 0, -1)
+            pipe.hget(self._session_meta_key(session_id), "seq")
+            messages, seq = await pipe.execute()
+            return [json.loads(m) for m in messages], int(seq or 0)
+        except Exception as e:
+            logger.warning(f"Redis session snapshot get error: {e}")
+            return [], 0
+
+    async def get_session_tokens(self, session_id: str) -> int:
+        """Running token total of the messages currently in session memory."""
+        if not self.is_connected:
+            return 0
+        try:
+            tokens = await self.client.hget(self._session_meta_key(session_id), "tokens")
+            return int(tokens) if tokens else 0
+        except Exception as e:
+            logger.warning(f"Redis session tokens get error: {e}")
+            return 0
+
     async def add_to_session_memory(
         self,
         session_id: str,
         role: str,
         content: str,
-    ) -> None:
-        """Append a message to session memory and auto-trim."""
+        tokens: int = 0,
+    ) -> int:
+        """Append a message to session memory and auto-trim. Returns the token total."""
+        return await self._push_session_messages(
+            session_id, [{"role": role, "content": content, "tokens": tokens}]
+        )
+
+    async def append_exchange(
+        self,
+        session_id: str,
+        user_message: str,
+        assistant_response: str,
+        user_tokens: int = 0,
+        assistant_tokens: int = 0,
+    ) -> int:
+        """Append a user/assistant pair in a single round-trip. Returns the token total."""
+        return await self._push_session_messages(session_id, [
+            {"role": "user", "content": user_message, "tokens": user_tokens},
+            {"role": "assistant", "content": assistant_response, "tokens": assistant_tokens},
+        ])
+
+    async def trim_session_memory(self, session_id: str, seq: int, keep: int) -> int:
+        """
+        Keep the last `keep` messages of the snapshot taken at `seq` (see
+        get_session_snapshot) plus anything appended since; drop the rest.
+        Returns the remaining token total.
+        """
         if not self.is_connected:
-            return
+            return 0
         try:
-            key = self._session_key(session_id)
-            message = json.dumps({"role": role, "content": content})
-            await self.client.rpush(key, message)
-            # Auto-trim to keep only last N messages
-            await self.client.ltrim(key, -self.max_session_messages, -1)
-            # Set expiry (24h)
-            await self.client.expire(key, 86400)
+            return await self._script(TRIM_SESSION_LUA)(
+                keys=[self._session_key(session_id), self._session_meta_key(session_id)],
+                args=[seq, keep],
+            )
+        except Exception as e:
+            logger.warning(f"Redis session memory trim error: {e}")
+            return 0
+
+    async def _push_session_messages(
+        self,
+        session_id: str,
+        messages: List[Dict[str, Any]],
+    ) -> int:
+        """RPUSH + LTRIM + token bookkeeping + EXPIRE as one script call."""
+        if not self.is_connected:
+            return 0
+        try:
+            return await self._script(APPEND_SESSION_LUA)(
+                keys=[self._session_key(session_id), self._session_meta_key(session_id)],
+                args=[self.max_session_messages, DAILY_TTL, *(json.dumps(m) for m in messages)],
+            )
         except Exception as e:
             logger.warning(f"Redis session memory add error: {e}")
+            return 0
 
     async def clear_session_memory(self, session_id: str) -> None:
         """Clear session memory (e.g., after summarization)."""
         if not self.is_connected:
             return
         try:
-            await self.client.delete(self._session_key(session_id))
+            await self.client.delete(
+                self._session_key(session_id), self._session_meta_key(session_id)
+            )
         except Exception as e:
             logger.warning(f"Redis session memory clear error: {e}")
 
+    # ── Distributed Locks ────────────────────────────────
+
+    async def acquire_lock(self, name: str, ttl: int) -> Optional[str]:
+        """
+        Try to take `lock:<name>` for `ttl` seconds (SET NX EX).
+
+        Returns an ownership token, or None if another holder has it.
+        Without Redis there is nothing to coordinate with, so the lock
+        is always granted.
+        """
+        token = uuid.uuid4().hex
+        if not self.is_connected:
+            return token
+        try:
+            acquired = await self.client.set(f"lock:{name}", token, nx=True, ex=ttl)
+            return token if acquired else None
+        except Exception as e:
+            logger.warning(f"Redis lock acquire error: {e}")
+            return None
+
+    async def release_lock(self, name: str, token: str) -> None:
+        """Release a lock taken with acquire_lock, if we still own it."""
+        if not self.is_connected:
+            return
+        try:
+            await self.client.eval(RELEASE_LOCK_LUA, 1, f"lock:{name}", token)
+        except Exception as e:
+            logger.warning(f"Redis lock release error: {e}")
+
     # ── Token Usage Tracking ─────────────────────────────
 
     def _token_key(self, user_id: str) -> str:
@@ -148,30 +435,115 @@ class RedisService:
             return 0
         try:
             key = self._token_key(user_id)
-            new_total = await self.client.incrby(key, tokens)
-            # Set expiry to end of day (24h max)
-            ttl = await self.client.ttl(key)
-            if ttl == -1:  # no expiry set
-                await self.client.expire(key, 86400)
+            pipe = self.client.pipeline(transaction=True)
+            pipe.incrby(key, tokens)
+            # Expiry starts with the day's first increment (24h max)
+            pipe.expire(key, DAILY_TTL, nx=True)
+            new_total, _ = await pipe.execute()
             return new_total
         except Exception as e:
             logger.warning(f"Redis token usage increment error: {e}")
             return 0
 
+    # ── Semantic Cache Entries ───────────────────────────
+
+    def _semantic_index_key(self, language: str) -> str:
+        return f"cache:semantic:{language}:index"
+
+    def _semantic_entry_key(self, language: str, entry_id: str) -> str:
+        return f"cache:semantic:{language}:{entry_id}"
+
+    async def add_semantic_entry(
+        self,
+        language: str,
+        entry_id: str,
+        payload: Dict[str, Any],
+        created: float,
+        ttl: int,
+    ) -> None:
+        """Store a semantic cache entry and register it in the per-language index."""
+        if not self.is_connected:
+            return
+        try:
+            index_key = self._semantic_index_key(language)
+            pipe = self.client.pipeline(transaction=False)
+            pipe.setex(
+                self._semantic_entry_key(language, entry_id),
+                ttl,
+                json.dumps(payload, default=str),
+            )
+            pipe.zadd(index_key, {entry_id: created})
+            pipe.zremrangebyscore(index_key, "-inf", created - ttl)
+            pipe.expire(index_key, ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis semantic entry add error: {e}")
+
+    async def get_semantic_entries_since(
+        self,
+        language: str,
+        since: float,
+        not_before: float,
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """Return (entry_id, payload) pairs added after `since` and not expired."""
+        if not self.is_connected:
+            return []
+        try:
+            entry_ids = await self.client.zrangebyscore(
+                self._semantic_index_key(language), max(since, not_before), "+inf"
+            )
+            if not entry_ids:
+                return []
+            values = await self.client.mget(
+                [self._semantic_entry_key(language, e) for e in entry_ids]
+            )
+            return [
+                (entry_id, json.loads(value))
+                for entry_id, value in zip(entry_ids, values)
+                if value
+            ]
+        except Exception as e:
+            logger.warning(f"Redis semantic entries get error: {e}")
+            return []
+
     # ── Cache Key Builders ───────────────────────────────
 
+    # Keys hash the canonical query (app.services.normalization), so they
+    # are fixed-length and trivially different phrasings share an entry.
+
+    @staticmethod
+    def product_cache_key(
+        query: str,
+        focus: Optional[str] = None,
+        budget_min: Optional[float] = None,
+        budget_max: Optional[float] = None,
+        language: str = "en",
+    ) -> str:
+        digest = cache_digest(
+            normalize_query(query, language),
+            normalize_query(focus, strip_stopwords=False) if focus else None,
+            None if budget_min is None else f"{budget_min:g}",
+            None if budget_max is None else f"{budget_max:g}",
+            language,
+        )
+        return f"cache:product:{digest}"
+
+    @staticmethod
+    def comparison_cache_key(products: List[str], language: str = "en") -> str:
+        return f"cache:compare:{cache_digest(*normalize_names(products), language)}"
+
     @staticmethod
-    def product_cache_key(query: str) -> str:
-        return f"cache:product:{query.lower().strip()}"
+    def product_id_cache_key(name: str) -> str:
+        return f"cache:product_id:{cache_digest(normalize_query(name, strip_stopwords=False))}"
 
     @staticmethod
-    def comparison_cache_key(products: List[str]) -> str:
-        key = ":".join(sorted(p.lower().strip() for p in products))
-        return f"cache:compare:{key}"
+    def rag_cache_key(query: str, language: str = "en") -> str:
+        return f"cache:rag:{cache_digest(normalize_query(query, language), language)}"
 
     @staticmethod
-    def rag_cache_key(query: str) -> str:
-        return f"cache:rag:{query.lower().strip()}"
+    def embedding_cache_key(model: str, text: str) -> str:
+        digest = hashlib.sha1(f"{model}\0{text}".encode("utf-8")).hexdigest()
+        return f"cache:embed:{digest}"
 
     @staticmethod
     def currency_cache_key(from_cur: str, to_cur: str) -> str:
@@ -9,6 +9,7 @@ from typing import List, Dict, Any, Optional
 import httpx
 
 from app.config import Settings
+from app.services.http_client import create_http_client
 
 logger = logging.getLogger("house_ai")
 
@@ -21,6 +22,26 @@ class SearchService:
     def __init__(self, settings: Settings):
         self.api_key = settings.TAVILY_API_KEY
         self.search_count = settings.TAVILY_SEARCH_COUNT
+        self.timeout = settings.SEARCH_HTTP_TIMEOUT
+        self.max_connections = settings.SEARCH_HTTP_MAX_CONNECTIONS
+        self.keepalive_expiry = settings.HTTP_KEEPALIVE_EXPIRY
+        self.http2 = settings.HTTP_HTTP2
+        self.client: Optional[httpx.AsyncClient] = None
+
+    async def connect(self) -> None:
+        """Create the pooled HTTP client."""
+        self.client = create_http_client(
+            timeout=self.timeout,
+            max_connections=self.max_connections,
+            keepalive_expiry=self.keepalive_expiry,
+            http2=self.http2,
+        )
+
+    async def close(self) -> None:
+        """Close the pooled HTTP client."""
+        if self.client:
+            await self.client.aclose()
+            self.client = None
 
     async def search(self, query: str, count: Optional[int] = None) -> List[Dict[str, Any]]:
         """
@@ -41,15 +62,17 @@ class SearchService:
             "max_results": count,
         }
 
+        if self.client is None:
+            await self.connect()
+
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                response = await client.post(
-                    self.BASE_URL,
-                    json=payload,
-                    headers={"Content-Type": "application/json"},
-                )
-                response.raise_for_status()
-                data = response.json()
+            response = await self.client.post(
+                self.BASE_URL,
+                json=payload,
+                headers={"Content-Type": "application/json"},
+            )
+            response.raise_for_status()
+            data = response.json()
 
             results = []
             for item in data.get("results", []):
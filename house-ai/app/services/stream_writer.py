@@ -0,0 +1,208 @@
+"""
+House AI — Stream Writer
+Coalesces streamed tokens into pre-serialized frames with bounded buffering.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+import orjson
+
+from app.config import Settings
+from app.models.response_models import StreamChunk
+
+_CLOSE = object()  # sentinel: flush and stop the sender
+
+
+class StreamStats:
+    """Per-worker totals across all streamed responses."""
+
+    def __init__(self):
+        self.responses = 0
+        self.frames = 0
+        self.tokens = 0
+        self.bytes = 0
+        self.send_s = 0.0
+        self.stream_s = 0.0
+        self.blocked = 0        # writes that waited on a full queue
+        self.disconnects = 0
+        self.cancelled = 0      # answers stopped by a client `cancel`
+
+    def record(self, writer: "StreamWriter") -> None:
+        self.responses += 1
+        self.frames += writer.frames
+        self.tokens += writer.tokens
+        self.bytes += writer.bytes
+        self.send_s += writer.send_s
+        self.stream_s += writer.elapsed
+        self.blocked += writer.blocked
+        if writer.error is not None:
+            self.disconnects += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "responses": self.responses,
+            "frames": self.frames,
+            "tokens": self.tokens,
+            "bytes": self.bytes,
+            "tokens_per_frame": round(self.tokens / self.frames, 2) if self.frames else 0.0,
+            "frames_per_s": round(self.frames / self.stream_s, 1) if self.stream_s else 0.0,
+            "avg_send_ms": round(self.send_s / self.frames * 1000, 3) if self.frames else 0.0,
+            "blocked_writes": self.blocked,
+            "disconnects": self.disconnects,
+            "cancelled": self.cancelled,
+        }
+
+
+stream_stats = StreamStats()
+
+
+class StreamWriter:
+    """
+    Buffers text tokens and sends them as one frame per time window.
+
+    `write` appends tokens to a buffer that is turned into one orjson-
+    encoded `text` frame after `window_ms` or once `max_bytes` are
+    pending; any other chunk flushes the buffer first, so order is kept.
+    Frames go through a bounded queue to a sender task. While a client
+    reads slowly the buffer keeps growing, and once the queue is full a
+    size-triggered `write` waits, which stops reading the LLM stream. If
+    a send fails, every later `write` raises that error so the caller
+    can close its upstream stream.
+
+        async with StreamWriter(websocket.send_text, settings) as writer:
+            async for chunk in chunks:
+                await writer.write(chunk)
+    """
+
+    def __init__(self, send: Callable[[str], Awaitable[None]], settings: Settings):
+        self._send = send
+        self.window = settings.STREAM_COALESCE_MS / 1000
+        self.max_bytes = settings.STREAM_COALESCE_MAX_BYTES
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=settings.STREAM_QUEUE_SIZE)
+        self._buffer: List[str] = []
+        self._buffered = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._task: Optional[asyncio.Task] = None
+        self.error: Optional[BaseException] = None
+
+        # Metrics
+        self.frames = 0
+        self.tokens = 0
+        self.bytes = 0
+        self.send_s = 0.0
+        self.blocked = 0
+        self._started = 0.0
+        self.elapsed = 0.0
+
+    async def __aenter__(self) -> "StreamWriter":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close(flush=exc_type is None)
+
+    # ── Producer ─────────────────────────────────────────
+
+    def start(self) -> None:
+        if self._task is None:
+            self._started = time.perf_counter()
+            self._task = asyncio.create_task(self._run())
+
+    async def write(self, chunk: Union[str, StreamChunk]) -> None:
+        """Buffer a token (str or plain `text` chunk), or send any other chunk in order."""
+        if self.error is not None:
+            raise self.error
+        if isinstance(chunk, StreamChunk) and chunk.type == "text" and chunk.data is None:
+            chunk = chunk.content
+        if isinstance(chunk, str):
+            if not chunk:
+                return
+            self._buffer.append(chunk)
+            self._buffered += len(chunk.encode())
+            if self._buffered >= self.max_bytes:
+                await self._put(self._take_text())
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(self.window, self._on_timer)
+            return
+        if self._buffer:
+            await self._put(self._take_text())
+        await self._put(orjson.dumps(chunk.model_dump()))
+
+    async def close(self, flush: bool = True) -> None:
+        """Send what is buffered (unless `flush` is False) and stop the sender."""
+        if self._task is None:
+            return
+        if flush and self.error is None:
+            if self._buffer:
+                await self._put(self._take_text())
+            await self._queue.put(_CLOSE)
+            await asyncio.gather(self._task, return_exceptions=True)
+        else:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._task = None
+        self.elapsed = time.perf_counter() - self._started
+        stream_stats.record(self)
+
+    def _take_text(self) -> bytes:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        text = "".join(self._buffer)
+        self.tokens += len(self._buffer)
+        self._buffer.clear()
+        self._buffered = 0
+        return orjson.dumps({"type": "text", "content": text, "data": None})
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        if not self._buffer or self.error is not None:
+            return
+        if self._queue.full():
+            # Client is behind; keep coalescing until the sender catches up
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._on_timer)
+            return
+        self._queue.put_nowait(self._take_text())
+
+    async def _put(self, payload: bytes) -> None:
+        if self._queue.full():
+            self.blocked += 1
+        await self._queue.put(payload)
+        if self.error is not None:
+            raise self.error
+
+    # ── Sender ───────────────────────────────────────────
+
+    async def _run(self) -> None:
+        queue = self._queue
+        try:
+            while True:
+                payload = await queue.get()
+                if payload is _CLOSE:
+                    return
+                start = time.perf_counter()
+                await self._send(payload.decode())
+                self.send_s += time.perf_counter() - start
+                self.frames += 1
+                self.bytes += len(payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.error = e
+            # Unblock a producer waiting on a full queue; its write will raise
+            while not queue.empty():
+                queue.get_nowait()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "frames": self.frames,
+            "tokens": self.tokens,
+            "bytes": self.bytes,
+            "send_ms": round(self.send_s * 1000, 2),
+            "blocked_writes": self.blocked,
+        }
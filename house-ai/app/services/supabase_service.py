@@ -3,27 +3,100 @@ House AI — Supabase Service
 Async Supabase client for products, blog posts, chat sessions, and vector search.
 """
 
+import asyncio
+import difflib
 import logging
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
-from supabase import create_client, Client
+from supabase import acreate_client, AsyncClient, AClientOptions
 
 from app.config import Settings
 
 logger = logging.getLogger("house_ai")
 
+# ai_products columns a card or comparison needs — everything but the embedding
+PRODUCT_COLUMNS = (
+    "id,name,brand,price,currency,cpu,gpu,ram,storage,battery,display,camera,"
+    "image_url,gaming_score,camera_score,value_score,trend_score,updated_at"
+)
+
+# Upper bound on candidate rows fetched per name in a batched name lookup
+NAME_LOOKUP_MAX_CANDIDATES = 50
+
+
+def _normalize_name(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+def rank_name_matches(
+    names: List[str], candidates: List[Dict[str, Any]]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Pick the best candidate row for each name.
+
+    A candidate qualifies for a name if it contains it (the ilike
+    semantics of the lookup); among those the closest by difflib ratio
+    wins, so "iphone 15" prefers "iPhone 15" over "iPhone 15 Pro Max".
+    Names are resolved in order and a product is used at most once.
+    """
+    resolved: Dict[str, Dict[str, Any]] = {}
+    used = set()
+    for name in names:
+        query = _normalize_name(name)
+        best, best_score = None, 0.0
+        for row in candidates:
+            full = _normalize_name(row.get("name") or "")
+            if row.get("id") in used or query not in full:
+                continue
+            score = difflib.SequenceMatcher(None, query, full).ratio()
+            if score > best_score:
+                best, best_score = row, score
+        if best is not None:
+            resolved[name] = best
+            used.add(best.get("id"))
+    return resolved
+
 
 class SupabaseService:
-    """Supabase async client wrapper."""
+    """
+    Supabase async client wrapper.
+
+    Built on the async PostgREST client so queries and RPCs never block
+    the event loop; all requests share one pooled httpx.AsyncClient.
+    """
 
     def __init__(self, settings: Settings):
-        self.client: Client = create_client(
-            settings.SUPABASE_URL,
-            settings.SUPABASE_SERVICE_KEY or settings.SUPABASE_KEY,
-        )
         self.url = settings.SUPABASE_URL
         self.key = settings.SUPABASE_SERVICE_KEY or settings.SUPABASE_KEY
+        self.timeout = settings.SUPABASE_TIMEOUT
+        self.client: Optional[AsyncClient] = None
+
+    async def connect(self) -> None:
+        """Create the async Supabase client."""
+        try:
+            self.client = await acreate_client(
+                self.url,
+                self.key,
+                options=AClientOptions(postgrest_client_timeout=self.timeout),
+            )
+            logger.info("Supabase connected")
+        except Exception as e:
+            logger.error(f"Supabase connection failed: {e}")
+            self.client = None
+
+    async def disconnect(self) -> None:
+        """Close the underlying PostgREST HTTP session."""
+        if self.client:
+            try:
+                await self.client.postgrest.aclose()
+            except Exception as e:
+                logger.warning(f"Supabase disconnect error: {e}")
+            logger.info("Supabase disconnected")
+
+    @property
+    def is_connected(self) -> bool:
+        return self.client is not None
 
     # ── Vector Search ────────────────────────────────────
 
@@ -36,7 +109,7 @@ class SupabaseService:
     ) -> List[Dict[str, Any]]:
         """Perform pgvector similarity search via RPC."""
         try:
-            result = self.client.rpc(
+            result = await self.client.rpc(
                 "match_documents",
                 {
                     "query_embedding": query_embedding,
@@ -58,7 +131,7 @@ class SupabaseService:
     ) -> List[Dict[str, Any]]:
         """Search products by vector similarity."""
         try:
-            result = self.client.rpc(
+            result = await self.client.rpc(
                 "match_products",
                 {
                     "query_embedding": query_embedding,
@@ -79,7 +152,7 @@ class SupabaseService:
     ) -> List[Dict[str, Any]]:
         """Search blog posts by vector similarity."""
         try:
-            result = self.client.rpc(
+            result = await self.client.rpc(
                 "match_blog_posts",
                 {
                     "query_embedding": query_embedding,
@@ -111,16 +184,42 @@ class SupabaseService:
             if max_price is not None:
                 query = query.lte("price", max_price)
             query = query.limit(limit)
-            result = query.execute()
+            result = await query.execute()
             return result.data or []
         except Exception as e:
             logger.error(f"Get products error: {e}")
             return []
 
+    async def get_products_updated_since(
+        self,
+        since: Optional[str] = None,
+        columns: str = "*",
+        page_size: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch every product with `updated_at` after `since` (all if None),
+        oldest change first, paging past PostgREST's row cap. Raises on error.
+        """
+        rows: List[Dict[str, Any]] = []
+        while True:
+            query = self.client.table("ai_products").select(columns)
+            if since:
+                query = query.gt("updated_at", since)
+            result = await (
+                query.order("updated_at")
+                .order("id")
+                .range(len(rows), len(rows) + page_size - 1)
+                .execute()
+            )
+            page = result.data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+
     async def get_product_by_name(self, name: str) -> Optional[Dict[str, Any]]:
         """Find a product by name (fuzzy match)."""
         try:
-            result = (
+            result = await (
                 self.client.table("ai_products")
                 .select("*")
                 .ilike("name", f"%{name}%")
@@ -132,14 +231,51 @@ class SupabaseService:
             logger.error(f"Get product by name error: {e}")
             return None
 
+    async def resolve_product_names(self, names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Resolve several product names with one ilike query per name, run
+        concurrently, so a generic name cannot use up the candidate limit
+        of the others. Returns {name: product} for the names that matched.
+        """
+        names = [n for n in names if n.strip()]
+        if not names:
+            return {}
+        try:
+            results = await asyncio.gather(*(
+                self.client.table("ai_products")
+                .select(PRODUCT_COLUMNS)
+                .ilike("name", f"%{_normalize_name(n)}%")
+                .order("name")
+                .limit(NAME_LOOKUP_MAX_CANDIDATES)
+                .execute()
+                for n in dict.fromkeys(names)
+            ))
+            candidates = {row.get("id"): row for result in results for row in result.data or []}
+            return rank_name_matches(names, list(candidates.values()))
+        except Exception as e:
+            logger.error(f"Resolve product names error: {e}")
+            return {}
+
     async def get_products_by_names(self, names: List[str]) -> List[Dict[str, Any]]:
-        """Find multiple products by their names."""
-        products = []
-        for name in names:
-            product = await self.get_product_by_name(name)
-            if product:
-                products.append(product)
-        return products
+        """Find multiple products by their names, in input order (see resolve_product_names)."""
+        resolved = await self.resolve_product_names(names)
+        return [resolved[n] for n in names if n in resolved]
+
+    async def get_products_by_ids(self, ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch products by primary key in one query."""
+        if not ids:
+            return []
+        try:
+            result = await (
+                self.client.table("ai_products")
+                .select(PRODUCT_COLUMNS)
+                .in_("id", ids)
+                .execute()
+            )
+            return result.data or []
+        except Exception as e:
+            logger.error(f"Get products by ids error: {e}")
+            return []
 
     async def get_platform_products(
         self,
@@ -167,7 +303,7 @@ class SupabaseService:
                 query = query.lte("price", max_price)
             if search_term:
                 query = query.ilike("title", f"%{search_term}%")
-            result = query.order("created_at", desc=True).limit(limit).execute()
+            result = await query.order("created_at", desc=True).limit(limit).execute()
             return result.data or []
         except Exception as e:
             logger.error(f"Get platform products error: {e}")
@@ -179,23 +315,21 @@ class SupabaseService:
         Returns name, role, and order count.
         """
         try:
-            result = (
+            # Profile and order count are independent — fetch concurrently
+            result, order_result = await asyncio.gather(
                 self.client.table("profiles")
                 .select("id, full_name, username, role, created_at")
                 .eq("id", user_id)
                 .single()
-                .execute()
+                .execute(),
+                self.client.table("orders")
+                .select("id", count="exact", head=True)
+                .eq("user_id", user_id)
+                .execute(),
             )
             profile = result.data
             if not profile:
                 return None
-            # Get order count for personalization context
-            order_result = (
-                self.client.table("orders")
-                .select("id", count="exact")
-                .eq("user_id", user_id)
-                .execute()
-            )
             profile["order_count"] = order_result.count or 0
             return profile
         except Exception as e:
@@ -217,7 +351,7 @@ class SupabaseService:
             if anonymous_session_id:
                 data["anonymous_session_id"] = anonymous_session_id
 
-            result = (
+            result = await (
                 self.client.table("chat_sessions").insert(data).execute()
             )
             return result.data[0] if result.data else {}
@@ -228,7 +362,7 @@ class SupabaseService:
     async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get a chat session by ID."""
         try:
-            result = (
+            result = await (
                 self.client.table("chat_sessions")
                 .select("*")
                 .eq("id", session_id)
@@ -260,7 +394,7 @@ class SupabaseService:
             if summary:
                 data["summary"] = summary
 
-            result = (
+            result = await (
                 self.client.table("chat_messages").insert(data).execute()
             )
             return result.data[0] if result.data else {}
@@ -268,6 +402,16 @@ class SupabaseService:
             logger.error(f"Save message error: {e}")
             return {}
 
+    async def save_messages(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Insert several chat messages in one multi-row INSERT.
+
+        Unlike save_message, errors propagate so the caller can retry.
+        """
+        if not rows:
+            return
+        await self.client.table("chat_messages").insert(rows).execute()
+
     async def get_session_messages(
         self,
         session_id: str,
@@ -275,7 +419,7 @@ class SupabaseService:
     ) -> List[Dict[str, Any]]:
         """Get recent messages for a session."""
         try:
-            result = (
+            result = await (
                 self.client.table("chat_messages")
                 .select("*")
                 .eq("session_id", session_id)
@@ -303,7 +447,7 @@ class SupabaseService:
     async def get_previous_summary(self, session_id: str) -> Optional[str]:
         """Get the most recent summary for a session."""
         try:
-            result = (
+            result = await (
                 self.client.table("chat_messages")
                 .select("summary")
                 .eq("session_id", session_id)
@@ -40,6 +40,22 @@ CREATE INDEX IF NOT EXISTS idx_ai_products_price ON ai_products(price);
 CREATE INDEX IF NOT EXISTS idx_ai_products_gaming_score ON ai_products(gaming_score DESC);
 CREATE INDEX IF NOT EXISTS idx_ai_products_value_score ON ai_products(value_score DESC);
 CREATE INDEX IF NOT EXISTS idx_ai_products_name ON ai_products USING gin(to_tsvector('english', name));
+CREATE INDEX IF NOT EXISTS idx_ai_products_updated_at ON ai_products(updated_at);
+
+-- Keep updated_at current (the AI service refreshes its catalogue by it)
+CREATE OR REPLACE FUNCTION update_ai_products_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_update_ai_products_updated_at ON ai_products;
+CREATE TRIGGER trigger_update_ai_products_updated_at
+    BEFORE UPDATE ON ai_products
+    FOR EACH ROW
+    EXECUTE FUNCTION update_ai_products_updated_at();
 
 -- Vector index (IVFFlat for fast approximate search)
 CREATE INDEX IF NOT EXISTS idx_ai_products_embedding ON ai_products
@@ -0,0 +1,106 @@
+"""
+House AI — HTTP Pool Benchmark
+Compares a fresh httpx.AsyncClient per call (the old SearchService /
+CurrencyService behaviour) with one shared pooled client, against a
+local keep-alive stub server that counts accepted TCP connections.
+
+Usage:
+    python scripts/bench_http_pool.py -n 500 -c 20
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.http_client import create_http_client  # noqa: E402
+
+
+BODY = b'{"results": [], "rates": {"UZS": 12500}}'
+RESPONSE = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Content-Length: " + str(len(BODY)).encode() + b"\r\n"
+    b"Connection: keep-alive\r\n\r\n" + BODY
+)
+
+
+class StubServer:
+    """Minimal HTTP/1.1 keep-alive server; counts connections."""
+
+    def __init__(self):
+        self.connections = 0
+        self.server = None
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                headers = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in headers.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                if length:
+                    await reader.readexactly(length)
+                writer.write(RESPONSE)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+
+async def _bench(name, url, requests, concurrency, call, server):
+    server.connections = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await call(url)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:<12} requests={requests} time={elapsed:.3f}s "
+        f"rps={requests / elapsed:,.0f} tcp_connections={server.connections}"
+    )
+
+
+async def main(requests: int, concurrency: int) -> None:
+    server = StubServer()
+    port = await server.start()
+    url = f"http://127.0.0.1:{port}/search"
+
+    async def per_call(u):
+        async with httpx.AsyncClient(timeout=10) as client:
+            (await client.post(u, json={"query": "x"})).raise_for_status()
+
+    # http2=False: the stub speaks plain HTTP/1.1 (no TLS/ALPN)
+    shared = create_http_client(timeout=10, max_connections=concurrency, http2=False)
+
+    async def pooled(u):
+        (await shared.post(u, json={"query": "x"})).raise_for_status()
+
+    await _bench("per-call", url, requests, concurrency, per_call, server)
+    await _bench("pooled", url, requests, concurrency, pooled, server)
+    await shared.aclose()
+    server.server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--requests", type=int, default=500)
+    parser.add_argument("-c", "--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,97 @@
+"""
+House AI — Middleware Benchmark
+Measures in-process requests/sec on /health and /api/chat through the full
+middleware stack, with the LLM stubbed out (no network, no API keys).
+
+Requests go through httpx's ASGI transport, so the numbers reflect the
+framework + middleware overhead rather than socket I/O. Run it on two
+revisions to compare middleware implementations.
+
+Usage:
+    python scripts/bench_middleware.py -n 2000 -c 50
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+import uuid
+
+# Effectively disable rate limiting and external services for the run
+os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "1000000000")
+os.environ.setdefault("RATE_LIMIT_PER_MINUTE_ANON", "1000000000")
+os.environ.setdefault("REDIS_URL", "redis://127.0.0.1:1/0")
+
+import httpx  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.config import get_settings  # noqa: E402
+from app.dependencies import init_services, shutdown_services  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.llm_service import LLMService  # noqa: E402
+
+
+async def _stub_complete(self, messages, model=None, temperature=0.7, max_tokens=None):
+    return {
+        "content": "Salom! Sizga qanday yordam bera olaman?",
+        "model": model or self.model_default,
+        "tokens": {"prompt": 10, "completion": 8, "total": 18},
+        "finish_reason": "stop",
+    }
+
+
+async def _stub_embed(self, texts):
+    return [[0.0] * 8 for _ in texts]
+
+
+async def _bench(client: httpx.AsyncClient, name: str, requests: int, concurrency: int, call):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            response = await call(client, i)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    print(f"{name:<10} requests={requests} time={elapsed:.3f}s rps={requests / elapsed:,.0f}")
+
+
+async def main(requests: int, concurrency: int) -> None:
+    # Supabase is not configured here; keep its per-request errors off the console
+    logging.getLogger("house_ai").setLevel(logging.CRITICAL)
+    LLMService.complete = _stub_complete
+    LLMService.embed = _stub_embed
+    await init_services(get_settings())
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def health(c, i):
+            return await c.get("/health")
+
+        async def chat(c, i):
+            return await c.post(
+                "/api/chat",
+                json={"message": "salom", "session_id": str(uuid.uuid4())},
+            )
+
+        # Warm-up (imports, tokenizer, first-call caches)
+        await health(client, 0)
+        await chat(client, 0)
+
+        await _bench(client, "/health", requests, concurrency, health)
+        await _bench(client, "/api/chat", requests, concurrency, chat)
+
+    await shutdown_services()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--requests", type=int, default=2000)
+    parser.add_argument("-c", "--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
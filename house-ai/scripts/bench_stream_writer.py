@@ -0,0 +1,109 @@
+"""
+House AI — Stream Writer Benchmark
+Compares per-token `send_json` with StreamWriter frame coalescing on a stubbed WebSocket.
+
+A fake LLM yields 1–3 character tokens at a fixed interval into a real
+Starlette WebSocket whose ASGI `send` serializes a WebSocket frame and
+yields to the loop. Reported per streamed response: frames sent,
+frames/sec, and process CPU time; "llm only" is the cost of the fake
+stream itself, to subtract from the other two.
+
+Usage:
+    python scripts/bench_stream_writer.py --tokens 400 --interval-ms 5 -c 20
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import List
+
+from starlette.websockets import WebSocket
+from websockets.frames import Frame, Opcode
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.config import get_settings  # noqa: E402
+from app.models.response_models import StreamChunk  # noqa: E402
+from app.services.stream_writer import StreamWriter  # noqa: E402
+
+
+def make_tokens(n: int, rng: random.Random) -> List[str]:
+    text = "The Galaxy S24 Ultra has the better zoom camera and a brighter display. "
+    tokens, i = [], 0
+    while len(tokens) < n:
+        step = rng.randint(1, 3)
+        tokens.append(text[i % len(text):i % len(text) + step] or " ")
+        i += step
+    return tokens
+
+
+async def fake_llm(tokens: List[str], interval: float):
+    for token in tokens:
+        if interval:
+            await asyncio.sleep(interval)
+        yield StreamChunk(type="text", content=token)
+
+
+async def connected_socket(counter: dict) -> WebSocket:
+    async def receive():
+        return {"type": "websocket.connect"}
+
+    async def send(message):
+        if message["type"] == "websocket.send":
+            Frame(Opcode.TEXT, message["text"].encode()).serialize(mask=False, extensions=[])
+            counter["frames"] += 1
+            await asyncio.sleep(0)
+
+    ws = WebSocket({"type": "websocket", "path": "/", "headers": []}, receive, send)
+    await ws.accept()
+    return ws
+
+
+async def llm_only(tokens: List[str], interval: float, counter: dict) -> None:
+    async for _ in fake_llm(tokens, interval):
+        pass
+
+
+async def per_token(tokens: List[str], interval: float, counter: dict) -> None:
+    ws = await connected_socket(counter)
+    async for chunk in fake_llm(tokens, interval):
+        await ws.send_json(chunk.model_dump())
+
+
+async def coalesced(tokens: List[str], interval: float, counter: dict) -> None:
+    ws = await connected_socket(counter)
+    async with StreamWriter(ws.send_text, get_settings()) as out:
+        async for chunk in fake_llm(tokens, interval):
+            await out.write(chunk)
+
+
+async def run(name: str, fn, tokens: List[str], interval: float, concurrency: int) -> None:
+    counter = {"frames": 0}
+    cpu, wall = time.process_time(), time.perf_counter()
+    await asyncio.gather(*(fn(tokens, interval, counter) for _ in range(concurrency)))
+    cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+    frames = counter["frames"] / concurrency
+    print(
+        f"{name:<10} frames/response={frames:>7.1f} frames/s={counter['frames'] / wall:>9,.0f} "
+        f"cpu/response={cpu / concurrency * 1000:>7.2f}ms wall={wall:.2f}s"
+    )
+
+
+async def main(n: int, interval_ms: float, concurrency: int) -> None:
+    tokens = make_tokens(n, random.Random(7))
+    interval = interval_ms / 1000
+    await run("llm only", llm_only, tokens, interval, concurrency)
+    await run("per-token", per_token, tokens, interval, concurrency)
+    await run("coalesced", coalesced, tokens, interval, concurrency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tokens", type=int, default=400)
+    parser.add_argument("--interval-ms", type=float, default=5.0)
+    parser.add_argument("-c", "--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.tokens, args.interval_ms, args.concurrency))
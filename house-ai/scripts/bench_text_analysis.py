@@ -0,0 +1,154 @@
+"""
+House AI — Text Analysis Benchmark
+Per-message latency of the intent/emotion/language heuristics: the
+per-pattern search loops versus the shared single-pass engine
+(app/ai/text_analysis.py). Also checks both produce identical results.
+
+Usage:
+    python scripts/bench_text_analysis.py -r 200
+"""
+
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.ai import text_analysis  # noqa: E402
+from app.ai.keywords import EMOTION_KEYWORDS, INTENT_PATTERNS, RUSSIAN_MARKERS, UZBEK_MARKERS  # noqa: E402
+from app.ai.intent import classify_intent_rule_based  # noqa: E402
+from app.ai.emotion import detect_emotion  # noqa: E402
+from app.ai.language import detect_language  # noqa: E402
+
+
+CORPUS = [
+    # Uzbek
+    "Salom! iPhone 15 Pro Max narxi qancha?",
+    "Menga 3 million so'mgacha yaxshi kamerali telefon tavsiya qiling",
+    "Samsung S24 Ultra yoki iPhone 15 Pro qaysi biri yaxshi?",
+    "O'yin uchun eng yaxshi telefon qaysi?",
+    "Rahmat, juda zo'r javob bo'ldi!",
+    "Tushunmadim, qanday qilib buyurtma beraman?",
+    "Savatcha qayerda? Ilovada qayerdan topaman",
+    "Redmi Note 13 haqida ma'lumot bering, texnik xarakteristikalari",
+    "100 dollar necha so'm bo'ladi?",
+    "Eng mashhur telefonlar qaysilar hozir? ommabop modellar",
+    "Telefonim ishlamayapti, ekran buzilgan, yomon",
+    "Blogerlikga ariza qanday topshiriladi?",
+    # Russian
+    "Привет! Какой телефон лучше для игр?",
+    "Сравни iPhone 15 и Samsung S24, в чем разница?",
+    "Сколько стоит Xiaomi 14 Ultra?",
+    "Расскажи подробнее про характеристики Pixel 8 Pro",
+    "Спасибо, отлично! Очень помогли",
+    "Не понимаю, как это работает?",
+    "Где находится корзина? Как изменить язык в настройках",
+    "Посоветуй самый лучший телефон до 500 долларов",
+    "Какие популярные телефоны сейчас в тренде?",
+    "Ужас, ничего не работает, бесполезное приложение",
+    "Конвертируй 200 долларов в сумы",
+    "Обзор новых флагманов, новости",
+    # English
+    "What's the best camera phone under $500?",
+    "Compare iPhone 15 Pro vs Galaxy S24 Ultra",
+    "Tell me about the specs of the Pixel 8",
+    "How much is the OnePlus 12 in UZS?",
+    "Thanks, this is awesome! 👍",
+    "I don't understand, what do you mean??",
+    "This app is useless and the search doesn't work 😡",
+    "Wow, amazing! Can't wait to get it 🔥",
+    "How do I change the language setting?",
+    "Any news or reviews about the Galaxy Z Fold 6?",
+    "What's hot right now? Trending phones please",
+    "Convert 300 USD to sum",
+    # Mixed / short
+    "salom",
+    "ok",
+    "iPhone 15 yoki S24?",
+    "Xiaomi 14 цена в сумах, narxi qancha",
+]
+
+
+# ── Legacy per-pattern implementation (pre single-pass) ──────
+
+COMPILED_INTENT_PATTERNS = {
+    intent: [re.compile(p, re.IGNORECASE) for p in patterns]
+    for intent, patterns in INTENT_PATTERNS.items()
+}
+COMPILED_EMOTION_KEYWORDS = {
+    emotion: [re.compile(p, re.IGNORECASE) for p in keywords]
+    for emotion, keywords in EMOTION_KEYWORDS.items()
+}
+COMPILED_UZBEK = [re.compile(p, re.IGNORECASE | re.UNICODE) for p in UZBEK_MARKERS]
+COMPILED_RUSSIAN = [re.compile(p, re.IGNORECASE | re.UNICODE) for p in RUSSIAN_MARKERS]
+
+
+def legacy_counts(text: str):
+    intents = {}
+    for intent, patterns in COMPILED_INTENT_PATTERNS.items():
+        n = sum(1 for p in patterns if p.search(text))
+        if n:
+            intents[intent] = n
+    emotions = {}
+    for emotion, patterns in COMPILED_EMOTION_KEYWORDS.items():
+        n = sum(1 for p in patterns if p.search(text))
+        if n:
+            emotions[emotion] = n
+    return (
+        intents,
+        emotions,
+        sum(1 for p in COMPILED_UZBEK if p.search(text)),
+        sum(1 for p in COMPILED_RUSSIAN if p.search(text)),
+        len(re.findall(r"[а-яА-ЯёЁ]", text)),
+        len(re.findall(r"[a-zA-Zа-яА-ЯёЁ]", text)),
+    )
+
+
+def engine_counts(text: str):
+    return tuple(text_analysis.analyze_text.__wrapped__(text))
+
+
+def _timed(fn, texts, rounds):
+    samples = []
+    for _ in range(rounds):
+        for text in texts:
+            start = time.perf_counter()
+            fn(text)
+            samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return statistics.mean(samples), samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+
+
+def main(rounds: int) -> None:
+    mismatches = [t for t in CORPUS if legacy_counts(t) != engine_counts(t)]
+    print(f"corpus={len(CORPUS)} messages, mismatches={len(mismatches)}")
+    for text in mismatches:
+        print(f"  MISMATCH: {text!r}")
+
+    rows = [
+        ("per-pattern", legacy_counts),
+        ("single-pass", engine_counts),
+    ]
+    for name, fn in rows:
+        mean, p50, p99 = _timed(fn, CORPUS, rounds)
+        print(f"{name:<12} mean={mean:7.1f}us p50={p50:7.1f}us p99={p99:7.1f}us")
+
+    # End-to-end: the three public heuristics as the pipeline calls them
+    def full(text):
+        text_analysis.analyze_text.cache_clear()
+        detect_language(text)
+        classify_intent_rule_based(text)
+        detect_emotion(text)
+
+    mean, p50, p99 = _timed(full, CORPUS, rounds)
+    print(f"{'lang+intent+emotion':<12} mean={mean:7.1f}us p50={p50:7.1f}us p99={p99:7.1f}us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-r", "--rounds", type=int, default=200)
+    args = parser.parse_args()
+    main(args.rounds)
@@ -0,0 +1,152 @@
+"""
+House AI — Cache Key-Space Report
+Replays a query log through the old and current Redis cache key builders.
+
+Reports, per builder, distinct keys (fewer = more hits) and the bytes
+those key names take in Redis. Input lines may be
+  - JSONL records: {"query"|"text": "...", "language": "uz", "focus": ...,
+    "budget_min": ..., "budget_max": ..., "product_names": [...]}
+  - service log lines whose "message" is such a JSON event
+    (e.g. `intent_sample` with INTENT_LOG_SAMPLES=true)
+  - plain text, one query per line.
+Records without "language" are run through rule-based detection.
+`--variants N` adds N surface variants per query (case, spacing,
+apostrophe form, punctuation, "please") to approximate repeat traffic.
+
+Usage:
+    python scripts/cache_keyspace_report.py logs/queries.jsonl
+    python scripts/cache_keyspace_report.py scripts/data/intent_seed.jsonl --variants 3
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from typing import Any, Callable, Dict, Iterator, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.ai.language import detect_language  # noqa: E402
+from app.services.redis_service import RedisService  # noqa: E402
+
+
+# ── Previous Builders ────────────────────────────────────────
+
+def legacy_product_key(query: str) -> str:
+    return f"cache:product:{query.lower().strip()}"
+
+
+def legacy_comparison_key(products: List[str]) -> str:
+    key = ":".join(sorted(p.lower().strip() for p in products))
+    return f"cache:compare:{key}"
+
+
+def legacy_rag_key(query: str) -> str:
+    return f"cache:rag:{query.lower().strip()}"
+
+
+# ── Replay ───────────────────────────────────────────────────
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield {"query": line}
+                continue
+            if not isinstance(record, dict):
+                continue
+            if isinstance(record.get("message"), str):
+                try:
+                    record = json.loads(record["message"])
+                except ValueError:
+                    continue
+            query = record.get("query") or record.get("text")
+            if query or record.get("product_names"):
+                yield {**record, "query": query or ""}
+
+
+def variants(query: str, n: int, rng: random.Random) -> List[str]:
+    edits: List[Callable[[str], str]] = [
+        str.upper,
+        str.capitalize,
+        lambda q: "  ".join(q.split()),
+        lambda q: q.replace("'", "ʻ"),
+        lambda q: q.replace("'", "`"),
+        lambda q: q + "?",
+        lambda q: q.rstrip("?!. ") + "!",
+        lambda q: "please " + q,
+        lambda q: f" {q} ",
+    ]
+    return [rng.choice(edits)(query) for _ in range(n)]
+
+
+def summarize(keys: List[str]) -> Dict[str, Any]:
+    distinct = set(keys)
+    key_bytes = sum(len(k.encode("utf-8")) for k in distinct)
+    return {
+        "requests": len(keys),
+        "distinct": len(distinct),
+        "key_bytes": key_bytes,
+        "max_len": max((len(k.encode("utf-8")) for k in distinct), default=0),
+        "repeat_rate": round(1 - len(distinct) / len(keys), 3) if keys else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("inputs", nargs="+")
+    parser.add_argument("--variants", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    keys: Dict[str, Dict[str, List[str]]] = {
+        name: {"before": [], "after": []} for name in ("product", "rag", "compare")
+    }
+
+    for path in args.inputs:
+        for record in read_records(path):
+            # Records without a language get the service's rule-based detection
+            language = record.get("language") or detect_language(record["query"])[0].value
+            queries = [record["query"]] + variants(record["query"], args.variants, rng)
+            for query in queries:
+                if query:
+                    keys["product"]["before"].append(legacy_product_key(query))
+                    keys["product"]["after"].append(RedisService.product_cache_key(
+                        query,
+                        focus=record.get("focus"),
+                        budget_min=record.get("budget_min"),
+                        budget_max=record.get("budget_max"),
+                        language=language,
+                    ))
+                    keys["rag"]["before"].append(legacy_rag_key(query))
+                    keys["rag"]["after"].append(RedisService.rag_cache_key(query, language))
+            names = record.get("product_names")
+            if names:
+                for _ in range(1 + args.variants):
+                    shuffled = rng.sample(names, len(names))
+                    keys["compare"]["before"].append(legacy_comparison_key(shuffled))
+                    keys["compare"]["after"].append(
+                        RedisService.comparison_cache_key(shuffled, language)
+                    )
+
+    print(f"{'builder':<8} {'':<7} {'requests':>8} {'distinct':>8} {'key bytes':>10} {'max len':>8} {'repeat':>7}")
+    for name, sides in keys.items():
+        if not sides["before"]:
+            continue
+        for side in ("before", "after"):
+            s = summarize(sides[side])
+            print(
+                f"{name:<8} {side:<7} {s['requests']:>8} {s['distinct']:>8} "
+                f"{s['key_bytes']:>10} {s['max_len']:>8} {s['repeat_rate']:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+House AI — Intent Model Evaluation
+Accuracy and per-message latency of the rule-based classifier, the local
+model, and the rules → model hybrid, using k-fold cross-validation over
+labelled (message, intent) pairs.
+
+The LLM fallback is not exercised here (it needs an API key and its
+~300–800 ms round-trip is what the model is meant to avoid); `rules`
+below is what the current hybrid returns without it.
+
+Usage:
+    python scripts/eval_intent_model.py scripts/data/intent_seed.jsonl -k 5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.ai.intent import classify_intent_rule_based  # noqa: E402
+from app.ai.intent_model import IntentModel  # noqa: E402
+from app.models.schemas import Intent  # noqa: E402
+from train_intent_model import load_pairs  # noqa: E402
+
+
+def rules(text, model, threshold):
+    return classify_intent_rule_based(text)[0]
+
+
+def local_model(text, model, threshold):
+    return model.predict(text)[0]
+
+
+def hybrid(text, model, threshold):
+    """Mirror of classify_intent without the LLM step."""
+    intent, confidence = classify_intent_rule_based(text)
+    if intent != Intent.GENERAL_CHAT and confidence >= 0.65:
+        return intent
+    model_intent, probability = model.predict(text)
+    return model_intent if probability >= threshold else intent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("inputs", nargs="+")
+    parser.add_argument("-k", "--folds", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.6)
+    parser.add_argument("--sources", default="llm,rule")
+    parser.add_argument("--min-confidence", type=float, default=0.8)
+    args = parser.parse_args()
+
+    pairs = load_pairs(args.inputs, args.sources.split(","), args.min_confidence)
+    order = np.random.default_rng(7).permutation(len(pairs))
+    folds = np.array_split(order, args.folds)
+
+    systems = [("rules", rules), ("model", local_model), ("hybrid", hybrid)]
+    correct = {name: 0 for name, _ in systems}
+    latencies = {name: [] for name, _ in systems}
+
+    for k, test_idx in enumerate(folds):
+        test_set = set(test_idx.tolist())
+        train = [pairs[i] for i in order if i not in test_set]
+        texts, labels = zip(*train)
+        model = IntentModel.fit(texts, labels, version=f"fold{k}")
+        for i in test_idx:
+            text, label = pairs[i]
+            for name, fn in systems:
+                start = time.perf_counter()
+                predicted = fn(text, model, args.threshold)
+                latencies[name].append((time.perf_counter() - start) * 1e6)
+                correct[name] += predicted.value == label
+
+    print(f"samples={len(pairs)} folds={args.folds} threshold={args.threshold}")
+    for name, _ in systems:
+        samples = sorted(latencies[name])
+        print(
+            f"{name:<7} accuracy={correct[name] / len(pairs):.3f} "
+            f"mean={statistics.mean(samples):6.1f}us "
+            f"p99={samples[int(len(samples) * 0.99)]:6.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+House AI — Chat Load Test
+Fires concurrent /api/chat requests and reports whether they overlap.
+
+If requests serialize behind each other (blocking I/O on the event loop),
+wall-clock time approaches the sum of individual latencies. With a
+non-blocking data layer it stays close to the slowest single request.
+
+Raise RATE_LIMIT_PER_MINUTE_ANON on the target server first, otherwise
+most requests are answered with 429.
+
+Usage:
+    python scripts/load_test_chat.py --url http://localhost:8100 -c 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+MESSAGES = [
+    "iPhone 15 Pro Max narxi qancha?",
+    "Samsung S24 Ultra vs iPhone 15 Pro Max",
+    "Какой телефон лучше для игр?",
+    "Best camera phone under 5 million?",
+    "Eng yaxshi gaming telefon qaysi?",
+]
+
+
+async def _one(client: httpx.AsyncClient, url: str, i: int) -> float:
+    start = time.perf_counter()
+    response = await client.post(
+        f"{url}/api/chat",
+        json={
+            "message": MESSAGES[i % len(MESSAGES)],
+            "session_id": str(uuid.uuid4()),
+        },
+    )
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def run(url: str, concurrency: int, rounds: int) -> None:
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        for r in range(rounds):
+            start = time.perf_counter()
+            latencies = await asyncio.gather(
+                *(_one(client, url, i) for i in range(concurrency))
+            )
+            wall = time.perf_counter() - start
+            total = sum(latencies)
+            print(
+                f"round={r + 1} concurrency={concurrency} "
+                f"wall={wall:.2f}s sum={total:.2f}s "
+                f"p50={statistics.median(latencies):.2f}s "
+                f"max={max(latencies):.2f}s "
+                f"overlap={total / wall:.1f}x"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8100")
+    parser.add_argument("-c", "--concurrency", type=int, default=20)
+    parser.add_argument("-r", "--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.concurrency, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+House AI — Intent Model Training
+Trains the local hashed n-gram intent model from (message, intent) pairs.
+
+Inputs are JSONL files of either
+  - labelled pairs:   {"text": "...", "intent": "comparison"}
+  - service logs with INTENT_LOG_SAMPLES=true, where each line's
+    "message" is an `intent_sample` event (text, intent, confidence, source).
+Logged samples can be filtered by source and confidence.
+
+Usage:
+    python scripts/train_intent_model.py scripts/data/intent_seed.jsonl logs/*.log \\
+        --version v2 --out app/ai/artifacts/intent_model_v2.npz
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.ai.intent_model import IntentModel  # noqa: E402
+from app.models.schemas import Intent  # noqa: E402
+
+
+def load_pairs(
+    paths: List[str], sources: List[str], min_confidence: float
+) -> List[Tuple[str, str]]:
+    """Read (text, intent) pairs from datasets and/or service logs, de-duplicated."""
+    valid = {i.value for i in Intent}
+    pairs = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record.get("message"), str):
+                    # JSONFormatter log line → nested event
+                    try:
+                        record = json.loads(record["message"])
+                    except ValueError:
+                        continue
+                    if record.get("event") != "intent_sample":
+                        continue
+                    if record.get("source") not in sources:
+                        continue
+                    if float(record.get("confidence", 0)) < min_confidence:
+                        continue
+                text, intent = record.get("text"), record.get("intent")
+                if text and intent in valid:
+                    pairs[" ".join(text.lower().split())] = (text, intent)
+    return list(pairs.values())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("inputs", nargs="+", help="JSONL datasets and/or service log files")
+    parser.add_argument("--out", default="app/ai/artifacts/intent_model_v1.npz")
+    parser.add_argument("--version", default="v1")
+    parser.add_argument("--sources", default="llm,rule", help="logged sample sources to keep")
+    parser.add_argument("--min-confidence", type=float, default=0.8)
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--learning-rate", type=float, default=0.5)
+    args = parser.parse_args()
+
+    pairs = load_pairs(args.inputs, args.sources.split(","), args.min_confidence)
+    if not pairs:
+        sys.exit("No training pairs found")
+    texts, labels = zip(*pairs)
+    print(f"samples={len(pairs)} " + " ".join(f"{k}={v}" for k, v in sorted(Counter(labels).items())))
+
+    model = IntentModel.fit(
+        texts, labels,
+        epochs=args.epochs,
+        learning_rate=args.learning_rate,
+        version=args.version,
+    )
+    train_acc = sum(model.predict(t)[0].value == y for t, y in pairs) / len(pairs)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    model.save(args.out)
+    print(f"version={model.version} train_accuracy={train_acc:.3f} saved={args.out}")
+
+
+if __name__ == "__main__":
+    main()